@@ -12,7 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import repository, task  # Import all models
+from app.models import repository, task, dependency_install, repository_maintenance, merge_train, verification_result  # Import all models
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,53 @@
+"""Per-repository dependency install policy
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+install_policy = postgresql.ENUM('NEVER', 'ALWAYS', 'ON_LOCKFILE_CHANGE', 'CUSTOM', name='installpolicy', create_type=False)
+
+
+def upgrade() -> None:
+    install_policy.create(op.get_bind(), checkfirst=True)
+    
+    op.add_column('repositories', sa.Column('install_policy', install_policy, server_default='ALWAYS', nullable=False))
+    op.add_column('repositories', sa.Column('install_command', sa.Text(), nullable=True))
+    op.add_column('repositories', sa.Column('install_timeout', sa.Integer(), nullable=True))
+    
+    op.create_table('dependency_installs',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('repository_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('base_commit', sa.String(length=40), nullable=True),
+    sa.Column('lockfile_hash', sa.String(length=64), nullable=True),
+    sa.Column('policy', install_policy, nullable=False),
+    sa.Column('command', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('duration_seconds', sa.Float(), nullable=False),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['repository_id'], ['repositories.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dependency_installs_repository_id'), 'dependency_installs', ['repository_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_dependency_installs_repository_id'), table_name='dependency_installs')
+    op.drop_table('dependency_installs')
+    op.drop_column('repositories', 'install_timeout')
+    op.drop_column('repositories', 'install_command')
+    op.drop_column('repositories', 'install_policy')
+    install_policy.drop(op.get_bind(), checkfirst=True)
\ No newline at end of file
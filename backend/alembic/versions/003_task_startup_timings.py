@@ -0,0 +1,23 @@
+"""Record task startup stage durations
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('startup_timings', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'startup_timings')
\ No newline at end of file
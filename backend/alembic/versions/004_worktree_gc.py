@@ -0,0 +1,25 @@
+"""Add worktree pinning and per-repository worktree quotas
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('is_pinned', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column('repositories', sa.Column('worktree_quota_bytes', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('repositories', 'worktree_quota_bytes')
+    op.drop_column('tasks', 'is_pinned')
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""Record task base commits, result trees and diffstats
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('base_commit', sa.String(length=40), nullable=True))
+    op.add_column('tasks', sa.Column('result_tree', sa.String(length=40), nullable=True))
+    op.add_column('tasks', sa.Column('diffstat', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'diffstat')
+    op.drop_column('tasks', 'result_tree')
+    op.drop_column('tasks', 'base_commit')
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""Add sparse-checkout patterns to repositories and tasks
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('repositories', sa.Column('sparse_patterns', sa.JSON(), nullable=True))
+    op.add_column('tasks', sa.Column('sparse_patterns', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'sparse_patterns')
+    op.drop_column('repositories', 'sparse_patterns')
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""Add remote URLs for repositories backed by a bare mirror
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('repositories', sa.Column('remote_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('repositories', 'remote_url')
\ No newline at end of file
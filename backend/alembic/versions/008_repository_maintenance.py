@@ -0,0 +1,47 @@
+"""Record git maintenance runs and add a task branch prune policy
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+branch_prune_policy = postgresql.ENUM('NEVER', 'MERGED', 'FINISHED', name='branchprunepolicy', create_type=False)
+
+
+def upgrade() -> None:
+    branch_prune_policy.create(op.get_bind(), checkfirst=True)
+    
+    op.add_column('repositories', sa.Column('branch_prune_policy', branch_prune_policy, server_default='MERGED', nullable=False))
+    
+    op.create_table('repository_maintenance',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('repository_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('tasks', sa.JSON(), nullable=False),
+    sa.Column('pruned_branches', sa.JSON(), nullable=True),
+    sa.Column('before', sa.JSON(), nullable=True),
+    sa.Column('after', sa.JSON(), nullable=True),
+    sa.Column('duration_seconds', sa.Float(), nullable=False),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['repository_id'], ['repositories.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_repository_maintenance_repository_id'), 'repository_maintenance', ['repository_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_repository_maintenance_repository_id'), table_name='repository_maintenance')
+    op.drop_table('repository_maintenance')
+    op.drop_column('repositories', 'branch_prune_policy')
+    branch_prune_policy.drop(op.get_bind(), checkfirst=True)
\ No newline at end of file
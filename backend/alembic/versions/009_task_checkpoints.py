@@ -0,0 +1,31 @@
+"""Add task checkpoints and preemption
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('checkpoint_interval', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('checkpoint_commit', sa.String(length=40), nullable=True))
+    op.add_column('tasks', sa.Column('checkpointed_at', sa.DateTime(), nullable=True))
+    op.add_column('tasks', sa.Column('preempt_requested', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('tasks', sa.Column('preemptions', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'preemptions')
+    op.drop_column('tasks', 'preempt_requested')
+    op.drop_column('tasks', 'checkpointed_at')
+    op.drop_column('tasks', 'checkpoint_commit')
+    op.drop_column('tasks', 'checkpoint_interval')
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Add merge trains
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('merge_trains',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('repository_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('integration_branch', sa.String(length=100), nullable=False),
+    sa.Column('task_ids', sa.JSON(), nullable=False),
+    sa.Column('verify_command', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('base_commit', sa.String(length=40), nullable=True),
+    sa.Column('head_commit', sa.String(length=40), nullable=True),
+    sa.Column('report', sa.JSON(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['repository_id'], ['repositories.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_merge_trains_repository_id'), 'merge_trains', ['repository_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_merge_trains_repository_id'), table_name='merge_trains')
+    op.drop_table('merge_trains')
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""Add task verification with results cached by tree
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('repositories', sa.Column('verify_command', sa.Text(), nullable=True))
+    op.add_column('repositories', sa.Column('verify_timeout', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('verification_status', sa.String(length=20), nullable=True))
+    op.add_column('tasks', sa.Column('verification', sa.JSON(), nullable=True))
+    
+    op.create_table('verification_results',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('repository_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('tree', sa.String(length=40), nullable=False),
+    sa.Column('command_hash', sa.String(length=64), nullable=False),
+    sa.Column('passed', sa.Boolean(), nullable=False),
+    sa.Column('duration_seconds', sa.Float(), nullable=False),
+    sa.Column('output', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['repository_id'], ['repositories.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('repository_id', 'tree', 'command_hash', name='_verification_tree_uc')
+    )
+    op.create_index(op.f('ix_verification_results_repository_id'), 'verification_results', ['repository_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_verification_results_repository_id'), table_name='verification_results')
+    op.drop_table('verification_results')
+    op.drop_column('tasks', 'verification')
+    op.drop_column('tasks', 'verification_status')
+    op.drop_column('repositories', 'verify_timeout')
+    op.drop_column('repositories', 'verify_command')
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""Add per-repository concurrent task limit
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('repositories', sa.Column('max_concurrent_tasks', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('repositories', 'max_concurrent_tasks')
\ No newline at end of file
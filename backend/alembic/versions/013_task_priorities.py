@@ -0,0 +1,36 @@
+"""Add task priorities, dispatch tracking and repository scheduling weights
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+task_priority = postgresql.ENUM('URGENT', 'NORMAL', 'BATCH', name='taskpriority', create_type=False)
+
+
+def upgrade() -> None:
+    task_priority.create(op.get_bind(), checkfirst=True)
+    
+    op.add_column('tasks', sa.Column('priority', task_priority, server_default='NORMAL', nullable=False))
+    op.add_column('tasks', sa.Column('dispatched_at', sa.DateTime(), nullable=True))
+    op.add_column('repositories', sa.Column('scheduling_weight', sa.Integer(), server_default='1', nullable=False))
+    
+    # Tasks already pending were queued directly; the scheduler must not queue them again
+    op.execute("UPDATE tasks SET dispatched_at = created_at WHERE status = 'PENDING'")
+
+
+def downgrade() -> None:
+    op.drop_column('repositories', 'scheduling_weight')
+    op.drop_column('tasks', 'dispatched_at')
+    op.drop_column('tasks', 'priority')
+    task_priority.drop(op.get_bind(), checkfirst=True)
\ No newline at end of file
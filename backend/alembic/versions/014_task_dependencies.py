@@ -0,0 +1,23 @@
+"""Add task dependencies
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('depends_on', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'depends_on')
\ No newline at end of file
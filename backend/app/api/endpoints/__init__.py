@@ -1,3 +1,3 @@
-from app.api.endpoints import repositories, tasks, websocket
+from app.api.endpoints import repositories, tasks, websocket, system, merge_trains
 
-__all__ = ["repositories", "tasks", "websocket"]
\ No newline at end of file
+__all__ = ["repositories", "tasks", "websocket", "system", "merge_trains"]
\ No newline at end of file
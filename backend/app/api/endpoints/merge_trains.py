@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from app.core.database import get_db
+from app.models import Task, Repository, TaskStatus, MergeTrain
+from app.schemas.merge_train import MergeTrain as MergeTrainSchema, MergeTrainCreate
+from app.services.task_queue import run_merge_train
+
+router = APIRouter()
+
+
+@router.post("/", response_model=MergeTrainSchema, status_code=status.HTTP_202_ACCEPTED)
+async def create_merge_train(
+    train: MergeTrainCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a merge train integrating completed tasks, in the given order."""
+    repository = await db.get(Repository, train.repository_id)
+    if not repository:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Repository not found"
+        )
+    
+    result = await db.execute(select(Task).where(Task.id.in_(train.task_ids)))
+    tasks = {task.id: task for task in result.scalars().all()}
+    
+    missing = [str(task_id) for task_id in train.task_ids if task_id not in tasks]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tasks not found: {', '.join(missing)}"
+        )
+    
+    for task in tasks.values():
+        if task.repository_id != repository.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Task {task.id} belongs to another repository"
+            )
+        if task.status != TaskStatus.COMPLETED:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Task {task.id} is {task.status.value}; only completed tasks can be merged"
+            )
+    
+    train_id = uuid4()
+    integration_branch = train.integration_branch or f"devbud/train-{train_id.hex[:8]}"
+    task_branches = {task.branch_name for task in tasks.values()}
+    if integration_branch == repository.default_branch or integration_branch in task_branches:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Branch '{integration_branch}' cannot be used as the integration branch"
+        )
+    
+    db_train = MergeTrain(
+        id=train_id,
+        repository_id=repository.id,
+        integration_branch=integration_branch,
+        task_ids=[str(task_id) for task_id in train.task_ids],
+        verify_command=train.verify_command or repository.verify_command,
+        status="pending"
+    )
+    db.add(db_train)
+    await db.commit()
+    await db.refresh(db_train)
+    
+    run_merge_train.delay(str(db_train.id))
+    
+    return db_train
+
+
+@router.get("/", response_model=List[MergeTrainSchema])
+async def list_merge_trains(
+    repository_id: Optional[UUID] = Query(None),
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db)
+):
+    """List merge trains, newest first."""
+    query = select(MergeTrain).order_by(MergeTrain.created_at.desc())
+    
+    if repository_id:
+        query = query.where(MergeTrain.repository_id == repository_id)
+    
+    query = query.offset(skip).limit(limit)
+    
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.get("/{train_id}", response_model=MergeTrainSchema)
+async def get_merge_train(
+    train_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a merge train and its report."""
+    train = await db.get(MergeTrain, train_id)
+    if not train:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Merge train not found"
+        )
+    return train
\ No newline at end of file
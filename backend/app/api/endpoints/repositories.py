@@ -1,17 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 from uuid import UUID
+from pathlib import Path
+import json
 
-from app.core.database import get_db
-from app.models import Repository
+from app.core.database import AsyncSessionLocal, get_db
+from app.models import Repository, DependencyInstall, InstallPolicy, RepositoryMaintenance
 from app.schemas.repository import (
     Repository as RepositorySchema,
     RepositoryCreate,
-    RepositoryUpdate
+    RepositoryUpdate,
+    RepositoryDiscover,
+    RepositoryGitInfo,
+    DependencyInstall as DependencyInstallSchema,
+    RepositoryMaintenance as RepositoryMaintenanceSchema
 )
 from app.services.git_manager import GitWorktreeManager
+from app.services.repo_mirror import get_mirror_manager
+from app.services.repo_discovery import get_repository_discovery
+from app.services.repo_metadata import RepositoryMetadata, get_repository_metadata_cache
+from app.services.task_queue import maintain_repositories
 
 router = APIRouter()
 git_manager = GitWorktreeManager()
@@ -22,12 +33,42 @@ async def validate_git_repository(path: str) -> bool:
     return await git_manager.validate_repository(path)
 
 
+def with_git_info(repository: Repository, metadata: Optional[RepositoryMetadata]) -> RepositorySchema:
+    """Attach cached git state to a repository response."""
+    response = RepositorySchema.model_validate(repository)
+    if metadata is not None:
+        response.git = RepositoryGitInfo(
+            head_branch=metadata.head_branch,
+            head_commit=metadata.head_commit,
+            branches=metadata.branches,
+            worktrees=metadata.worktrees,
+            is_dirty=metadata.is_dirty
+        )
+    return response
+
+
 @router.post("/", response_model=RepositorySchema, status_code=status.HTTP_201_CREATED)
 async def create_repository(
     repository: RepositoryCreate,
     db: AsyncSession = Depends(get_db)
 ):
-    """Create a new repository."""
+    """Create a new repository from a local checkout or a remote URL."""
+    if repository.remote_url:
+        # Clone (or refresh) this host's bare mirror; worktrees are created from it
+        mirrors = get_mirror_manager()
+        try:
+            mirror_path = await mirrors.ensure(repository.remote_url)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Failed to clone {repository.remote_url}: {e}"
+            )
+        repository.path = str(mirror_path)
+        if "default_branch" not in repository.model_fields_set:
+            repository.default_branch = (
+                await mirrors.default_branch(repository.remote_url) or repository.default_branch
+            )
+    
     # Validate path exists
     if not os.path.exists(repository.path):
         raise HTTPException(
@@ -60,10 +101,94 @@ async def create_repository(
     return db_repo
 
 
+@router.post("/discover")
+async def discover_repositories(request: RepositoryDiscover):
+    """Find git repositories under a directory and register the new ones in one transaction.
+    
+    Progress is streamed as newline-delimited JSON events: ``found``,
+    ``skipped`` and ``invalid`` per candidate, then ``done`` (or ``error``).
+    A candidate is skipped when it resolves to a registered path or to one
+    found earlier.
+    """
+    if not os.path.isdir(request.root):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Path {request.root} is not a directory"
+        )
+    
+    async def progress():
+        # The request's session closes once the response starts: the stream opens its own
+        async with AsyncSessionLocal() as db:
+            async for event in _discover_and_register(db, request):
+                yield event
+    
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+async def _discover_and_register(db: AsyncSession, request: RepositoryDiscover):
+    """Progress events of a repository discovery, registering what it found unless it is a dry run."""
+    # Stored paths may be relative or go through symlinks; compare where they really point
+    seen_paths = {
+        _resolve_path(path) for path in (await db.execute(select(Repository.path))).scalars().all()
+    }
+    found = []
+    skipped = invalid = 0
+    
+    async for candidate in get_repository_discovery().discover(request.root, request.max_depth):
+        if candidate.error:
+            invalid += 1
+            yield json.dumps({"type": "invalid", **candidate.to_dict()}) + "\n"
+        elif _resolve_path(candidate.path) in seen_paths:
+            skipped += 1
+            yield json.dumps({"type": "skipped", **candidate.to_dict()}) + "\n"
+        else:
+            seen_paths.add(_resolve_path(candidate.path))
+            found.append(candidate)
+            yield json.dumps({"type": "found", **candidate.to_dict()}) + "\n"
+    
+    repositories = [
+        Repository(
+            name=candidate.name,
+            path=candidate.path,
+            default_branch=candidate.default_branch or "main"
+        )
+        for candidate in found
+    ]
+    if repositories and not request.dry_run:
+        try:
+            db.add_all(repositories)
+            await db.flush()
+            registered = [
+                {"id": str(repo.id), "name": repo.name, "path": repo.path}
+                for repo in repositories
+            ]
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            yield json.dumps({"type": "error", "detail": f"Failed to register repositories: {e}"}) + "\n"
+            return
+    else:
+        registered = []
+    
+    yield json.dumps({
+        "type": "done",
+        "dry_run": request.dry_run,
+        "found": len(found),
+        "skipped": skipped,
+        "invalid": invalid,
+        "registered": registered
+    }) + "\n"
+
+
+def _resolve_path(path: str) -> str:
+    return str(Path(path).expanduser().resolve())
+
+
 @router.get("/", response_model=List[RepositorySchema])
 async def list_repositories(
     skip: int = 0,
     limit: int = 100,
+    include_git: bool = True,
     db: AsyncSession = Depends(get_db)
 ):
     """List all repositories."""
@@ -72,7 +197,13 @@ async def list_repositories(
     ).offset(skip).limit(limit)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    repositories = result.scalars().all()
+    
+    if not include_git:
+        return repositories
+    
+    metadata = await get_repository_metadata_cache().get_many([repo.path for repo in repositories])
+    return [with_git_info(repo, metadata[repo.path]) for repo in repositories]
 
 
 @router.get("/{repository_id}", response_model=RepositorySchema)
@@ -91,7 +222,7 @@ async def get_repository(
             detail="Repository not found"
         )
     
-    return repository
+    return with_git_info(repository, await get_repository_metadata_cache().get(repository.path))
 
 
 @router.patch("/{repository_id}", response_model=RepositorySchema)
@@ -116,6 +247,12 @@ async def update_repository(
     for field, value in update_data.items():
         setattr(repository, field, value)
     
+    if repository.install_policy == InstallPolicy.CUSTOM and not repository.install_command:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="install_command is required for the custom install policy"
+        )
+    
     await db.commit()
     await db.refresh(repository)
     
@@ -173,4 +310,76 @@ async def get_repository_tasks(
     ]
 
 
+@router.get("/{repository_id}/installs", response_model=List[DependencyInstallSchema])
+async def get_repository_installs(
+    repository_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the dependency install history of a repository, newest first."""
+    query = select(Repository).where(Repository.id == repository_id)
+    result = await db.execute(query)
+    repository = result.scalar_one_or_none()
+    
+    if not repository:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Repository not found"
+        )
+    
+    query = select(DependencyInstall).where(
+        DependencyInstall.repository_id == repository_id
+    ).order_by(DependencyInstall.created_at.desc()).offset(skip).limit(limit)
+    
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.get("/{repository_id}/maintenance", response_model=List[RepositoryMaintenanceSchema])
+async def get_repository_maintenance(
+    repository_id: UUID,
+    skip: int = 0,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the git maintenance history of a repository, newest first."""
+    query = select(Repository).where(Repository.id == repository_id)
+    result = await db.execute(query)
+    repository = result.scalar_one_or_none()
+    
+    if not repository:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Repository not found"
+        )
+    
+    query = select(RepositoryMaintenance).where(
+        RepositoryMaintenance.repository_id == repository_id
+    ).order_by(RepositoryMaintenance.created_at.desc()).offset(skip).limit(limit)
+    
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+@router.post("/{repository_id}/maintenance", status_code=status.HTTP_202_ACCEPTED)
+async def run_repository_maintenance(
+    repository_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue git maintenance for a repository now, even if it is not idle."""
+    query = select(Repository).where(Repository.id == repository_id)
+    result = await db.execute(query)
+    repository = result.scalar_one_or_none()
+    
+    if not repository:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Repository not found"
+        )
+    
+    result = maintain_repositories.delay(repository_id=str(repository_id))
+    return {"message": "Repository maintenance queued", "job_id": result.id}
+
+
 import os
\ No newline at end of file
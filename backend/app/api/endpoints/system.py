@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.services.git_scheduler import git_scheduler
+from app.services.worktree_gc import get_worktree_gc
+from app.services.task_queue import collect_worktrees
+
+router = APIRouter()
+
+
+@router.get("/worktrees")
+async def get_worktree_usage(db: AsyncSession = Depends(get_db)):
+    """Report worktree disk usage and what garbage collection would evict (dry run)."""
+    report = await get_worktree_gc().collect(db, dry_run=True)
+    return report.to_dict()
+
+
+@router.post("/worktrees/gc", status_code=status.HTTP_202_ACCEPTED)
+async def collect_worktrees_now(
+    dry_run: bool = Query(False)
+):
+    """Queue a worktree garbage collection pass on the workers."""
+    result = collect_worktrees.delay(dry_run=dry_run)
+    return {"message": "Worktree garbage collection queued", "job_id": result.id}
+
+
+@router.get("/git")
+async def get_git_metrics():
+    """Per-repository git operation and lock contention counters for this API process."""
+    return {"repositories": git_scheduler.metrics()}
\ No newline at end of file
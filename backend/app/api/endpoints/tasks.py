@@ -1,18 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy import select, and_, tuple_
+from sqlalchemy.orm import selectinload, noload
+from typing import Any, Dict, List, Optional
 from uuid import UUID
+import os
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.models import Task, Repository, TaskStatus
 from app.schemas.task import (
     Task as TaskSchema,
     TaskCreate,
-    TaskOutput
+    TaskBatchCreate,
+    TaskBatchItem,
+    TaskBatchResult,
+    TaskOutput,
+    TaskDiff,
+    TaskFileDiff
 )
-from app.services.task_queue import execute_task
+from app.services.git_manager import GitWorktreeManager
+from app.services.task_diff import get_task_diff_service
+from app.services.task_queue import dispatch_tasks
+from app.services.task_scheduler import TaskForecast, get_task_scheduler
 
 router = APIRouter()
 
@@ -49,8 +59,15 @@ async def create_task(
             detail=f"Branch '{task.branch_name}' already has an active task"
         )
     
+    error = _dependency_error(task, await _load_dependencies(db, [task]))
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
     # Create task
-    db_task = Task(**task.dict())
+    db_task = _new_task(task)
     db.add(db_task)
     await db.commit()
     await db.refresh(db_task)
@@ -60,18 +77,113 @@ async def create_task(
     result = await db.execute(query)
     db_task = result.scalar_one()
     
-    # Queue task for execution
-    execute_task.delay(
-        str(db_task.id),
-        str(repository.id),
-        repository.path,
-        db_task.branch_name,
-        db_task.instructions
-    )
+    # Queue task for execution; the scheduler decides when it starts
+    dispatch_tasks.delay()
     
     return db_task
 
 
+async def _load_dependencies(db: AsyncSession, specs: List[TaskCreate]) -> Dict[UUID, Any]:
+    """Repository and status of every task the specs depend on, in one query."""
+    parent_ids = {parent_id for spec in specs for parent_id in spec.depends_on or []}
+    if not parent_ids:
+        return {}
+    query = select(Task.id, Task.repository_id, Task.status).where(Task.id.in_(parent_ids))
+    return {row.id: row for row in (await db.execute(query)).all()}
+
+
+def _dependency_error(spec: TaskCreate, parents: Dict[UUID, Any]) -> Optional[str]:
+    for parent_id in spec.depends_on or []:
+        parent = parents.get(parent_id)
+        if parent is None:
+            return f"Dependency {parent_id} not found"
+        if parent.repository_id != spec.repository_id:
+            return f"Dependency {parent_id} belongs to another repository"
+        if parent.status in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+            return f"Dependency {parent_id} already {parent.status.value}"
+    return None
+
+
+def _new_task(spec: TaskCreate, **kwargs) -> Task:
+    # Dependency ids are stored as strings, without repeats
+    depends_on = [str(parent_id) for parent_id in dict.fromkeys(spec.depends_on)] if spec.depends_on else None
+    return Task(**spec.dict(exclude={"depends_on"}), depends_on=depends_on, **kwargs)
+
+
+def _apply_forecast(task: Task, forecast: Optional[TaskForecast]) -> None:
+    if forecast is not None:
+        task.queue_position = forecast.queue_position
+        task.expected_duration = forecast.expected_duration
+        task.expected_start_at = forecast.expected_start_at
+        task.expected_finish_at = forecast.expected_finish_at
+
+
+@router.post("/batch", response_model=TaskBatchResult, status_code=status.HTTP_207_MULTI_STATUS)
+async def create_tasks_batch(
+    batch: TaskBatchCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many tasks at once.
+    
+    Every task is validated like a single create; the valid ones are inserted
+    in one transaction and queued together, the others are reported with
+    their error at their position in the request.
+    """
+    if len(batch.tasks) > settings.TASK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.TASK_BATCH_MAX_SIZE} tasks per batch"
+        )
+    
+    # One query for all repositories; without their tasks, which are not needed here
+    repository_ids = {spec.repository_id for spec in batch.tasks}
+    repo_query = select(Repository).options(noload(Repository.tasks)).where(Repository.id.in_(repository_ids))
+    repositories = {repository.id: repository for repository in (await db.execute(repo_query)).scalars().all()}
+    
+    # One query for the branches that already have an active task
+    branches = {(spec.repository_id, spec.branch_name) for spec in batch.tasks}
+    existing_query = select(Task.repository_id, Task.branch_name).where(
+        and_(
+            tuple_(Task.repository_id, Task.branch_name).in_(list(branches)),
+            Task.status.in_([TaskStatus.PENDING, TaskStatus.RUNNING])
+        )
+    )
+    active = set((await db.execute(existing_query)).all())
+    parents = await _load_dependencies(db, batch.tasks)
+    
+    results = []
+    created = []
+    for index, spec in enumerate(batch.tasks):
+        branch = (spec.repository_id, spec.branch_name)
+        repository = repositories.get(spec.repository_id)
+        if repository is None:
+            error = "Repository not found"
+        elif branch in active:
+            error = f"Branch '{spec.branch_name}' already has an active task"
+        else:
+            error = _dependency_error(spec, parents)
+        if error:
+            results.append(TaskBatchItem(index=index, error=error))
+            continue
+        
+        # Later tasks of the batch on the same branch conflict with this one
+        active.add(branch)
+        db_task = _new_task(spec, repository=repository)
+        db.add(db_task)
+        created.append((index, db_task))
+        results.append(None)
+    
+    if created:
+        await db.commit()
+        for index, db_task in created:
+            results[index] = TaskBatchItem(index=index, task=TaskSchema.model_validate(db_task))
+        
+        # One dispatch for the whole batch; the scheduler decides when each starts
+        dispatch_tasks.delay()
+    
+    return TaskBatchResult(created=len(created), failed=len(results) - len(created), results=results)
+
+
 @router.get("/", response_model=List[TaskSchema])
 async def list_tasks(
     repository_id: Optional[UUID] = Query(None),
@@ -94,6 +206,11 @@ async def list_tasks(
     result = await db.execute(query)
     tasks = result.scalars().all()
     
+    if any(task.status in (TaskStatus.PENDING, TaskStatus.RUNNING) for task in tasks):
+        forecasts = await get_task_scheduler().forecast(db)
+        for task in tasks:
+            _apply_forecast(task, forecasts.get(task.id))
+    
     return tasks
 
 
@@ -113,6 +230,9 @@ async def get_task(
             detail="Task not found"
         )
     
+    if task.status in (TaskStatus.PENDING, TaskStatus.RUNNING):
+        _apply_forecast(task, (await get_task_scheduler().forecast(db)).get(task.id))
+    
     return task
 
 
@@ -146,6 +266,106 @@ async def cancel_task(
     return {"message": "Task cancelled successfully"}
 
 
+@router.post("/{task_id}/preempt", status_code=status.HTTP_202_ACCEPTED)
+async def preempt_task(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Ask a running task to checkpoint its worktree, stop, and go back to the queue."""
+    query = select(Task).where(Task.id == task_id)
+    result = await db.execute(query)
+    task = result.scalar_one_or_none()
+    
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    if task.status != TaskStatus.RUNNING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot preempt task in {task.status} status"
+        )
+    
+    task.preempt_requested = True
+    db.add(task)
+    await db.commit()
+    
+    return {"message": "Task preemption requested"}
+
+
+@router.post("/{task_id}/resume", response_model=TaskSchema)
+async def resume_task(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Requeue a failed task (e.g. one that timed out) from its latest checkpoint."""
+    query = select(Task).where(Task.id == task_id)
+    result = await db.execute(query)
+    task = result.scalar_one_or_none()
+    
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    try:
+        await task.requeue(db, reason="Resumed from checkpoint")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Reload the relationship expired by the refresh
+    query = select(Task).options(selectinload(Task.repository)).where(Task.id == task_id)
+    result = await db.execute(query)
+    task = result.scalar_one()
+    
+    dispatch_tasks.delay()
+    
+    return task
+
+
+@router.post("/{task_id}/pin", response_model=TaskSchema)
+async def pin_task(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Keep a task's worktree on disk regardless of worktree quotas."""
+    return await _set_pinned(db, task_id, True)
+
+
+@router.post("/{task_id}/unpin", response_model=TaskSchema)
+async def unpin_task(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Allow a task's worktree to be evicted again."""
+    return await _set_pinned(db, task_id, False)
+
+
+async def _set_pinned(db: AsyncSession, task_id: UUID, pinned: bool) -> Task:
+    query = select(Task).options(selectinload(Task.repository)).where(Task.id == task_id)
+    result = await db.execute(query)
+    task = result.scalar_one_or_none()
+    
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    task.is_pinned = pinned
+    db.add(task)
+    await db.commit()
+    await db.refresh(task)
+    
+    return task
+
+
 @router.get("/{task_id}/output", response_model=TaskOutput)
 async def get_task_output(
     task_id: UUID,
@@ -168,6 +388,72 @@ async def get_task_output(
     )
 
 
+@router.get("/{task_id}/diff", response_model=TaskDiff)
+async def get_task_diff(
+    task_id: UUID,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a page of per-file unified diffs of a task's changes against its base commit."""
+    query = select(Task).options(selectinload(Task.repository)).where(Task.id == task_id)
+    result = await db.execute(query)
+    task = result.scalar_one_or_none()
+    
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    if not task.base_commit:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task has no changes to show yet"
+        )
+    
+    diff_service = get_task_diff_service()
+    repo_path = task.repository.path
+    result_tree, diffstat = task.result_tree, task.diffstat
+    
+    if diffstat is None:
+        # Still running: diff the worktree as it is now
+        if not task.worktree_path or not os.path.isdir(task.worktree_path):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task worktree no longer exists"
+            )
+        try:
+            result_tree = await GitWorktreeManager().snapshot_tree(task.worktree_path)
+        except RuntimeError:
+            # The worktree was removed or is being rewritten while we read it
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Task worktree is changing, try again"
+            )
+        diffstat = await diff_service.diffstat(repo_path, task.base_commit, result_tree)
+    
+    start = (page - 1) * per_page
+    files = await diff_service.file_diffs(
+        repo_path,
+        task.base_commit,
+        result_tree,
+        diffstat["files"][start:start + per_page]
+    )
+    
+    return TaskDiff(
+        task_id=task.id,
+        base_commit=task.base_commit,
+        result_tree=result_tree,
+        files_changed=diffstat["files_changed"],
+        additions=diffstat["additions"],
+        deletions=diffstat["deletions"],
+        page=page,
+        per_page=per_page,
+        files=[TaskFileDiff(**vars(f)) for f in files]
+    )
+
+
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: UUID,
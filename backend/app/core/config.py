@@ -34,9 +34,75 @@ class Settings(BaseSettings):
     CLAUDE_MODEL: str = os.getenv("CLAUDE_MODEL", "opus-4")
     CLAUDE_TIMEOUT: int = 3600  # 1 hour timeout for Claude tasks
     
+    # Task Checkpoints (preemptible, resumable tasks)
+    TASK_CHECKPOINT_INTERVAL: int = 0  # seconds between worktree checkpoints; 0 checkpoints only on preemption
+    TASK_PREEMPT_POLL_SECONDS: float = 5.0  # how often running tasks check for preemption requests
+    TASK_CHECKPOINT_PUSH: bool = False  # push checkpoints of remote repositories so other hosts can resume them
+    
+    # Task Scheduling (priorities, weighted fair dispatch across repositories)
+    TASK_DISPATCH_CAPACITY: int = 8  # tasks running or handed to workers at once; match the workers' total concurrency
+    TASK_DISPATCH_INTERVAL: int = 30  # seconds between dispatch passes besides those on task creation and completion
+    TASK_DISPATCH_TIMEOUT: int = 600  # a dispatched task not claimed by a worker by then is presumed lost and dispatched again
+    TASK_BATCH_MAX_SIZE: int = 100  # tasks accepted by one POST /tasks/batch request
+    TASK_SCHEDULING_POLICY: str = "fair"  # "fair" (weighted by repository) or "shortest" (shortest expected task first)
+    TASK_SJF_AGING_SECONDS: int = 900  # under "shortest", a task waiting this long competes as if half as long
+    
+    # Task Durations (expected run times, queue ETAs)
+    TASK_DURATION_HISTORY: int = 1000  # most recently completed tasks the duration model learns from
+    TASK_DURATION_HALF_LIFE: int = 20  # a task counts half as much per this many newer ones of its repository
+    TASK_DURATION_DEFAULT: int = 900  # seconds expected of a task before any task completed
+    TASK_DURATION_MODEL_TTL: int = 300  # seconds before the model is refitted
+    
+    # Async Worker (many tasks per process on one event loop)
+    ASYNC_WORKER_CONCURRENCY: int = 32  # tasks run at once by one async worker process
+    ASYNC_WORKER_HEARTBEAT_SECONDS: float = 2.0  # interval of the worker heartbeat events
+    ASYNC_WORKER_SHUTDOWN_TIMEOUT: float = 60.0  # seconds running tasks get to wind down before they are cancelled
+    
     # Worktree Settings
     WORKTREE_BASE_PATH: str = os.getenv("WORKTREE_BASE_PATH", "~/.devbud/worktrees")
-    MAX_CONCURRENT_TASKS_PER_REPO: int = 3
+    MAX_CONCURRENT_TASKS_PER_REPO: int = 3  # unless the repository sets max_concurrent_tasks
+    TASK_SLOT_LEASE_SECONDS: int = 60  # a dead worker's repository slot is recovered after this long
+    TASK_SLOT_RETRY_SECONDS: int = 10  # tasks over their repository's limit are retried this much later
+    WORKTREE_QUOTA_BYTES: int = 100 * 1024 ** 3  # 100 GiB across all repositories
+    WORKTREE_REPOSITORY_QUOTA_BYTES: int = 20 * 1024 ** 3  # 20 GiB per repository
+    WORKTREE_GC_INTERVAL: int = 900  # seconds between garbage collection passes
+    
+    # Repository Mirrors (repositories registered by remote URL)
+    MIRROR_BASE_PATH: str = os.getenv("MIRROR_BASE_PATH", "~/.devbud/mirrors")
+    GIT_FETCH_TIMEOUT: int = 600  # seconds
+    GIT_FETCH_FRESHNESS_SECONDS: float = 30.0  # reuse a base branch fetch this recent
+    REPO_DISCOVERY_CONCURRENCY: int = 16  # directory listings and git probes in flight during discovery
+    
+    # Git Maintenance (repack, commit-graph, ref packing, task branch pruning)
+    MAINTENANCE_CHECK_INTERVAL: int = 1800  # seconds between checks for repositories due for maintenance
+    MAINTENANCE_INTERVAL_SECONDS: int = 86400  # minimum seconds between runs on one repository
+    MAINTENANCE_IDLE_SECONDS: int = 600  # a repository must have had no task activity for this long
+    
+    # Dependency Cache Settings
+    DEPENDENCY_CACHE_ENABLED: bool = True
+    DEPENDENCY_CACHE_PATH: str = os.getenv("DEPENDENCY_CACHE_PATH", "~/.devbud/cache/dependencies")
+    DEPENDENCY_CACHE_MAX_BYTES: int = 20 * 1024 ** 3  # 20 GiB
+    DEPENDENCY_CACHE_LINK_MODE: str = "auto"  # auto (reflink, then copy), hardlink (shares inodes with the cache) or copy
+    DEPENDENCY_INSTALL_TIMEOUT: int = 1800  # default when a repository sets no install timeout
+    
+    # Repository Metadata Cache
+    REPO_METADATA_CACHE_REDIS: bool = False  # share cached metadata between processes
+    REPO_METADATA_CACHE_TTL: int = 3600  # seconds a shared entry is kept in Redis
+    REPO_METADATA_DIRTY_TTL: float = 10.0  # seconds before the working tree is rechecked for changes
+    
+    # Task Verification
+    TASK_VERIFY_TIMEOUT: int = 1800  # seconds per run, unless the repository sets verify_timeout
+    
+    # Merge Trains
+    MERGE_TRAIN_VERIFY_TIMEOUT: int = 1800  # seconds per verification run
+    
+    # Task Diffs
+    TASK_DIFF_MAX_FILE_BYTES: int = 256 * 1024  # larger per-file patches are truncated
+    TASK_DIFF_CACHE_BYTES: int = 64 * 1024 ** 2  # in-process cache of generated patches
+    
+    # Live File Changes (streamed from running tasks' worktrees)
+    WORKTREE_WATCH_ENABLED: bool = True
+    WORKTREE_WATCH_DEBOUNCE_MS: int = 500  # changes within this window are published together
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -2,11 +2,15 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True if settings.LOG_LEVEL == "DEBUG" else False,
-    future=True
-)
+def _create_engine():
+    return create_async_engine(
+        settings.DATABASE_URL,
+        echo=True if settings.LOG_LEVEL == "DEBUG" else False,
+        future=True
+    )
+
+
+engine = _create_engine()
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -28,4 +32,22 @@ async def get_db() -> AsyncSession:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+def configure_process_engine() -> None:
+    """Give a forked worker process its own engine and connection pool.
+    
+    Connections inherited from the parent are abandoned without being closed,
+    as they still belong to it. The session factory is rebound, so every
+    module that imported it uses the new pool.
+    """
+    global engine
+    engine.sync_engine.dispose(close=False)
+    engine = _create_engine()
+    AsyncSessionLocal.configure(bind=engine)
+
+
+async def dispose_engine() -> None:
+    """Close the current engine's pooled connections."""
+    await engine.dispose()
\ No newline at end of file
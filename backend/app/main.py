@@ -1,11 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from loguru import logger
+import asyncio
 
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.api.endpoints import repositories, tasks, websocket
+from app.api.endpoints import repositories, tasks, websocket, system, merge_trains
+from app.services.websocket_manager import relay_task_messages
 
 
 @asynccontextmanager
@@ -15,9 +17,14 @@ async def lifespan(app: FastAPI):
     # Create database tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Relay task output published by workers to WebSocket clients
+    relay = asyncio.create_task(relay_task_messages())
     yield
     # Shutdown
     logger.info("Shutting down DevBud API...")
+    relay.cancel()
+    with suppress(asyncio.CancelledError):
+        await relay
     await engine.dispose()
 
 
@@ -48,6 +55,16 @@ app.include_router(
     prefix=f"{settings.API_V1_STR}/tasks",
     tags=["tasks"]
 )
+app.include_router(
+    merge_trains.router,
+    prefix=f"{settings.API_V1_STR}/merge-trains",
+    tags=["merge-trains"]
+)
+app.include_router(
+    system.router,
+    prefix=f"{settings.API_V1_STR}/system",
+    tags=["system"]
+)
 app.include_router(
     websocket.router,
     prefix="/ws",
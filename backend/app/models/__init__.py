@@ -1,4 +1,19 @@
-from app.models.repository import Repository
-from app.models.task import Task, TaskStatus
+from app.models.repository import Repository, InstallPolicy, BranchPrunePolicy
+from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.dependency_install import DependencyInstall
+from app.models.repository_maintenance import RepositoryMaintenance
+from app.models.merge_train import MergeTrain
+from app.models.verification_result import VerificationResult
 
-__all__ = ["Repository", "Task", "TaskStatus"]
\ No newline at end of file
+__all__ = [
+    "Repository",
+    "InstallPolicy",
+    "BranchPrunePolicy",
+    "Task",
+    "TaskStatus",
+    "TaskPriority",
+    "DependencyInstall",
+    "RepositoryMaintenance",
+    "MergeTrain",
+    "VerificationResult",
+]
\ No newline at end of file
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, DateTime, Text, Float, ForeignKey, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from app.core.database import Base
+from app.models.repository import InstallPolicy
+
+
+class DependencyInstall(Base):
+    """A dependency installation (or deliberate skip) performed for a task's worktree."""
+    __tablename__ = "dependency_installs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    repository_id = Column(UUID(as_uuid=True), ForeignKey("repositories.id"), nullable=False, index=True)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True)
+    base_commit = Column(String(40), nullable=True)
+    lockfile_hash = Column(String(64), nullable=True)
+    policy = Column(SQLEnum(InstallPolicy), nullable=False)
+    command = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False)  # succeeded, failed or skipped
+    duration_seconds = Column(Float, nullable=False, default=0.0)
+    error_message = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    @classmethod
+    async def last_successful(
+        cls,
+        db: AsyncSession,
+        repository_id,
+        base_commit: Optional[str] = None
+    ) -> Optional["DependencyInstall"]:
+        """Get the most recent successful install for a repository, or for one of its base commits."""
+        query = select(cls).where(
+            cls.repository_id == repository_id,
+            cls.status == "succeeded"
+        )
+        if base_commit is not None:
+            query = query.where(cls.base_commit == base_commit)
+        query = query.order_by(cls.created_at.desc()).limit(1)
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from app.core.database import Base
+
+
+class MergeTrain(Base):
+    """A speculative merge of completed task branches into one integration branch."""
+    __tablename__ = "merge_trains"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    repository_id = Column(UUID(as_uuid=True), ForeignKey("repositories.id"), nullable=False, index=True)
+    integration_branch = Column(String(100), nullable=False)
+    task_ids = Column(JSON, nullable=False)  # merge order
+    verify_command = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, succeeded, failed
+    
+    # Outcome: the integration branch points at head_commit; report lists every task's fate
+    base_commit = Column(String(40), nullable=True)
+    head_commit = Column(String(40), nullable=True)
+    report = Column(JSON, nullable=True)
+    error_message = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
\ No newline at end of file
@@ -1,23 +1,62 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, BigInteger, JSON, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
 import uuid
+import enum
 
 from app.core.database import Base
 
 
+class InstallPolicy(str, enum.Enum):
+    NEVER = "never"
+    ALWAYS = "always"
+    ON_LOCKFILE_CHANGE = "on_lockfile_change"
+    CUSTOM = "custom"
+
+
+class BranchPrunePolicy(str, enum.Enum):
+    NEVER = "never"
+    MERGED = "merged"  # finished task branches merged into the default branch
+    FINISHED = "finished"  # every finished task branch whose worktree is gone
+
+
 class Repository(Base):
     __tablename__ = "repositories"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
     path = Column(String, nullable=False, unique=True)
+    remote_url = Column(String, nullable=True)  # set when registered by URL; path is then the local bare mirror
     default_branch = Column(String(100), nullable=False, default="main")
     description = Column(Text, nullable=True)
     
+    # Dependency installation
+    install_policy = Column(SQLEnum(InstallPolicy), nullable=False, default=InstallPolicy.ALWAYS)
+    install_command = Column(Text, nullable=True)
+    install_timeout = Column(Integer, nullable=True)  # seconds
+    
+    # Verification run on every completed task's result and on its base commit
+    verify_command = Column(Text, nullable=True)
+    verify_timeout = Column(Integer, nullable=True)  # seconds
+    
+    # Git maintenance
+    branch_prune_policy = Column(SQLEnum(BranchPrunePolicy), nullable=False, default=BranchPrunePolicy.MERGED)
+    
+    # Sparse-checkout cone directories for task worktrees (None checks out everything)
+    sparse_patterns = Column(JSON, nullable=True)
+    
+    # Tasks running at once; falls back to MAX_CONCURRENT_TASKS_PER_REPO
+    max_concurrent_tasks = Column(Integer, nullable=True)
+    
+    # Share of dispatches relative to other repositories with waiting tasks
+    scheduling_weight = Column(Integer, nullable=False, default=1)
+    
+    # Worktree disk quota override; falls back to WORKTREE_REPOSITORY_QUOTA_BYTES
+    worktree_quota_bytes = Column(BigInteger, nullable=True)
+    
     # Soft delete fields
     is_active = Column(Boolean, default=True, nullable=False)
     deleted_at = Column(DateTime, nullable=True)
@@ -29,6 +68,13 @@ class Repository(Base):
     # Relationships
     tasks = relationship("Task", back_populates="repository", lazy="selectin")
     
+    @property
+    def default_ref(self) -> str:
+        """Ref of the default branch; mirrors keep the remote's branches under refs/remotes/origin."""
+        if self.remote_url:
+            return f"refs/remotes/origin/{self.default_branch}"
+        return f"refs/heads/{self.default_branch}"
+    
     async def get_tasks(self, db: AsyncSession):
         """Get all tasks for this repository."""
         from app.models.task import Task
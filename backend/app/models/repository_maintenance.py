@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, DateTime, Text, Float, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from app.core.database import Base
+
+
+class RepositoryMaintenance(Base):
+    """A git maintenance run on a repository, with metadata query timings before and after."""
+    __tablename__ = "repository_maintenance"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    repository_id = Column(UUID(as_uuid=True), ForeignKey("repositories.id"), nullable=False, index=True)
+    status = Column(String(20), nullable=False)  # succeeded or failed
+    tasks = Column(JSON, nullable=False)  # git maintenance tasks that were run
+    pruned_branches = Column(JSON, nullable=True)
+    before = Column(JSON, nullable=True)  # timings (seconds) and object counts
+    after = Column(JSON, nullable=True)
+    duration_seconds = Column(Float, nullable=False, default=0.0)
+    error_message = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    @classmethod
+    async def last_run(cls, db: AsyncSession, repository_id) -> Optional["RepositoryMaintenance"]:
+        """Get the most recent maintenance run for a repository."""
+        query = select(cls).where(
+            cls.repository_id == repository_id
+        ).order_by(cls.created_at.desc()).limit(1)
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
\ No newline at end of file
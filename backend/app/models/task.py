@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum, UniqueConstraint
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, JSON, ForeignKey, Enum as SQLEnum, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,6 +17,12 @@ class TaskStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+class TaskPriority(str, enum.Enum):
+    URGENT = "urgent"
+    NORMAL = "normal"
+    BATCH = "batch"
+
+
 class Task(Base):
     __tablename__ = "tasks"
     
@@ -25,10 +31,47 @@ class Task(Base):
     branch_name = Column(String(100), nullable=False)
     instructions = Column(Text, nullable=False)
     status = Column(SQLEnum(TaskStatus), nullable=False, default=TaskStatus.PENDING)
+    priority = Column(SQLEnum(TaskPriority), nullable=False, default=TaskPriority.NORMAL)
     worktree_path = Column(String, nullable=True)
     output = Column(Text, nullable=True)
     error_message = Column(Text, nullable=True)
     
+    # Sparse-checkout cone directories; overrides the repository's patterns
+    sparse_patterns = Column(JSON, nullable=True)
+    
+    # Pinned tasks keep their worktree regardless of disk quotas
+    is_pinned = Column(Boolean, nullable=False, default=False)
+    
+    # Task result: base commit the worktree was created from, tree of the final worktree contents
+    base_commit = Column(String(40), nullable=True)
+    result_tree = Column(String(40), nullable=True)
+    diffstat = Column(JSON, nullable=True)
+    
+    # Repository verification of the result tree compared with the base commit's tree:
+    # passed, fixed (base fails), regressed (base passes), failing (both fail), failed
+    # (no base commit to compare with) or error
+    verification_status = Column(String(20), nullable=True)
+    verification = Column(JSON, nullable=True)
+    
+    # Checkpoints: the worktree is committed to refs/devbud/checkpoints/<id> every
+    # checkpoint_interval seconds, so a preempted task resumes from the latest one
+    checkpoint_interval = Column(Integer, nullable=True)
+    checkpoint_commit = Column(String(40), nullable=True)
+    checkpointed_at = Column(DateTime, nullable=True)
+    preempt_requested = Column(Boolean, nullable=False, default=False)
+    preemptions = Column(Integer, nullable=False, default=0)
+    
+    # Set when the scheduler hands the pending task to the workers, then refreshed by the
+    # worker starting it until it runs: a task whose dispatch time goes stale was lost
+    dispatched_at = Column(DateTime, nullable=True)
+    
+    # Ids of the tasks this one builds on: it is dispatched once they all completed, starts
+    # from their results instead of the default branch, and is cancelled if one fails
+    depends_on = Column(JSON, nullable=True)
+    
+    # Seconds spent in each startup stage (checkout, install, runner, startup)
+    startup_timings = Column(JSON, nullable=True)
+    
     # Timestamps
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
@@ -53,7 +96,8 @@ class Task(Base):
         self.status = TaskStatus.RUNNING
         self.started_at = datetime.utcnow()
         self.worktree_path = worktree_path
-        self.output = f"Task started at {self.started_at}\n"
+        # Keep any startup output (e.g. dependency installs) streamed before this point
+        self.output = (self.output or "") + f"Task started at {self.started_at}\n"
         
         db.add(self)
         await db.commit()
@@ -89,6 +133,30 @@ class Task(Base):
         await db.commit()
         await db.refresh(self)
     
+    async def requeue(self, db: AsyncSession, reason: str = ""):
+        """Return a task to the queue to resume from its latest checkpoint.
+        
+        Running tasks are requeued when preempted; failed tasks only if they
+        have a checkpoint to resume from.
+        """
+        if self.status == TaskStatus.RUNNING:
+            self.preemptions = (self.preemptions or 0) + 1
+        elif not (self.status == TaskStatus.FAILED and self.checkpoint_commit):
+            raise ValueError(f"Cannot requeue task in {self.status} status without a checkpoint")
+        
+        self.status = TaskStatus.PENDING
+        self.worktree_path = None
+        self.dispatched_at = None
+        self.preempt_requested = False
+        self.completed_at = None
+        self.output = (self.output or "") + f"\nTask requeued at {datetime.utcnow()}\n"
+        if reason:
+            self.output = (self.output or "") + f"Reason: {reason}\n"
+        
+        db.add(self)
+        await db.commit()
+        await db.refresh(self)
+    
     async def append_output(self, db: AsyncSession, output: str):
         """Append output to the task log."""
         self.output = (self.output or "") + f"{output}\n"
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from app.core.database import Base
+
+
+class VerificationResult(Base):
+    """Outcome of a repository's verification command on one tree, shared by every task producing it."""
+    __tablename__ = "verification_results"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    repository_id = Column(UUID(as_uuid=True), ForeignKey("repositories.id"), nullable=False, index=True)
+    tree = Column(String(40), nullable=False)
+    command_hash = Column(String(64), nullable=False)  # sha256 of the verification command
+    passed = Column(Boolean, nullable=False)
+    duration_seconds = Column(Float, nullable=False, default=0.0)
+    output = Column(Text, nullable=True)  # tail of the command's output
+    
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('repository_id', 'tree', 'command_hash',
+                        name='_verification_tree_uc'),
+    )
+    
+    @classmethod
+    async def lookup(
+        cls, db: AsyncSession, repository_id, tree: str, command_hash: str
+    ) -> Optional["VerificationResult"]:
+        """Get the cached result of a command on a tree."""
+        query = select(cls).where(
+            cls.repository_id == repository_id,
+            cls.tree == tree,
+            cls.command_hash == command_hash
+        )
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
\ No newline at end of file
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field, validator
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from uuid import UUID
+
+
+class MergeTrainCreate(BaseModel):
+    repository_id: UUID
+    task_ids: List[UUID] = Field(..., min_length=1)  # merge order
+    integration_branch: Optional[str] = Field(None, min_length=1, max_length=100)
+    verify_command: Optional[str] = Field(None, min_length=1)  # defaults to the repository's
+    
+    @validator("task_ids")
+    def validate_task_ids(cls, v):
+        if len(set(v)) != len(v):
+            raise ValueError("task_ids must not repeat a task")
+        return v
+    
+    @validator("integration_branch")
+    def validate_integration_branch(cls, v):
+        if v is None:
+            return v
+        invalid_chars = [' ', '~', '^', ':', '?', '*', '[', '\\']
+        for char in invalid_chars:
+            if char in v:
+                raise ValueError(f"Branch name cannot contain '{char}'")
+        return v
+
+
+class MergeTrain(BaseModel):
+    id: UUID
+    repository_id: UUID
+    integration_branch: str
+    task_ids: List[UUID]
+    verify_command: Optional[str] = None
+    status: str
+    base_commit: Optional[str] = None
+    head_commit: Optional[str] = None
+    report: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
\ No newline at end of file
@@ -1,35 +1,115 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
+from enum import Enum
 import os
 
 
+class InstallPolicy(str, Enum):
+    NEVER = "never"
+    ALWAYS = "always"
+    ON_LOCKFILE_CHANGE = "on_lockfile_change"
+    CUSTOM = "custom"
+
+
+class BranchPrunePolicy(str, Enum):
+    NEVER = "never"
+    MERGED = "merged"
+    FINISHED = "finished"
+
+
+def validate_sparse_patterns(cls, v):
+    """Normalize sparse-checkout cone directories relative to the repository root."""
+    if v is None:
+        return v
+    
+    patterns = []
+    for pattern in v:
+        pattern = pattern.strip().strip("/")
+        if not pattern or ".." in pattern.split("/") or "\n" in pattern:
+            raise ValueError(f"Invalid sparse-checkout directory: {pattern!r}")
+        patterns.append(pattern)
+    return patterns or None
+
+
 class RepositoryBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     path: str = Field(..., min_length=1)
     default_branch: str = Field(default="main", min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
+    install_policy: InstallPolicy = InstallPolicy.ALWAYS
+    install_command: Optional[str] = Field(None, min_length=1)
+    install_timeout: Optional[int] = Field(None, ge=1)
+    verify_command: Optional[str] = Field(None, min_length=1)
+    verify_timeout: Optional[int] = Field(None, ge=1)
+    max_concurrent_tasks: Optional[int] = Field(None, ge=1)
+    scheduling_weight: int = Field(1, ge=1, le=1000)
+    worktree_quota_bytes: Optional[int] = Field(None, ge=1)
+    sparse_patterns: Optional[List[str]] = None
+    branch_prune_policy: BranchPrunePolicy = BranchPrunePolicy.MERGED
     
     @validator("path")
     def validate_path(cls, v):
+        if v is None:
+            return v
         # Expand user path
         expanded_path = os.path.expanduser(v)
         return os.path.abspath(expanded_path)
+    
+    _validate_sparse_patterns = validator("sparse_patterns", allow_reuse=True)(validate_sparse_patterns)
+    
+    @validator("install_command", always=True)
+    def validate_install_command(cls, v, values):
+        if values.get("install_policy") == InstallPolicy.CUSTOM and not v:
+            raise ValueError("install_command is required for the custom install policy")
+        return v
 
 
 class RepositoryCreate(RepositoryBase):
-    pass
+    path: Optional[str] = Field(None, min_length=1)
+    remote_url: Optional[str] = Field(None, min_length=1)
+    
+    @validator("remote_url", always=True)
+    def validate_source(cls, v, values):
+        if v is None and not values.get("path"):
+            raise ValueError("Either path or remote_url is required")
+        if v is not None and v.startswith("-"):
+            raise ValueError("Invalid remote URL")
+        return v
 
 
 class RepositoryUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     default_branch: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
+    install_policy: Optional[InstallPolicy] = None
+    install_command: Optional[str] = Field(None, min_length=1)
+    install_timeout: Optional[int] = Field(None, ge=1)
+    verify_command: Optional[str] = Field(None, min_length=1)
+    verify_timeout: Optional[int] = Field(None, ge=1)
+    max_concurrent_tasks: Optional[int] = Field(None, ge=1)
+    scheduling_weight: Optional[int] = Field(None, ge=1, le=1000)
+    worktree_quota_bytes: Optional[int] = Field(None, ge=1)
+    sparse_patterns: Optional[List[str]] = None
+    branch_prune_policy: Optional[BranchPrunePolicy] = None
+    
+    _validate_sparse_patterns = validator("sparse_patterns", allow_reuse=True)(validate_sparse_patterns)
+
+
+class RepositoryDiscover(BaseModel):
+    root: str = Field(..., min_length=1)
+    max_depth: int = Field(3, ge=0, le=10)
+    dry_run: bool = False
+    
+    @validator("root")
+    def validate_root(cls, v):
+        return os.path.abspath(os.path.expanduser(v))
 
 
 class RepositoryInDB(RepositoryBase):
     id: UUID
+    remote_url: Optional[str] = None
     is_active: bool
     created_at: datetime
     updated_at: datetime
@@ -39,6 +119,48 @@ class RepositoryInDB(RepositoryBase):
         from_attributes = True
 
 
+class RepositoryGitInfo(BaseModel):
+    head_branch: str
+    head_commit: Optional[str] = None
+    branches: Dict[str, str] = {}
+    worktrees: List[Dict[str, Any]] = []
+    is_dirty: bool = False
+
+
 class Repository(RepositoryInDB):
     task_count: Optional[int] = 0
-    active_task_count: Optional[int] = 0
\ No newline at end of file
+    active_task_count: Optional[int] = 0
+    git: Optional[RepositoryGitInfo] = None
+
+
+class DependencyInstall(BaseModel):
+    id: UUID
+    repository_id: UUID
+    task_id: Optional[UUID] = None
+    base_commit: Optional[str] = None
+    lockfile_hash: Optional[str] = None
+    policy: InstallPolicy
+    command: Optional[str] = None
+    status: str
+    duration_seconds: float
+    error_message: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class RepositoryMaintenance(BaseModel):
+    id: UUID
+    repository_id: UUID
+    status: str
+    tasks: List[Dict[str, Any]] = []
+    pruned_branches: Optional[List[str]] = None
+    before: Optional[Dict[str, Any]] = None
+    after: Optional[Dict[str, Any]] = None
+    duration_seconds: float
+    error_message: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
\ No newline at end of file
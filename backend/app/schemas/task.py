@@ -1,9 +1,11 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from uuid import UUID
 from enum import Enum
 
+from app.schemas.repository import validate_sparse_patterns
+
 
 class TaskStatus(str, Enum):
     PENDING = "pending"
@@ -13,10 +15,21 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class TaskPriority(str, Enum):
+    URGENT = "urgent"
+    NORMAL = "normal"
+    BATCH = "batch"
+
+
 class TaskBase(BaseModel):
     repository_id: UUID
     branch_name: str = Field(..., min_length=1, max_length=100)
     instructions: str = Field(..., min_length=1)
+    priority: TaskPriority = TaskPriority.NORMAL
+    sparse_patterns: Optional[List[str]] = None  # overrides the repository's sparse-checkout directories
+    depends_on: Optional[List[UUID]] = None  # tasks of the same repository this one builds on
+    
+    _validate_sparse_patterns = validator("sparse_patterns", allow_reuse=True)(validate_sparse_patterns)
     
     @validator("branch_name")
     def validate_branch_name(cls, v):
@@ -29,7 +42,7 @@ class TaskBase(BaseModel):
 
 
 class TaskCreate(TaskBase):
-    pass
+    checkpoint_interval: Optional[int] = Field(None, ge=10)  # seconds; defaults to TASK_CHECKPOINT_INTERVAL
 
 
 class TaskUpdate(BaseModel):
@@ -44,6 +57,19 @@ class TaskInDB(TaskBase):
     worktree_path: Optional[str] = None
     output: Optional[str] = None
     error_message: Optional[str] = None
+    is_pinned: bool = False
+    base_commit: Optional[str] = None
+    result_tree: Optional[str] = None
+    diffstat: Optional[Dict[str, Any]] = None
+    verification_status: Optional[str] = None
+    verification: Optional[Dict[str, Any]] = None
+    startup_timings: Optional[Dict[str, float]] = None
+    checkpoint_interval: Optional[int] = None
+    checkpoint_commit: Optional[str] = None
+    checkpointed_at: Optional[datetime] = None
+    preempt_requested: bool = False
+    preemptions: int = 0
+    dispatched_at: Optional[datetime] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     created_at: datetime
@@ -55,6 +81,10 @@ class TaskInDB(TaskBase):
 
 class Task(TaskInDB):
     repository: Optional[Dict[str, Any]] = None  # Simplified repository info
+    queue_position: Optional[int] = None  # 1 is dispatched next; None once dispatched or awaiting dependencies
+    expected_duration: Optional[float] = None  # seconds, predicted from the repository's past tasks
+    expected_start_at: Optional[datetime] = None  # for running tasks, when they started
+    expected_finish_at: Optional[datetime] = None
     
     @validator('repository', pre=True, always=True)
     def serialize_repository(cls, v):
@@ -66,7 +96,44 @@ class Task(TaskInDB):
         return v
 
 
+class TaskBatchCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1)  # at most TASK_BATCH_MAX_SIZE
+
+
+class TaskBatchItem(BaseModel):
+    index: int  # position in the request
+    task: Optional[Task] = None
+    error: Optional[str] = None
+
+
+class TaskBatchResult(BaseModel):
+    created: int
+    failed: int
+    results: List[TaskBatchItem]
+
+
 class TaskOutput(BaseModel):
     task_id: UUID
     output: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskFileDiff(BaseModel):
+    path: str
+    additions: int
+    deletions: int
+    binary: bool = False
+    truncated: bool = False
+    patch: Optional[str] = None
+
+
+class TaskDiff(BaseModel):
+    task_id: UUID
+    base_commit: str
+    result_tree: str
+    files_changed: int
+    additions: int
+    deletions: int
+    page: int
+    per_page: int
+    files: List[TaskFileDiff]
\ No newline at end of file
@@ -0,0 +1,364 @@
+import argparse
+import asyncio
+import os
+import platform
+import queue
+import signal
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from celery import Celery, __version__ as celery_version
+from loguru import logger
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.database import dispose_engine
+from app.models import Task, TaskStatus
+from app.services.git_manager import GitWorktreeManager
+from app.services.task_queue import ASYNC_TASKS, celery_app, get_db_session
+
+
+TaskHandler = Callable[..., Awaitable[Any]]
+
+# How long the consumer thread blocks on the broker before settling and heartbeating again
+DRAIN_SECONDS = 0.2
+
+WORKER_INFO = {"sw_ident": "devbud-async", "sw_ver": celery_version, "sw_sys": platform.system()}
+
+
+@dataclass
+class TaskMessage:
+    """A Celery task message, decoded."""
+    id: str
+    name: str
+    args: Tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    eta: Optional[datetime] = None
+
+
+def decode_message(body: Any, headers: Optional[dict]) -> TaskMessage:
+    """Decode a message in Celery's protocol 2 (task in the headers) or protocol 1 (task in the body)."""
+    headers = headers or {}
+    if "task" in headers:
+        args, kwargs = body[0], body[1]
+        eta = headers.get("eta")
+        task_id, name = headers["id"], headers["task"]
+    else:
+        args, kwargs = body.get("args", ()), body.get("kwargs", {})
+        eta = body.get("eta")
+        task_id, name = body["id"], body["task"]
+    
+    if eta:
+        eta = datetime.fromisoformat(eta)
+        if eta.tzinfo is None:
+            eta = eta.replace(tzinfo=timezone.utc)
+    return TaskMessage(id=task_id, name=name, args=tuple(args or ()), kwargs=kwargs or {}, eta=eta or None)
+
+
+class AsyncWorker:
+    """Runs Celery task messages as coroutines on one event loop, many at once.
+    
+    The Celery workers spend a process per concurrent task, although a task
+    is mostly waiting on its Claude session. This worker consumes the same
+    queue and messages and runs up to ``concurrency`` task coroutines side by
+    side in one process. The broker connection is driven by a thread of its
+    own (kombu is synchronous), which also sends Celery's worker heartbeat
+    events, so Flower and ``celery inspect`` tooling see the worker.
+    
+    A message is fetched only once a task slot is free and acknowledged as
+    its task starts, as Celery does by default, so messages this worker
+    cannot start yet stay in the broker for other workers. Messages with an
+    ETA in the future (retries with a countdown) are held unacknowledged
+    without taking a slot. On shutdown consumption stops, held messages go
+    back to the broker, ``before_shutdown`` is called with the running tasks
+    (to ask them to wind down), and they get ``shutdown_timeout`` seconds
+    to finish before they are cancelled.
+    """
+    
+    def __init__(
+        self,
+        app: Celery,
+        handlers: Dict[str, TaskHandler],
+        concurrency: int = 32,
+        queues: Sequence[str] = ("celery",),
+        heartbeat_interval: float = 2.0,
+        shutdown_timeout: float = 60.0,
+        before_shutdown: Optional[Callable[[List[TaskMessage]], Awaitable[None]]] = None,
+        hostname: Optional[str] = None
+    ):
+        self.app = app
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.queues = list(queues)
+        self.heartbeat_interval = heartbeat_interval
+        self.shutdown_timeout = shutdown_timeout
+        self.before_shutdown = before_shutdown
+        self.hostname = hostname or f"async@{socket.gethostname()}"
+        self.processed = 0
+        self.running: Dict[asyncio.Task, TaskMessage] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        # Free task slots; the consumer thread takes one before it fetches a message
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._consuming = threading.Event()
+        self._cancelled = threading.Event()
+        self._consumer: Optional[threading.Thread] = None
+        # Messages held until their ETA: waiting on the loop, handed back to the consumer thread when due
+        self._held: Dict[asyncio.Task, TaskMessage] = {}
+        self._handed_back: "queue.SimpleQueue[Tuple[str, Any, TaskMessage]]" = queue.SimpleQueue()
+        # State of the consumer thread, which owns the broker connection
+        self._holding = 0
+        self._due: Deque[Tuple[Any, TaskMessage]] = deque()
+        self._reserved = False
+        self._prefetch: Callable[..., Any] = lambda **kwargs: None
+    
+    async def run(self) -> None:
+        """Consume and run tasks until ``stop`` is called, then shut down gracefully."""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._consuming.set()
+        self._cancelled.clear()
+        self._consumer = threading.Thread(target=self._consume, name=f"{self.hostname}-consumer", daemon=True)
+        self._consumer.start()
+        logger.info(f"Async worker {self.hostname} consuming {', '.join(self.queues)} with concurrency {self.concurrency}")
+        
+        try:
+            await self._stopped.wait()
+        finally:
+            await self._shutdown()
+    
+    def stop(self) -> None:
+        """Begin a graceful shutdown; safe to call from any thread or a signal handler."""
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+    
+    async def _shutdown(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Stop taking messages; tasks the consumer already accepted still start
+        self._consuming.clear()
+        await loop.run_in_executor(None, self._cancelled.wait, 10 * DRAIN_SECONDS + 5)
+        await asyncio.sleep(0)
+        logger.info(f"Async worker {self.hostname} shutting down with {len(self.running)} running task(s)")
+        
+        # Messages held for their ETA go back to the broker
+        for waiter in list(self._held):
+            waiter.cancel()
+        await asyncio.gather(*self._held, return_exceptions=True)
+        
+        if self.running and self.before_shutdown is not None:
+            try:
+                await self.before_shutdown(list(self.running.values()))
+            except Exception as e:
+                logger.warning(f"Async worker shutdown hook failed: {e}")
+        
+        if self.running:
+            _, pending = await asyncio.wait(list(self.running), timeout=self.shutdown_timeout)
+            for task in pending:
+                logger.warning(f"Cancelling task {task.get_name()} still running at shutdown")
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        await loop.run_in_executor(None, self._consumer.join)
+        logger.info(f"Async worker {self.hostname} stopped after {self.processed} task(s)")
+    
+    def _consume(self) -> None:
+        """Consumer thread: fetch messages as slots free up, settle held ones, send heartbeats."""
+        while self._consuming.is_set():
+            try:
+                with self.app.connection_for_read() as connection:
+                    self._drain(connection)
+            except Exception as e:
+                if not self._consuming.is_set():
+                    break
+                # Unacknowledged messages of the lost connection are redelivered by the broker
+                logger.warning(f"Async worker lost the broker connection: {e}; reconnecting")
+                time.sleep(1.0)
+        self._cancelled.set()
+    
+    def _drain(self, connection) -> None:
+        queues = [self.app.amqp.queues[name] for name in self.queues]
+        consumer = connection.Consumer(queues, callbacks=[self._on_message], accept=["json"])
+        self._holding = 0
+        self._due.clear()
+        self._prefetch = consumer.qos
+        self._prefetch(prefetch_count=1)
+        dispatcher = self.app.events.Dispatcher(connection, hostname=self.hostname, enabled=True, groups=["worker"])
+        dispatcher.send("worker-online", freq=self.heartbeat_interval, **WORKER_INFO)
+        next_heartbeat = 0.0
+        
+        with consumer:
+            try:
+                # After consumption stops, stay connected to hand back held messages and to
+                # keep sending heartbeats until the running tasks are done
+                while self._consuming.is_set() or self._holding or self.running:
+                    self._settle()
+                    if time.monotonic() >= next_heartbeat:
+                        dispatcher.send(
+                            "worker-heartbeat",
+                            freq=self.heartbeat_interval,
+                            active=len(self.running),
+                            processed=self.processed,
+                            loadavg=os.getloadavg(),
+                            **WORKER_INFO
+                        )
+                        next_heartbeat = time.monotonic() + self.heartbeat_interval
+                    
+                    if not self._consuming.is_set():
+                        consumer.cancel()
+                        while self._due:
+                            message, _ = self._due.popleft()
+                            message.reject(requeue=True)
+                        self._cancelled.set()
+                        time.sleep(DRAIN_SECONDS)
+                    elif self._slots.acquire(timeout=DRAIN_SECONDS):
+                        self._fetch(connection)
+            finally:
+                dispatcher.send("worker-offline", **WORKER_INFO)
+                dispatcher.close()
+    
+    def _fetch(self, connection) -> None:
+        """With a slot taken, start a held message that is due or else the next one from the broker."""
+        self._reserved = True
+        try:
+            if self._due:
+                self._begin(*self._due.popleft())
+            else:
+                connection.drain_events(timeout=DRAIN_SECONDS)
+        except socket.timeout:
+            pass
+        finally:
+            if self._reserved:
+                self._reserved = False
+                self._slots.release()
+    
+    def _settle(self) -> None:
+        while True:
+            try:
+                action, message, task = self._handed_back.get_nowait()
+            except queue.Empty:
+                return
+            self._holding -= 1
+            self._prefetch(prefetch_count=1 + self._holding)
+            if action == "due":
+                self._due.append((message, task))
+            else:
+                message.reject(requeue=True)
+    
+    def _on_message(self, body: Any, message) -> None:
+        try:
+            task = decode_message(body, message.headers)
+        except Exception as e:
+            logger.error(f"Discarding undecodable message: {e}")
+            message.reject(requeue=False)
+            return
+        
+        if task.name not in self.handlers:
+            logger.error(f"Discarding message for unknown task {task.name} ({task.id})")
+            message.reject(requeue=False)
+            return
+        
+        if task.eta is not None and task.eta > datetime.now(timezone.utc):
+            # Held unacknowledged without a slot; the next message can still be fetched
+            self._holding += 1
+            self._prefetch(prefetch_count=1 + self._holding)
+            self._loop.call_soon_threadsafe(self._hold, task, message)
+            return
+        self._begin(message, task)
+    
+    def _begin(self, message, task: TaskMessage) -> None:
+        # Acknowledged as it starts, like Celery's default (early) acknowledgement
+        if not self._reserved and not self._slots.acquire(blocking=False):
+            message.reject(requeue=True)
+            return
+        self._reserved = False
+        message.ack()
+        self._loop.call_soon_threadsafe(self._start, task)
+    
+    def _start(self, task: TaskMessage) -> None:
+        runner = asyncio.create_task(self._run_task(task), name=f"{task.name}[{task.id}]")
+        self.running[runner] = task
+        runner.add_done_callback(lambda finished: self.running.pop(finished, None))
+    
+    def _hold(self, task: TaskMessage, message) -> None:
+        waiter = asyncio.create_task(self._wait_for_eta(task, message))
+        self._held[waiter] = task
+        waiter.add_done_callback(lambda finished: self._held.pop(finished, None))
+    
+    async def _wait_for_eta(self, task: TaskMessage, message) -> None:
+        try:
+            await asyncio.sleep((task.eta - datetime.now(timezone.utc)).total_seconds())
+        except asyncio.CancelledError:
+            self._handed_back.put(("requeue", message, task))
+            return
+        self._handed_back.put(("due", message, task))
+    
+    async def _run_task(self, task: TaskMessage) -> None:
+        try:
+            logger.info(f"Task {task.name}[{task.id}] started")
+            await self.handlers[task.name](*task.args, **task.kwargs)
+            logger.info(f"Task {task.name}[{task.id}] succeeded")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Task {task.name}[{task.id}] failed: {e}")
+        finally:
+            self.processed += 1
+            self._slots.release()
+
+
+async def preempt_running_tasks(running: List[TaskMessage]) -> None:
+    """Ask the running Claude tasks to checkpoint and requeue, so other workers resume them."""
+    task_ids = [
+        UUID(message.args[0] if message.args else message.kwargs["task_id"])
+        for message in running
+        if message.name == "execute_task"
+    ]
+    if not task_ids:
+        return
+    async with get_db_session() as db:
+        await db.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), Task.status == TaskStatus.RUNNING)
+            .values(preempt_requested=True)
+        )
+    logger.info(f"Requested preemption of {len(task_ids)} running task(s)")
+
+
+async def serve(concurrency: int, queues: Sequence[str], hostname: Optional[str] = None) -> None:
+    """Run an async worker until SIGTERM or SIGINT."""
+    await GitWorktreeManager(base_path=settings.WORKTREE_BASE_PATH).configure_git()
+    worker = AsyncWorker(
+        celery_app,
+        ASYNC_TASKS,
+        concurrency=concurrency,
+        queues=queues,
+        heartbeat_interval=settings.ASYNC_WORKER_HEARTBEAT_SECONDS,
+        shutdown_timeout=settings.ASYNC_WORKER_SHUTDOWN_TIMEOUT,
+        before_shutdown=preempt_running_tasks,
+        hostname=hostname
+    )
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await dispose_engine()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run DevBud tasks as coroutines, many at once in one process.")
+    parser.add_argument("--concurrency", type=int, default=settings.ASYNC_WORKER_CONCURRENCY)
+    parser.add_argument("--queues", default="celery", help="comma-separated queues to consume")
+    parser.add_argument("--hostname", help="worker name in heartbeat events (default: async@<host>)")
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.concurrency, args.queues.split(","), args.hostname))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,10 +1,13 @@
 import asyncio
 import os
+import shutil
+from pathlib import Path
 from typing import AsyncGenerator, Dict, Optional
 from datetime import datetime
 from loguru import logger
 
 from app.core.config import settings
+from app.services.python_env import PythonEnvBuilder, VENV_DIR
 
 
 class ClaudeCodeRunner:
@@ -15,6 +18,28 @@ class ClaudeCodeRunner:
         self._task_success: Dict[str, bool] = {}
         self.timeout = settings.CLAUDE_TIMEOUT
     
+    async def prepare(self) -> str:
+        """Verify the Claude Code CLI is usable before a task needs it.
+        
+        Runs while the worktree is still being prepared so that a missing or
+        broken CLI fails the task before an expensive dependency install.
+        """
+        if shutil.which("claude") is None:
+            raise FileNotFoundError("Claude Code CLI not found. Please ensure 'claude' is installed and in PATH")
+        
+        process = await asyncio.create_subprocess_exec(
+            "claude", "--version",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            env=self._get_environment()
+        )
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout=60)
+        
+        if process.returncode != 0:
+            raise RuntimeError(f"Claude Code CLI is not usable: {stdout.decode().strip()}")
+        
+        return stdout.decode().strip()
+    
     async def start_task(
         self, 
         task_id: str, 
@@ -36,7 +61,7 @@ class ClaudeCodeRunner:
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.STDOUT,
                 cwd=worktree_path,
-                env=self._get_environment()
+                env=self._get_environment(worktree_path)
             )
             
             self.active_processes[task_id] = process
@@ -139,10 +164,16 @@ class ClaudeCodeRunner:
         
         logger.info("Cleaned up all Claude Code processes")
     
-    def _get_environment(self) -> Dict[str, str]:
+    def _get_environment(self, worktree_path: Optional[str] = None) -> Dict[str, str]:
         """Get environment variables for Claude Code process."""
         env = os.environ.copy()
         
+        # Activate the worktree's isolated virtualenv, if it has one
+        if worktree_path:
+            venv_path = Path(worktree_path) / VENV_DIR
+            if (venv_path / "bin").is_dir():
+                env = PythonEnvBuilder.environment(venv_path, env)
+        
         # Add Claude-specific environment variables
         env["CLAUDE_MODEL"] = settings.CLAUDE_MODEL
         
@@ -0,0 +1,277 @@
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional
+from loguru import logger
+
+from app.core.config import settings
+
+
+ENTRY_METADATA = "entry.json"
+ENTRY_PAYLOAD = "payload"
+
+
+@dataclass
+class CacheEntry:
+    """A single installed dependency tree in the cache."""
+    key: str
+    path: Path
+    size_bytes: int
+    created_at: float
+    last_used_at: float
+    namespace: Optional[str] = None
+    metadata: dict = field(default_factory=dict)
+
+
+class DependencyCache:
+    """Content-addressed store of installed dependency trees shared across worktrees.
+    
+    Entries are keyed by the hash of the lockfile that produced them and are
+    materialized into worktrees with reflinks, falling back to a plain copy
+    when the filesystem does not support them. Hardlinks are only used when
+    asked for explicitly: hardlinked files share inodes with the cache, so
+    writing one in place (an upgrade, a postinstall script) would corrupt
+    the entry for every other worktree.
+    """
+    
+    def __init__(
+        self,
+        base_path: str = "~/.devbud/cache/dependencies",
+        max_bytes: int = 20 * 1024 ** 3,
+        link_mode: str = "auto"
+    ):
+        self.base_path = Path(base_path).expanduser()
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.link_mode = link_mode
+    
+    @staticmethod
+    def compute_key(namespace: str, files: Iterable[Path]) -> str:
+        """Hash the given files into a cache key scoped to a namespace and platform."""
+        digest = hashlib.sha256()
+        digest.update(f"{namespace}\0{platform.system()}\0{platform.machine()}\0".encode())
+        
+        for file_path in sorted(Path(f) for f in files):
+            digest.update(file_path.name.encode() + b"\0")
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        
+        return digest.hexdigest()
+    
+    def entry_path(self, key: str) -> Path:
+        """Return the directory holding the cache entry for a key."""
+        return self.base_path / key
+    
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the payload path for a key and mark it as recently used."""
+        entry_path = self.entry_path(key)
+        payload = entry_path / ENTRY_PAYLOAD
+        
+        if not payload.exists():
+            return None
+        
+        self._touch(entry_path)
+        return payload
+    
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Return the cache entry for a key without marking it as used."""
+        entry_path = self.entry_path(key)
+        if not (entry_path / ENTRY_PAYLOAD).exists():
+            return None
+        return self._load_entry(entry_path)
+    
+    def latest(self, namespace: str) -> Optional[CacheEntry]:
+        """Return the most recently used entry in a namespace."""
+        candidates = [e for e in self.entries() if e.namespace == namespace]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda e: e.last_used_at)
+    
+    async def materialize(self, key: str, destination: str) -> bool:
+        """Clone a cached payload into destination. Returns False on a cache miss."""
+        payload = self.lookup(key)
+        if payload is None:
+            return False
+        
+        destination = Path(destination)
+        if destination.exists():
+            await asyncio.to_thread(shutil.rmtree, destination)
+        
+        await asyncio.to_thread(self._clone_tree, payload, destination)
+        logger.info(f"Materialized dependency cache entry {key[:12]} into {destination}")
+        return True
+    
+    async def populate(
+        self,
+        key: str,
+        source: str,
+        namespace: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> Optional[CacheEntry]:
+        """Store a copy of source under key, then enforce the size budget."""
+        source = Path(source)
+        if not source.is_dir():
+            return None
+        
+        entry_path = self.entry_path(key)
+        if (entry_path / ENTRY_PAYLOAD).exists():
+            self._touch(entry_path)
+            return None
+        
+        # Build the entry next to its final location and rename it into place so
+        # that concurrent readers never observe a partially written payload.
+        staging_path = self.base_path / f".staging-{uuid.uuid4().hex}"
+        try:
+            await asyncio.to_thread(self._clone_tree, source, staging_path / ENTRY_PAYLOAD)
+            size_bytes = await asyncio.to_thread(self._disk_usage, staging_path / ENTRY_PAYLOAD)
+            now = time.time()
+            self._write_metadata(staging_path, {
+                "key": key,
+                "namespace": namespace,
+                "metadata": metadata or {},
+                "size_bytes": size_bytes,
+                "created_at": now,
+                "last_used_at": now,
+            })
+            
+            try:
+                os.rename(staging_path, entry_path)
+            except OSError:
+                # Another worker populated the same key first
+                logger.debug(f"Dependency cache entry {key[:12]} already populated")
+                return None
+        finally:
+            if staging_path.exists():
+                await asyncio.to_thread(shutil.rmtree, staging_path, True)
+        
+        logger.info(f"Populated dependency cache entry {key[:12]} ({size_bytes} bytes)")
+        await asyncio.to_thread(self.evict)
+        return CacheEntry(key, entry_path, size_bytes, now, now, namespace, metadata or {})
+    
+    def entries(self) -> List[CacheEntry]:
+        """List all complete cache entries."""
+        entries = []
+        
+        for entry_path in self.base_path.iterdir():
+            if entry_path.name.startswith(".") or not entry_path.is_dir():
+                continue
+            
+            entry = self._load_entry(entry_path)
+            if entry is not None:
+                entries.append(entry)
+        
+        return entries
+    
+    def evict(self, max_bytes: Optional[int] = None) -> List[str]:
+        """Remove least recently used entries until the cache fits its budget."""
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries(), key=lambda e: e.last_used_at)
+        total = sum(e.size_bytes for e in entries)
+        evicted = []
+        
+        for entry in entries:
+            if total <= budget:
+                break
+            shutil.rmtree(entry.path, ignore_errors=True)
+            total -= entry.size_bytes
+            evicted.append(entry.key)
+            logger.info(f"Evicted dependency cache entry {entry.key[:12]} ({entry.size_bytes} bytes)")
+        
+        return evicted
+    
+    def _clone_tree(self, source: Path, destination: Path) -> None:
+        """Clone a directory tree using reflinks (falling back to a plain copy), hardlinks or a plain copy."""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        
+        if self.link_mode == "auto":
+            # cp is the only portable way to request reflinks; it fails fast on
+            # filesystems without copy-on-write support.
+            result = subprocess.run(
+                ["cp", "-a", "--reflink=always", str(source), str(destination)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            if result.returncode == 0:
+                return
+            shutil.rmtree(destination, ignore_errors=True)
+        
+        # Never hardlink unless asked to: worktrees write to their dependencies
+        copy_function = _link_or_copy if self.link_mode == "hardlink" else shutil.copy2
+        shutil.copytree(source, destination, symlinks=True, copy_function=copy_function)
+    
+    @staticmethod
+    def _disk_usage(path: Path) -> int:
+        """Return the apparent size of all regular files under path."""
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    continue
+        return total
+    
+    def _load_entry(self, entry_path: Path) -> Optional[CacheEntry]:
+        metadata = self._read_metadata(entry_path)
+        if metadata is None:
+            return None
+        
+        return CacheEntry(
+            key=entry_path.name,
+            path=entry_path,
+            size_bytes=metadata.get("size_bytes", 0),
+            created_at=metadata.get("created_at", 0.0),
+            last_used_at=max(
+                metadata.get("last_used_at", 0.0),
+                (entry_path / ENTRY_METADATA).stat().st_mtime
+            ),
+            namespace=metadata.get("namespace"),
+            metadata=metadata.get("metadata", {}),
+        )
+    
+    def _touch(self, entry_path: Path) -> None:
+        """Record that an entry was just used."""
+        try:
+            os.utime(entry_path / ENTRY_METADATA)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _read_metadata(entry_path: Path) -> Optional[dict]:
+        try:
+            return json.loads((entry_path / ENTRY_METADATA).read_text())
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _write_metadata(entry_path: Path, metadata: dict) -> None:
+        entry_path.mkdir(parents=True, exist_ok=True)
+        (entry_path / ENTRY_METADATA).write_text(json.dumps(metadata))
+
+
+def get_dependency_cache() -> Optional[DependencyCache]:
+    """Build the shared dependency cache if it is enabled."""
+    if not settings.DEPENDENCY_CACHE_ENABLED:
+        return None
+    return DependencyCache(
+        base_path=settings.DEPENDENCY_CACHE_PATH,
+        max_bytes=settings.DEPENDENCY_CACHE_MAX_BYTES,
+        link_mode=settings.DEPENDENCY_CACHE_LINK_MODE
+    )
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """Hardlink a file, copying it when linking is not possible (e.g. across devices)."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
\ No newline at end of file
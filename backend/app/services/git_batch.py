@@ -0,0 +1,212 @@
+import asyncio
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+from loguru import logger
+
+
+class GitBatchError(RuntimeError):
+    """Raised when a repository cannot be opened or its batch process dies."""
+
+
+@dataclass
+class ObjectInfo:
+    oid: str
+    type: str
+    size: int
+
+
+class GitBatch:
+    """A long-lived ``git cat-file --batch-command`` process for one repository.
+    
+    Requests are written as soon as they are made and replies are matched to
+    them in order, so many concurrent queries are pipelined over one process
+    instead of spawning a shell and a git process per query.
+    """
+    
+    def __init__(self, repo_path: Path, git_dir: Path, common_dir: Path):
+        self.repo_path = repo_path
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Deque[Tuple[str, asyncio.Future]] = deque()
+    
+    @classmethod
+    async def open(cls, repo_path: str) -> "GitBatch":
+        """Resolve a repository's git directories and start its batch process."""
+        repo_path = Path(repo_path).expanduser().absolute()
+        if not repo_path.is_dir():
+            raise GitBatchError(f"Not a directory: {repo_path}")
+        
+        process = await asyncio.create_subprocess_exec(
+            "git", "rev-parse", "--absolute-git-dir", "--git-common-dir",
+            cwd=str(repo_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise GitBatchError(f"Not a git repository: {repo_path}\nError: {stderr.decode()}")
+        
+        git_dir, common_dir = stdout.decode().splitlines()
+        batch = cls(repo_path, Path(git_dir), (repo_path / common_dir).resolve())
+        await batch._start()
+        return batch
+    
+    @property
+    def is_alive(self) -> bool:
+        return (
+            self._process is not None
+            and self._process.returncode is None
+            and self.git_dir.exists()
+        )
+    
+    async def info(self, rev: str) -> Optional[ObjectInfo]:
+        """Resolve a revision to its object id, type and size; None if it does not exist."""
+        return await self._request("info", rev)
+    
+    async def info_many(self, revs: List[str]) -> List[Optional[ObjectInfo]]:
+        """Resolve several revisions in one pipelined round trip."""
+        return await asyncio.gather(*(self._request("info", rev) for rev in revs))
+    
+    async def contents(self, rev: str) -> Optional[bytes]:
+        """Read the raw contents of an object; None if it does not exist."""
+        return await self._request("contents", rev)
+    
+    async def resolve(self, rev: str) -> Optional[str]:
+        """Resolve a revision to an object id."""
+        info = await self.info(rev)
+        return info.oid if info else None
+    
+    def head(self) -> str:
+        """Return the checked out branch, or "HEAD" when detached, like ``rev-parse --abbrev-ref HEAD``."""
+        head = (self.git_dir / "HEAD").read_text().strip()
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/"):]
+        return "HEAD"
+    
+    async def close(self) -> None:
+        """Stop the batch process; pending requests fail."""
+        if self._process is None:
+            return
+        
+        if self._process.returncode is None:
+            self._process.stdin.close()
+            try:
+                await asyncio.wait_for(self._process.wait(), 5)
+            except asyncio.TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+        
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+    
+    async def _start(self) -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            "git", "cat-file", "--batch-command",
+            cwd=str(self.repo_path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self._reader = asyncio.create_task(self._read_replies())
+    
+    async def _request(self, command: str, rev: str):
+        if "\n" in rev:
+            raise ValueError(f"Invalid revision: {rev!r}")
+        if not self.is_alive:
+            raise GitBatchError(f"Batch process for {self.repo_path} is not running")
+        
+        future = asyncio.get_running_loop().create_future()
+        # Queue and write in one step so replies arrive in request order
+        self._pending.append((command, future))
+        self._process.stdin.write(f"{command} {rev}\n".encode())
+        await self._process.stdin.drain()
+        return await future
+    
+    async def _read_replies(self) -> None:
+        stdout = self._process.stdout
+        try:
+            while True:
+                header = await stdout.readline()
+                if not header:
+                    break
+                
+                command, future = self._pending.popleft()
+                fields = header.decode().split()
+                if fields[-1] in ("missing", "ambiguous"):
+                    result = None
+                else:
+                    info = ObjectInfo(oid=fields[0], type=fields[1], size=int(fields[2]))
+                    result = info
+                    if command == "contents":
+                        # Object contents are followed by a newline
+                        result = (await stdout.readexactly(info.size + 1))[:-1]
+                
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.warning(f"git batch reader for {self.repo_path} failed: {e}")
+        finally:
+            while self._pending:
+                _, future = self._pending.popleft()
+                if not future.done():
+                    future.set_exception(GitBatchError(f"Batch process for {self.repo_path} exited"))
+
+
+class GitBatchPool:
+    """Keeps one batch process per repository, closing the least recently used beyond a limit."""
+    
+    def __init__(self, max_processes: int = 32):
+        self.max_processes = max_processes
+        self._batches: "OrderedDict[Path, GitBatch]" = OrderedDict()
+        self._lock = asyncio.Lock()
+    
+    async def get(self, repo_path: str) -> GitBatch:
+        """Return a running batch process for a repository, starting one if needed."""
+        key = Path(repo_path).expanduser().absolute()
+        
+        batch = self._batches.get(key)
+        if batch is not None and batch.is_alive:
+            self._batches.move_to_end(key)
+            return batch
+        
+        async with self._lock:
+            batch = self._batches.pop(key, None)
+            if batch is not None:
+                if batch.is_alive:
+                    self._batches[key] = batch
+                    return batch
+                await batch.close()
+            
+            batch = await GitBatch.open(str(key))
+            self._batches[key] = batch
+            
+            while len(self._batches) > self.max_processes:
+                _, evicted = self._batches.popitem(last=False)
+                await evicted.close()
+            
+            return batch
+    
+    async def close(self) -> None:
+        """Stop every batch process in the pool."""
+        batches = list(self._batches.values())
+        self._batches.clear()
+        await asyncio.gather(*(batch.close() for batch in batches), return_exceptions=True)
+
+
+# Subprocess transports belong to the event loop that created them
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, GitBatchPool]" = weakref.WeakKeyDictionary()
+
+
+def get_git_batch_pool() -> GitBatchPool:
+    """Return the batch process pool of the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = GitBatchPool()
+        _pools[loop] = pool
+    return pool
\ No newline at end of file
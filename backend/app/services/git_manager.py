@@ -1,38 +1,127 @@
 import asyncio
 import os
 import json
+import shlex
+import shutil
+import tempfile
+import time
+import weakref
+import fcntl
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from loguru import logger
 
+from app.services.dependency_cache import DependencyCache
+from app.services.python_env import PythonEnvBuilder, VENV_DIR
+from app.services.git_batch import GitBatchError, get_git_batch_pool
+from app.services.git_scheduler import git_scheduler
+from app.services.process import run_shell, OutputCallback
+
+
+# (marker file, install command, directory shared through the dependency cache)
+# in order of preference
+PACKAGE_MANAGERS = [
+    ("bun.lockb", "bun install", "node_modules"),
+    ("package-lock.json", "npm install", "node_modules"),
+    ("yarn.lock", "yarn install", "node_modules"),
+    ("pnpm-lock.yaml", "pnpm install", "node_modules"),
+    # Default to npm if package.json exists but no lock file
+    ("package.json", "npm install", None),
+    # Python projects get an isolated virtualenv per worktree
+    ("requirements.txt", "pip install -r requirements.txt", VENV_DIR),
+    ("Pipfile", "pipenv install", VENV_DIR),
+    ("poetry.lock", "poetry install", VENV_DIR),
+]
+
+# Identity of commits DevBud makes itself (checkpoints, merge trains), independent of the host's git config
+DEVBUD_GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "DevBud",
+    "GIT_AUTHOR_EMAIL": "devbud@localhost",
+    "GIT_COMMITTER_NAME": "DevBud",
+    "GIT_COMMITTER_EMAIL": "devbud@localhost",
+}
+
+# Manifests whose resolved lockfile, when present, keys the cache instead
+LOCKFILES = {
+    "Pipfile": "Pipfile.lock",
+}
+
+# Fetches in flight per event loop, keyed by (repository, remote, ref)
+_inflight_fetches: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str, str], asyncio.Future]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Set once configure_git has run in this process
+_git_configured = False
+
+@dataclass
+class InstallResult:
+    """Outcome of installing dependencies into a worktree."""
+    status: str  # succeeded, failed or skipped
+    command: Optional[str] = None
+    lockfile_hash: Optional[str] = None
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+
 
 class GitWorktreeManager:
     """Manages Git worktrees for isolated development environments."""
     
-    def __init__(self, base_path: str = "~/.devbud/worktrees"):
+    def __init__(
+        self,
+        base_path: str = "~/.devbud/worktrees",
+        dependency_cache: Optional[DependencyCache] = None
+    ):
         self.base_path = Path(base_path).expanduser()
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.dependency_cache = dependency_cache
+        self.python_env_builder = PythonEnvBuilder(dependency_cache=dependency_cache)
+    
+    async def configure_git(self) -> None:
+        """One-time process setup, run when a worker boots rather than per task."""
+        global _git_configured
+        if _git_configured:
+            return
+        
+        # Configure git to trust all directories (for Docker environments), without
+        # appending a duplicate entry to the global config on every boot
+        try:
+            trusted = (await self._run_command("git config --global --get-all safe.directory")).split()
+        except RuntimeError:
+            trusted = []  # no entries yet
+        if "*" not in trusted:
+            await self._run_command("git config --global --add safe.directory '*'")
+        
+        _git_configured = True
     
     async def create_worktree(
         self, 
         repo_path: str, 
         branch_name: str,
-        base_branch: Optional[str] = None
+        base_branch: Optional[str] = None,
+        install_dependencies: bool = True,
+        sparse_patterns: Optional[List[str]] = None
     ) -> str:
-        """Create a new worktree for the given repository and branch."""
+        """Create a new worktree for the given repository and branch.
+        
+        With ``sparse_patterns`` only those directories (cone mode, plus files
+        at the repository root) are checked out.
+        """
         repo_path = Path(repo_path).expanduser().absolute()
         repo_name = repo_path.name
         worktree_path = self.base_path / repo_name / branch_name
         
         try:
-            # Configure git to trust all directories (for Docker environments)
-            await self._run_command("git config --global --add safe.directory '*'")
-            
             # Create worktree directory
             worktree_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Build git worktree command
-            cmd = f"git -C {repo_path} worktree add {worktree_path}"
+            # Build git worktree command; sparse worktrees are populated after the cone is set
+            cmd = f"git -C {repo_path} worktree add"
+            if sparse_patterns:
+                cmd += " --no-checkout"
+            cmd += f" {worktree_path}"
             
             if base_branch:
                 # Create new branch from specific base
@@ -42,48 +131,141 @@ class GitWorktreeManager:
                 cmd += f" -b {branch_name}"
             
             # Execute worktree creation
-            await self._run_command(cmd)
+            await git_scheduler.write(str(repo_path), lambda: self._run_command(cmd))
+            
+            if sparse_patterns:
+                await self._sparse_checkout(worktree_path, sparse_patterns)
             
             # Install dependencies if needed
-            await self._install_dependencies(str(worktree_path))
+            if install_dependencies:
+                await self._install_dependencies(str(worktree_path), directories=sparse_patterns)
             
             logger.info(f"Created worktree at {worktree_path}")
             return str(worktree_path)
-            
+        
         except Exception as e:
             # Clean up on failure
             if worktree_path.exists():
                 await self.remove_worktree(str(worktree_path))
             raise e
     
+    async def _sparse_checkout(self, worktree_path: Path, patterns: List[str]) -> None:
+        """Restrict a no-checkout worktree to cone patterns, then populate it."""
+        directories = " ".join(shlex.quote(pattern) for pattern in patterns)
+        cwd = str(worktree_path)
+        # init writes the shared repository config, so it must not race other writers
+        await git_scheduler.write(cwd, lambda: self._run_command("git sparse-checkout init --cone", cwd=cwd))
+        await self._run_command(f"git sparse-checkout set -- {directories}", cwd=cwd)
+        await self._run_command("git checkout", cwd=cwd)
+    
+    async def fetch_base(
+        self,
+        repo_path: str,
+        ref: str,
+        remote: str = "origin",
+        freshness: float = 0.0,
+        timeout: Optional[float] = None
+    ) -> str:
+        """Fetch a branch from a remote and return the commit it points at.
+        
+        Concurrent calls for the same repository and ref share one in-flight
+        fetch, and a fetch made by any process within the last ``freshness``
+        seconds is reused instead of contacting the remote again.
+        """
+        repo_path = str(Path(repo_path).expanduser().absolute())
+        inflight = _inflight_fetches.setdefault(asyncio.get_running_loop(), {})
+        key = (repo_path, remote, ref)
+        
+        future = inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_once(repo_path, remote, ref, freshness, timeout))
+            inflight[key] = future
+            future.add_done_callback(lambda _: inflight.pop(key, None))
+        
+        # A cancelled waiter must not cancel the fetch the others are waiting on
+        return await asyncio.shield(future)
+    
+    async def _fetch_once(
+        self,
+        repo_path: str,
+        remote: str,
+        ref: str,
+        freshness: float,
+        timeout: Optional[float]
+    ) -> str:
+        batch = await get_git_batch_pool().get(repo_path)
+        stamp_dir = batch.common_dir / "devbud-fetch"
+        stamp_dir.mkdir(exist_ok=True)
+        stamp = stamp_dir / re.sub(r"[^A-Za-z0-9._-]", "_", f"{remote}-{ref}")
+        
+        if not self._is_fresh(stamp, freshness):
+            # Serialize with fetches of the same ref from other worker processes
+            with open(f"{stamp}.lock", "w") as lock:
+                await asyncio.to_thread(fcntl.flock, lock, fcntl.LOCK_EX)
+                try:
+                    if not self._is_fresh(stamp, freshness):
+                        refspec = shlex.quote(f"+refs/heads/{ref}:refs/remotes/{remote}/{ref}")
+                        # Updating the remote-tracking ref takes ref lock files, like worktree add and pack-refs
+                        await git_scheduler.write(repo_path, lambda: self._run_command(
+                            f"git fetch --quiet {shlex.quote(remote)} {refspec}",
+                            cwd=repo_path,
+                            timeout=timeout
+                        ))
+                        stamp.touch()
+                        logger.info(f"Fetched {remote}/{ref} for {repo_path}")
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+        
+        commit = await batch.resolve(f"refs/remotes/{remote}/{ref}")
+        if commit is None:
+            raise RuntimeError(f"Branch {ref} not found on {remote} for {repo_path}")
+        return commit
+    
+    @staticmethod
+    def _is_fresh(stamp: Path, freshness: float) -> bool:
+        try:
+            return time.time() - stamp.stat().st_mtime < freshness
+        except FileNotFoundError:
+            return False
+    
     async def remove_worktree(self, worktree_path: str) -> None:
         """Remove a worktree."""
         worktree_path = Path(worktree_path).expanduser().absolute()
         
-        # Find the main repository path
-        result = await self._run_command(
-            "git worktree list --porcelain",
-            cwd=str(worktree_path.parent.parent)
-        )
-        
-        # Remove the worktree
-        await self._run_command(f"git worktree remove {worktree_path} --force")
+        # Remove the worktree; git resolves the owning repository from inside it
+        try:
+            await git_scheduler.write(str(worktree_path), lambda: self._run_command(
+                f"git worktree remove {worktree_path} --force",
+                cwd=str(worktree_path)
+            ))
+        except Exception as e:
+            logger.warning(f"git worktree remove failed for {worktree_path}: {e}")
         
         # Clean up the directory if it still exists
         if worktree_path.exists():
-            import shutil
             shutil.rmtree(worktree_path)
         
         logger.info(f"Removed worktree at {worktree_path}")
     
+    async def prune_worktrees(self, repo_path: str) -> None:
+        """Drop administrative data of worktrees whose directories no longer exist."""
+        repo_path = Path(repo_path).expanduser().absolute()
+        if not repo_path.exists():
+            return
+        
+        await git_scheduler.write(
+            str(repo_path),
+            lambda: self._run_command("git worktree prune", cwd=str(repo_path))
+        )
+    
     async def list_worktrees(self, repo_path: str) -> List[Dict[str, str]]:
         """List all worktrees for a repository."""
         repo_path = Path(repo_path).expanduser().absolute()
         
-        result = await self._run_command(
+        result = await git_scheduler.read(str(repo_path), lambda: self._run_command(
             "git worktree list --porcelain",
             cwd=str(repo_path)
-        )
+        ))
         
         worktrees = []
         current_worktree = {}
@@ -116,65 +298,337 @@ class GitWorktreeManager:
             return False
         
         try:
-            await self._run_command("git rev-parse --git-dir", cwd=str(repo_path))
+            await get_git_batch_pool().get(str(repo_path))
             return True
-        except Exception:
+        except GitBatchError:
             return False
     
     async def get_current_branch(self, repo_path: str) -> str:
         """Get the current branch of a repository."""
+        batch = await get_git_batch_pool().get(repo_path)
+        return batch.head()
+    
+    async def get_head_commit(self, path: str) -> str:
+        """Get the commit checked out at a repository or worktree path."""
+        batch = await get_git_batch_pool().get(path)
+        commit = await batch.resolve("HEAD")
+        if commit is None:
+            raise RuntimeError(f"No commit checked out at {path}")
+        return commit
+    
+    async def snapshot_tree(self, worktree_path: str) -> str:
+        """Write a tree object of a worktree's current contents, including uncommitted changes.
+        
+        A temporary index is used so the worktree's own index and staging
+        state are left untouched. Installed dependency directories are skipped.
+        """
+        worktree_path = Path(worktree_path).expanduser().absolute()
+        git_dir = Path((await self._run_command(
+            "git rev-parse --absolute-git-dir", cwd=str(worktree_path)
+        )).strip())
+        
+        excluded = " ".join(
+            f"':(exclude,glob)**/{cached_dir}/**'"
+            for cached_dir in sorted({d for _, _, d in PACKAGE_MANAGERS if d})
+        )
+        
+        fd, index_path = tempfile.mkstemp(prefix="index.snapshot.", dir=git_dir)
+        os.close(fd)
+        try:
+            # Start from the real index so unchanged files are not rehashed
+            if (git_dir / "index").exists():
+                shutil.copyfile(git_dir / "index", index_path)
+            else:
+                os.unlink(index_path)
+            
+            env = {**os.environ, "GIT_INDEX_FILE": index_path}
+            await run_shell(f"git add -A -- . {excluded}", cwd=str(worktree_path), env=env)
+            tree = await run_shell("git write-tree", cwd=str(worktree_path), env=env)
+        finally:
+            if os.path.exists(index_path):
+                os.unlink(index_path)
+        
+        return tree.strip()
+    
+    async def checkpoint(self, worktree_path: str, ref: str, message: str = "DevBud checkpoint") -> Optional[str]:
+        """Commit a worktree's current contents to a hidden ref, leaving its branch and index untouched.
+        
+        The checkpoint commit's parent is the worktree's HEAD. Returns the new
+        commit, or None when nothing changed since the previous checkpoint.
+        """
+        worktree_path = str(Path(worktree_path).expanduser().absolute())
+        tree = await self.snapshot_tree(worktree_path)
+        
+        batch = await get_git_batch_pool().get(worktree_path)
+        head, previous = await batch.info_many(["HEAD", ref])
+        if previous is not None:
+            previous_tree, previous_parent = await batch.info_many([f"{ref}^{{tree}}", f"{ref}^"])
+            if previous_tree and previous_tree.oid == tree and (
+                (previous_parent.oid if previous_parent else None) == (head.oid if head else None)
+            ):
+                return None
+        
+        parent = f" -p {head.oid}" if head is not None else ""
+        env = {**os.environ, **DEVBUD_GIT_IDENTITY}
+        commit = (await run_shell(
+            f"git commit-tree {tree}{parent} -m {shlex.quote(message)}",
+            cwd=worktree_path,
+            env=env
+        )).strip()
+        await git_scheduler.write(worktree_path, lambda: self._run_command(
+            f"git update-ref {shlex.quote(ref)} {commit}", cwd=worktree_path
+        ))
+        
+        return commit
+    
+    async def restore_worktree(
+        self,
+        repo_path: str,
+        branch_name: str,
+        checkpoint: str,
+        sparse_patterns: Optional[List[str]] = None
+    ) -> str:
+        """Recreate a task's worktree from a checkpoint commit, e.g. on another worker.
+        
+        The task branch is checked out (created at the checkpoint's parent if
+        this repository lacks it) and the working tree is set to the
+        checkpoint's contents, with the changes left uncommitted.
+        """
         repo_path = Path(repo_path).expanduser().absolute()
+        worktree_path = self.base_path / repo_path.name / branch_name
         
-        result = await self._run_command(
-            "git rev-parse --abbrev-ref HEAD",
-            cwd=str(repo_path)
+        # A worktree left behind by an earlier run of the task on this host
+        if worktree_path.exists():
+            await self.remove_worktree(str(worktree_path))
+        await self.prune_worktrees(str(repo_path))
+        
+        batch = await get_git_batch_pool().get(str(repo_path))
+        branch_exists = await batch.resolve(f"refs/heads/{branch_name}") is not None
+        
+        try:
+            worktree_path.parent.mkdir(parents=True, exist_ok=True)
+            cmd = f"git -C {repo_path} worktree add"
+            if sparse_patterns:
+                cmd += " --no-checkout"
+            if branch_exists:
+                cmd += f" {worktree_path} {branch_name}"
+            else:
+                cmd += f" -b {branch_name} {worktree_path} {checkpoint}^"
+            await git_scheduler.write(str(repo_path), lambda: self._run_command(cmd))
+            
+            if sparse_patterns:
+                await self._sparse_checkout(worktree_path, sparse_patterns)
+            
+            cwd = str(worktree_path)
+            await self._run_command(f"git read-tree -u --reset {checkpoint}^{{tree}}", cwd=cwd)
+            # Unstage the restored changes so the index matches the branch again
+            await self._run_command("git reset -q", cwd=cwd)
+            
+            logger.info(f"Restored worktree at {worktree_path} from checkpoint {checkpoint}")
+            return str(worktree_path)
+        
+        except Exception as e:
+            if worktree_path.exists():
+                await self.remove_worktree(str(worktree_path))
+            raise e
+    
+    async def delete_ref(self, repo_path: str, ref: str) -> None:
+        """Delete a ref such as a task checkpoint, if it exists."""
+        cwd = str(Path(repo_path).expanduser().absolute())
+        await git_scheduler.write(cwd, lambda: self._run_command(
+            f"git update-ref -d {shlex.quote(ref)}", cwd=cwd
+        ))
+    
+    async def install_dependencies(
+        self,
+        worktree_path: str,
+        policy: str = "always",
+        command: Optional[str] = None,
+        timeout: Optional[int] = None,
+        previous_lockfile_hash: Optional[str] = None,
+        on_output: Optional[OutputCallback] = None,
+        directories: Optional[List[str]] = None
+    ) -> InstallResult:
+        """Install dependencies in a worktree according to a repository's install policy.
+        
+        ``on_lockfile_change`` skips the package manager when the lockfile hash
+        matches the last successful install and the cache restores every
+        dependency, so the worktree is usable without a network install;
+        otherwise it installs as usual. Install
+        output is passed to ``on_output`` line by line as it is produced.
+        ``directories`` (a sparse worktree's patterns) adds their manifests
+        to the root's.
+        """
+        lockfile_hash = self.lockfile_hash(worktree_path, directories)
+        
+        if policy == "never":
+            return InstallResult(status="skipped", lockfile_hash=lockfile_hash)
+        
+        if policy == "on_lockfile_change" and lockfile_hash and lockfile_hash == previous_lockfile_hash:
+            if await self._restore_dependencies(worktree_path, directories):
+                logger.info(f"Lockfile unchanged, skipped dependency install for {worktree_path}")
+                return InstallResult(status="skipped", lockfile_hash=lockfile_hash)
+            # A new worktree has nothing installed: skipping would leave it without dependencies
+            logger.info(f"Lockfile unchanged but dependencies not cached, installing for {worktree_path}")
+        
+        started = time.monotonic()
+        executed = command if policy == "custom" else None
+        try:
+            if policy == "custom":
+                if command:
+                    await self._run_command(command, cwd=worktree_path, timeout=timeout, on_output=on_output)
+            else:
+                executed = await self._install_dependencies(
+                    worktree_path, timeout=timeout, on_output=on_output, directories=directories
+                )
+        except Exception as e:
+            return InstallResult(
+                status="failed",
+                command=executed,
+                lockfile_hash=lockfile_hash,
+                duration_seconds=time.monotonic() - started,
+                error=str(e)
+            )
+        
+        return InstallResult(
+            status="succeeded",
+            command=executed,
+            lockfile_hash=lockfile_hash,
+            duration_seconds=time.monotonic() - started
         )
+    
+    def lockfile_hash(self, worktree_path: str, directories: Optional[List[str]] = None) -> Optional[str]:
+        """Hash the lockfiles of the package managers detected in a worktree."""
+        lockfiles = [
+            path / detected[1]
+            for path, detected in self._manifest_directories(Path(worktree_path), directories)
+        ]
+        if not lockfiles:
+            return None
         
-        return result.strip()
+        return DependencyCache.compute_key("lockfile", lockfiles)
     
-    async def _install_dependencies(self, worktree_path: str) -> None:
-        """Install project dependencies in the worktree."""
+    def _manifest_directories(
+        self,
+        worktree_path: Path,
+        directories: Optional[List[str]] = None
+    ) -> List[Tuple[Path, Tuple[str, str, str, Optional[str]]]]:
+        """Return the worktree root and sparse directories that contain a package manifest."""
+        found = []
+        for path in [worktree_path] + [worktree_path / d for d in directories or []]:
+            detected = self._detect_package_manager(path)
+            if detected is not None:
+                found.append((path, detected))
+        return found
+    
+    def _detect_package_manager(self, worktree_path: Path) -> Optional[Tuple[str, str, str, Optional[str]]]:
+        """Return (marker, lockfile, command, cached dir) for the preferred package manager."""
+        # Check for package managers in order of preference
+        for marker, command, cached_dir in PACKAGE_MANAGERS:
+            if not (worktree_path / marker).exists():
+                continue
+            
+            lockfile = LOCKFILES.get(marker, marker)
+            if not (worktree_path / lockfile).exists():
+                lockfile = marker
+            return marker, lockfile, command, cached_dir
+        
+        return None
+    
+    async def _install_dependencies(
+        self,
+        worktree_path: str,
+        timeout: Optional[int] = None,
+        on_output: Optional[OutputCallback] = None,
+        directories: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """Install project dependencies in the worktree.
+        
+        Returns the install command that applies to the worktree, if any. Only
+        the root and ``directories`` are searched for manifests, so a sparse
+        worktree never installs packages it did not check out.
+        """
         worktree_path = Path(worktree_path)
         
-        # Check for package managers in order of preference
-        if (worktree_path / "bun.lockb").exists():
-            await self._run_command("bun install", cwd=str(worktree_path))
-        elif (worktree_path / "package-lock.json").exists():
-            await self._run_command("npm install", cwd=str(worktree_path))
-        elif (worktree_path / "yarn.lock").exists():
-            await self._run_command("yarn install", cwd=str(worktree_path))
-        elif (worktree_path / "pnpm-lock.yaml").exists():
-            await self._run_command("pnpm install", cwd=str(worktree_path))
-        elif (worktree_path / "package.json").exists():
-            # Default to npm if package.json exists but no lock file
-            await self._run_command("npm install", cwd=str(worktree_path))
-        elif (worktree_path / "requirements.txt").exists():
-            # Python project
-            await self._run_command("pip install -r requirements.txt", cwd=str(worktree_path))
-        elif (worktree_path / "Pipfile").exists():
-            # Python project with pipenv
-            await self._run_command("pipenv install", cwd=str(worktree_path))
-        elif (worktree_path / "poetry.lock").exists():
-            # Python project with poetry
-            await self._run_command("poetry install", cwd=str(worktree_path))
+        commands = []
+        for path, (marker, lockfile, command, cached_dir) in self._manifest_directories(worktree_path, directories):
+            if cached_dir == VENV_DIR:
+                await self.python_env_builder.build(
+                    str(path), lockfile, command,
+                    timeout=timeout, on_output=on_output
+                )
+            elif cached_dir and self.dependency_cache:
+                await self._install_with_cache(
+                    path, lockfile, command, cached_dir, timeout, on_output=on_output
+                )
+            else:
+                await self._run_command(command, cwd=str(path), timeout=timeout, on_output=on_output)
+            
+            commands.append(command if path == worktree_path else f"(cd {path.relative_to(worktree_path)} && {command})")
+        
+        if not commands:
+            return None
         
         logger.info(f"Dependencies installed for {worktree_path}")
+        return " && ".join(commands)
     
-    async def _run_command(self, command: str, cwd: Optional[str] = None) -> str:
-        """Run a shell command asynchronously."""
-        process = await asyncio.create_subprocess_shell(
-            command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd
-        )
+    async def _restore_dependencies(self, worktree_path: str, directories: Optional[List[str]] = None) -> bool:
+        """Restore a worktree's dependencies from the cache alone, without installing anything.
         
-        stdout, stderr = await process.communicate()
+        Returns True only if the dependencies of every detected package manager
+        were restored.
+        """
+        manifests = self._manifest_directories(Path(worktree_path), directories)
+        for path, (marker, lockfile, command, cached_dir) in manifests:
+            if cached_dir == VENV_DIR:
+                restored = await self.python_env_builder.build(str(path), lockfile, command, cache_only=True) is not None
+            elif cached_dir and self.dependency_cache:
+                restored = await self._install_with_cache(path, lockfile, command, cached_dir, cache_only=True)
+            else:
+                restored = False
+            if not restored:
+                return False
+        return bool(manifests)
+    
+    async def _install_with_cache(
+        self,
+        worktree_path: Path,
+        lockfile: str,
+        command: str,
+        cached_dir: str,
+        timeout: Optional[int] = None,
+        cache_only: bool = False,
+        on_output: Optional[OutputCallback] = None
+    ) -> bool:
+        """Materialize dependencies from the cache, installing and populating it on a miss.
         
-        if process.returncode != 0:
-            raise RuntimeError(
-                f"Command failed: {command}\n"
-                f"Error: {stderr.decode()}"
-            )
+        Returns False if nothing was cached and ``cache_only`` prevented the install.
+        """
+        key = DependencyCache.compute_key(command, [worktree_path / lockfile])
+        target = worktree_path / cached_dir
+        
+        if await self.dependency_cache.materialize(key, str(target)):
+            logger.info(f"Dependency cache hit for {lockfile} in {worktree_path}")
+            return True
+        
+        if cache_only:
+            return False
+        
+        await self._run_command(command, cwd=str(worktree_path), timeout=timeout, on_output=on_output)
         
-        return stdout.decode()
\ No newline at end of file
+        try:
+            await self.dependency_cache.populate(key, str(target))
+        except Exception as e:
+            # A failed cache write must never fail the task itself
+            logger.warning(f"Failed to populate dependency cache from {target}: {e}")
+        return True
+    
+    async def _run_command(
+        self,
+        command: str,
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        on_output: Optional[OutputCallback] = None
+    ) -> str:
+        """Run a shell command asynchronously."""
+        return await run_shell(command, cwd=cwd, timeout=timeout, on_output=on_output)
\ No newline at end of file
@@ -0,0 +1,198 @@
+import asyncio
+import fcntl
+import random
+import re
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, TypeVar
+from loguru import logger
+
+
+T = TypeVar("T")
+
+# Messages git prints when another process holds one of its lock files
+LOCK_ERROR = re.compile(
+    r"(index|config|HEAD|packed-refs|shallow)\.lock|\.lock': File exists|"
+    r"cannot lock ref|Unable to create '.*\.lock'|could not lock config file"
+)
+
+
+@dataclass
+class RepositoryGitMetrics:
+    """Counters for git operations against one repository in this process."""
+    reads: int = 0
+    writes: int = 0
+    waiting: int = 0
+    running: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    lock_retries: int = 0
+    lock_failures: int = 0
+
+
+class ReadWriteLock:
+    """Async lock shared by readers and exclusive to writers; waiting writers block new readers."""
+    
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+    
+    async def acquire_read(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+    
+    async def release_read(self) -> None:
+        async with self._condition:
+            self._readers -= 1
+            self._condition.notify_all()
+    
+    async def acquire_write(self) -> None:
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writer and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+    
+    async def release_write(self) -> None:
+        async with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class GitScheduler:
+    """Schedules git operations per repository.
+    
+    Operations that take git's lock files (worktree add/remove, config and
+    sparse-checkout changes, prune) run one at a time per repository, across
+    worker processes as well; read-only queries run in parallel. Failures
+    caused by a lock held outside DevBud are retried with jittered backoff.
+    """
+    
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.1, max_delay: float = 2.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # asyncio primitives belong to the event loop that uses them
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ReadWriteLock]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._metrics: Dict[str, RepositoryGitMetrics] = {}
+    
+    async def read(self, repo_path: str, operation: Callable[[], Awaitable[T]]) -> T:
+        """Run a read-only operation; it may overlap other reads of the repository."""
+        async with self.shared(repo_path) as metrics:
+            return await self._with_retries(repo_path, metrics, operation)
+    
+    async def write(self, repo_path: str, operation: Callable[[], Awaitable[T]]) -> T:
+        """Run an operation that takes git lock files, exclusively for the repository."""
+        async with self.exclusive(repo_path) as metrics:
+            return await self._with_retries(repo_path, metrics, operation)
+    
+    @asynccontextmanager
+    async def shared(self, repo_path: str):
+        key = self._key(repo_path)
+        lock = self._lock(key)
+        metrics = self._metrics.setdefault(key, RepositoryGitMetrics())
+        
+        await self._wait(metrics, lock.acquire_read())
+        metrics.reads += 1
+        metrics.running += 1
+        try:
+            yield metrics
+        finally:
+            metrics.running -= 1
+            await lock.release_read()
+    
+    @asynccontextmanager
+    async def exclusive(self, repo_path: str):
+        key = self._key(repo_path)
+        lock = self._lock(key)
+        metrics = self._metrics.setdefault(key, RepositoryGitMetrics())
+        
+        await self._wait(metrics, lock.acquire_write())
+        # Serialize with the same repository's writers in other worker processes
+        lock_path = Path(key) / "devbud-git.lock"
+        handle = open(lock_path, "w") if lock_path.parent.is_dir() else None
+        try:
+            if handle is not None:
+                await self._wait(metrics, asyncio.to_thread(fcntl.flock, handle, fcntl.LOCK_EX))
+            metrics.writes += 1
+            metrics.running += 1
+            try:
+                yield metrics
+            finally:
+                metrics.running -= 1
+        finally:
+            if handle is not None:
+                # Closing the file releases the flock
+                handle.close()
+            await lock.release_write()
+    
+    def metrics(self) -> Dict[str, dict]:
+        """Contention counters per repository (keyed by git common directory)."""
+        return {key: asdict(metrics) for key, metrics in self._metrics.items()}
+    
+    async def _with_retries(
+        self,
+        repo_path: str,
+        metrics: RepositoryGitMetrics,
+        operation: Callable[[], Awaitable[T]]
+    ) -> T:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await operation()
+            except RuntimeError as e:
+                if not LOCK_ERROR.search(str(e)):
+                    raise
+                if attempt == self.max_retries:
+                    metrics.lock_failures += 1
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+                metrics.lock_retries += 1
+                logger.warning(f"git lock contention in {repo_path}, retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+    
+    async def _wait(self, metrics: RepositoryGitMetrics, acquire: Awaitable) -> None:
+        metrics.waiting += 1
+        started = time.monotonic()
+        try:
+            await acquire
+        finally:
+            waited = time.monotonic() - started
+            metrics.waiting -= 1
+            metrics.wait_seconds_total += waited
+            metrics.wait_seconds_max = max(metrics.wait_seconds_max, waited)
+    
+    def _lock(self, key: str) -> ReadWriteLock:
+        locks = self._locks.setdefault(asyncio.get_running_loop(), {})
+        if key not in locks:
+            locks[key] = ReadWriteLock()
+        return locks[key]
+    
+    @staticmethod
+    def _key(repo_path: str) -> str:
+        """Worktrees of a repository share its locks, so key by the git common directory."""
+        path = Path(repo_path).expanduser().absolute()
+        dot_git = path / ".git"
+        
+        if dot_git.is_file():
+            # Linked worktree: .git points at <common dir>/worktrees/<name>
+            git_dir = Path(dot_git.read_text().split("gitdir:", 1)[-1].strip())
+            if git_dir.parent.name == "worktrees":
+                return str(git_dir.parent.parent.resolve())
+            return str(git_dir.resolve())
+        if dot_git.is_dir():
+            return str(dot_git.resolve())
+        # Bare repository (or a path that no longer exists)
+        return str(path.resolve())
+
+# Process-wide scheduler; metrics cover every event loop in the process
+git_scheduler = GitScheduler()
\ No newline at end of file
@@ -0,0 +1,238 @@
+import os
+import shlex
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+from loguru import logger
+
+from app.core.config import settings
+from app.models import Repository, Task
+from app.services.dependency_cache import get_dependency_cache
+from app.services.git_batch import get_git_batch_pool
+from app.services.git_manager import GitWorktreeManager, DEVBUD_GIT_IDENTITY
+from app.services.git_scheduler import git_scheduler
+from app.services.process import run_shell
+from app.services.task_dependencies import result_commit
+from app.services.task_verification import TaskVerifier, RunOutcome
+
+
+@dataclass
+class TrainCar:
+    """One task in a merge train and what became of it."""
+    task_id: str
+    branch: str
+    commit: Optional[str] = None  # the task's result, merged into the train
+    status: str = "pending"  # merged, conflicted, failed_verification or missing
+    conflicts: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class VerificationRun:
+    tree: str
+    passed: bool
+    duration_seconds: float
+    output: str = ""  # tail of the command's output
+    cached: bool = False  # reused from an earlier run on the same tree
+
+
+@dataclass
+class MergeTrainReport:
+    integration_branch: str
+    base_commit: str
+    head_commit: Optional[str] = None
+    cars: List[TrainCar] = field(default_factory=list)
+    baseline_passed: Optional[bool] = None
+    verifications: List[VerificationRun] = field(default_factory=list)
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class MergeTrainService:
+    """Integrates completed tasks into one branch.
+    
+    Task results are merged onto the default branch in order in a scratch
+    worktree; a task that conflicts with the train so far is left out. When a
+    verification command is given and the merged head fails it, the first
+    task whose merge breaks verification is found by bisecting the train,
+    removed, and the remaining tasks are merged again, until the head passes.
+    Verification results are shared with task verification through the
+    verifier's cache, so identical trees are never verified twice.
+    """
+    
+    def __init__(
+        self,
+        git_manager: GitWorktreeManager,
+        verify_timeout: Optional[int] = None,
+        verifier: Optional[TaskVerifier] = None
+    ):
+        self.git_manager = git_manager
+        self.verify_timeout = verify_timeout
+        self.verifier = verifier or TaskVerifier(git_manager, verify_timeout, session_factory=None)
+    
+    async def run(
+        self,
+        repository: Repository,
+        tasks: List[Task],
+        integration_branch: str,
+        verify_command: Optional[str] = None
+    ) -> MergeTrainReport:
+        """Merge the tasks' results and point ``integration_branch`` at the outcome."""
+        repo_path = repository.path
+        batch = await get_git_batch_pool().get(repo_path)
+        base = await batch.resolve(repository.default_ref)
+        if base is None:
+            raise RuntimeError(f"Default branch {repository.default_branch} not found in {repo_path}")
+        
+        report = MergeTrainReport(integration_branch=integration_branch, base_commit=base)
+        report.cars = [await self._task_commit(repo_path, task) for task in tasks]
+        
+        scratch = self.git_manager.base_path / os.path.basename(repo_path) / f".merge-train-{uuid.uuid4().hex[:12]}"
+        scratch.parent.mkdir(parents=True, exist_ok=True)
+        await git_scheduler.write(repo_path, lambda: run_shell(
+            f"git worktree add --detach {shlex.quote(str(scratch))} {base}",
+            cwd=repo_path
+        ))
+        
+        try:
+            cwd = str(scratch)
+            cars = [car for car in report.cars if car.status != "missing"]
+            heads = await self._merge(cwd, base, cars)
+            head = heads[-1] if heads else base
+            
+            if verify_command and heads:
+                await self.git_manager.install_dependencies(
+                    cwd,
+                    policy=repository.install_policy.value,
+                    command=repository.install_command,
+                    timeout=repository.install_timeout or settings.DEPENDENCY_INSTALL_TIMEOUT
+                )
+                head = await self._bisect_failures(
+                    repository.id, cwd, base, cars, heads, verify_command, report
+                )
+            
+            report.head_commit = head
+            await git_scheduler.write(repo_path, lambda: run_shell(
+                f"git branch -f {shlex.quote(integration_branch)} {head}",
+                cwd=repo_path
+            ))
+        finally:
+            await self.git_manager.remove_worktree(str(scratch))
+        
+        merged = sum(car.status == "merged" for car in report.cars)
+        logger.info(
+            f"Merge train {integration_branch}: {merged} of {len(report.cars)} task(s) merged at {report.head_commit}"
+        )
+        return report
+    
+    async def _task_commit(self, repo_path: str, task: Task) -> TrainCar:
+        """A commit holding the task's final worktree contents on top of its branch."""
+        car = TrainCar(task_id=str(task.id), branch=task.branch_name)
+        car.commit = await result_commit(repo_path, task)
+        if car.commit is None:
+            car.status = "missing"
+            car.error = "Task branch no longer exists"
+        return car
+    
+    async def _merge(self, cwd: str, base: str, cars: List[TrainCar]) -> List[str]:
+        """Merge cars onto base in order; return the head after each car that merged."""
+        await run_shell(f"git checkout -q --detach {base} && git reset -q --hard && git clean -fdq", cwd=cwd)
+        env = {**os.environ, **DEVBUD_GIT_IDENTITY}
+        
+        heads = []
+        for car in cars:
+            # Conflicted tasks get another chance when the train is rebuilt without a failing task
+            if car.status == "failed_verification":
+                continue
+            try:
+                await run_shell(
+                    f"git merge -q --no-ff --no-edit -m {shlex.quote(f'Merge task {car.branch}')} {car.commit}",
+                    cwd=cwd,
+                    env=env
+                )
+            except RuntimeError as e:
+                car.status = "conflicted"
+                car.error = str(e).splitlines()[-1]
+                conflicts = await run_shell("git diff --name-only --diff-filter=U", cwd=cwd)
+                car.conflicts = conflicts.splitlines()
+                await run_shell("git merge --abort || git reset -q --hard", cwd=cwd)
+                continue
+            
+            car.status = "merged"
+            car.conflicts = []
+            car.error = None
+            heads.append((await run_shell("git rev-parse HEAD", cwd=cwd)).strip())
+        
+        return heads
+    
+    async def _bisect_failures(
+        self,
+        repository_id,
+        cwd: str,
+        base: str,
+        cars: List[TrainCar],
+        heads: List[str],
+        verify_command: str,
+        report: MergeTrainReport
+    ) -> str:
+        """Drop tasks that break verification until the train's head passes; return the head."""
+        results: Dict[str, bool] = {}
+        
+        async def passes(commit: str) -> bool:
+            tree = (await run_shell(f"git rev-parse {commit}^{{tree}}", cwd=cwd)).strip()
+            if tree not in results:
+                result, cached = await self.verifier.verify_tree(
+                    repository_id, tree, verify_command,
+                    run=lambda: self._verify(cwd, commit, verify_command)
+                )
+                report.verifications.append(VerificationRun(
+                    tree=tree,
+                    passed=result.passed,
+                    duration_seconds=result.duration_seconds,
+                    output=result.output or "",
+                    cached=cached
+                ))
+                results[tree] = result.passed
+            return results[tree]
+        
+        while heads and not await passes(heads[-1]):
+            if report.baseline_passed is None:
+                report.baseline_passed = await passes(base)
+                if not report.baseline_passed:
+                    # The default branch itself fails; no task can be blamed
+                    logger.warning(f"Verification fails on {base} itself; keeping every merged task")
+                    return heads[-1]
+            
+            # The base passes and the head fails: find the first merge that fails
+            merged = [car for car in cars if car.status == "merged"]
+            good, bad = -1, len(heads) - 1
+            while bad - good > 1:
+                middle = (good + bad) // 2
+                if await passes(heads[middle]):
+                    good = middle
+                else:
+                    bad = middle
+            
+            merged[bad].status = "failed_verification"
+            heads = await self._merge(cwd, base, cars)
+        
+        return heads[-1] if heads else base
+    
+    async def _verify(self, cwd: str, commit: str, verify_command: str) -> RunOutcome:
+        # Keep ignored files such as installed dependencies between checkouts
+        await run_shell(f"git checkout -q --detach {commit} && git reset -q --hard && git clean -fdq", cwd=cwd)
+        return await self.verifier.run_command(cwd, verify_command, self.verify_timeout)
+
+
+def get_merge_train_service() -> MergeTrainService:
+    """Create the merge train service configured by the application settings."""
+    git_manager = GitWorktreeManager(
+        base_path=settings.WORKTREE_BASE_PATH,
+        dependency_cache=get_dependency_cache()
+    )
+    return MergeTrainService(
+        git_manager=git_manager,
+        verify_timeout=settings.MERGE_TRAIN_VERIFY_TIMEOUT,
+        verifier=TaskVerifier(git_manager, settings.MERGE_TRAIN_VERIFY_TIMEOUT)
+    )
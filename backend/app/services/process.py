@@ -0,0 +1,64 @@
+import asyncio
+import os
+import signal
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+OutputCallback = Callable[[str], Awaitable[None]]
+
+
+async def run_shell(
+    command: str,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    on_output: Optional[OutputCallback] = None
+) -> str:
+    """Run a shell command asynchronously and return its stdout.
+    
+    When ``on_output`` is given, stdout and stderr lines are passed to it as
+    they are produced. The command runs in its own process group so that a
+    timeout kills any children it spawned as well.
+    """
+    process = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        start_new_session=True
+    )
+    
+    try:
+        if on_output is None:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        else:
+            stdout, stderr = await asyncio.wait_for(_stream(process, on_output), timeout)
+    except asyncio.TimeoutError:
+        # Kill the whole process group: the shell's children hold the pipes open
+        os.killpg(process.pid, signal.SIGKILL)
+        await process.wait()
+        raise RuntimeError(f"Command timed out after {timeout} seconds: {command}")
+    
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"Command failed: {command}\n"
+            f"Error: {stderr.decode()}"
+        )
+    
+    return stdout.decode()
+
+
+async def _stream(process: asyncio.subprocess.Process, on_output: OutputCallback):
+    """Forward output lines as they arrive while collecting them like communicate()."""
+    stdout: List[bytes] = []
+    stderr: List[bytes] = []
+    
+    async def pump(stream: asyncio.StreamReader, sink: List[bytes]) -> None:
+        async for line in stream:
+            sink.append(line)
+            await on_output(line.decode("utf-8", errors="replace"))
+    
+    await asyncio.gather(pump(process.stdout, stdout), pump(process.stderr, stderr))
+    await process.wait()
+    return b"".join(stdout), b"".join(stderr)
\ No newline at end of file
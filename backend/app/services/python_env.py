@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import re
+import shlex
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+
+from app.services.dependency_cache import DependencyCache
+from app.services.process import run_shell, OutputCallback
+
+
+VENV_DIR = ".venv"
+
+# Files inside a virtualenv that embed absolute paths and must be rewritten
+# when the environment is cloned into a different worktree
+RELOCATABLE_SUFFIXES = (".pth", ".cfg", ".fish", ".csh", ".ps1", ".sh", ".json")
+
+# Installs that can start from another environment: pip reports what the requirements
+# resolve to, so whatever else the base environment held can be uninstalled afterwards
+DELTA_INSTALL_PREFIX = "pip install "
+
+# Installed by venv itself rather than by the requirements
+SEED_PACKAGES = {"pip", "setuptools", "wheel"}
+
+
+class PythonEnvBuilder:
+    """Builds an isolated virtualenv per worktree, cloned from a cached base environment."""
+    
+    def __init__(
+        self,
+        dependency_cache: Optional[DependencyCache] = None,
+        interpreter: str = sys.executable
+    ):
+        self.dependency_cache = dependency_cache
+        self.interpreter = interpreter
+    
+    @property
+    def namespace(self) -> str:
+        """Cache namespace shared by all environments built with this interpreter."""
+        return f"venv:{Path(self.interpreter).resolve()}"
+    
+    async def build(
+        self,
+        worktree_path: str,
+        lockfile: str,
+        command: str,
+        timeout: Optional[int] = None,
+        cache_only: bool = False,
+        on_output: Optional[OutputCallback] = None
+    ) -> Optional[str]:
+        """Create the worktree's virtualenv and install its dependencies into it.
+        
+        With ``cache_only`` the environment is only cloned on an exact cache hit
+        and nothing is installed; returns None when no environment was created.
+        """
+        worktree_path = Path(worktree_path)
+        venv_path = worktree_path / VENV_DIR
+        self._exclude_from_git(worktree_path)
+        
+        if not self.dependency_cache:
+            if cache_only:
+                return None
+            await self._create_venv(venv_path)
+            await self._run_command(
+                command, cwd=str(worktree_path), env=self.environment(venv_path),
+                timeout=timeout, on_output=on_output
+            )
+            return str(venv_path)
+        
+        key = DependencyCache.compute_key(f"{self.namespace}\0{command}", [worktree_path / lockfile])
+        
+        entry = self.dependency_cache.get_entry(key)
+        if entry is not None and await self._clone_from(entry, key, worktree_path):
+            logger.info(f"Python environment cache hit for {lockfile} in {worktree_path}")
+            return str(venv_path)
+        
+        if cache_only:
+            return None
+        
+        # Start from the most recently used environment so that only the packages
+        # that differ from it have to be installed, then drop those it has in excess
+        base = self.dependency_cache.latest(self.namespace) if command.startswith(DELTA_INSTALL_PREFIX) else None
+        if base is None or not await self._clone_from(base, base.key, worktree_path):
+            await self._create_venv(venv_path)
+            base = None
+        
+        await self._run_command(
+            command, cwd=str(worktree_path), env=self.environment(venv_path),
+            timeout=timeout, on_output=on_output
+        )
+        if base is not None and not await self._remove_extras(worktree_path, command, timeout):
+            # Cannot tell which packages of the base are unwanted: build from scratch instead
+            await self._create_venv(venv_path)
+            await self._run_command(
+                command, cwd=str(worktree_path), env=self.environment(venv_path),
+                timeout=timeout, on_output=on_output
+            )
+        
+        try:
+            await self.dependency_cache.populate(
+                key,
+                str(venv_path),
+                namespace=self.namespace,
+                metadata={"origin": str(worktree_path)}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to populate Python environment cache from {venv_path}: {e}")
+        
+        return str(venv_path)
+    
+    @staticmethod
+    def environment(venv_path: Path, base_env: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Return environment variables that activate the given virtualenv."""
+        env = dict(os.environ if base_env is None else base_env)
+        env["VIRTUAL_ENV"] = str(venv_path)
+        env["PATH"] = f"{venv_path / 'bin'}{os.pathsep}{env.get('PATH', '')}"
+        env.pop("PYTHONHOME", None)
+        return env
+    
+    async def _remove_extras(self, worktree_path: Path, command: str, timeout: Optional[int] = None) -> bool:
+        """Uninstall packages a cloned base left behind that the requirements do not need.
+        
+        The environment then holds what a fresh install would. Returns False
+        if pip could not report what the requirements resolve to.
+        """
+        env = self.environment(worktree_path / VENV_DIR)
+        requirements = command[len(DELTA_INSTALL_PREFIX):]
+        try:
+            report = json.loads(await self._run_command(
+                f"pip install --dry-run --ignore-installed --quiet --report - {requirements}",
+                cwd=str(worktree_path), env=env, timeout=timeout
+            ))
+            installed = json.loads(await self._run_command(
+                "pip list --format=json", cwd=str(worktree_path), env=env
+            ))
+            required = {_canonical_name(item["metadata"]["name"]) for item in report["install"]} | SEED_PACKAGES
+        except (RuntimeError, ValueError, KeyError) as e:
+            logger.warning(f"Could not resolve the requirements of {worktree_path}: {e}")
+            return False
+        
+        extras = sorted(package["name"] for package in installed if _canonical_name(package["name"]) not in required)
+        if extras:
+            await self._run_command(
+                f"pip uninstall --yes {' '.join(shlex.quote(name) for name in extras)}",
+                cwd=str(worktree_path), env=env, timeout=timeout
+            )
+            logger.info(f"Removed {len(extras)} package(s) of the base environment from {worktree_path}")
+        return True
+    
+    async def _clone_from(self, entry, key: str, worktree_path: Path) -> bool:
+        """Materialize a cached environment into the worktree and fix its embedded paths."""
+        venv_path = worktree_path / VENV_DIR
+        if not await self.dependency_cache.materialize(key, str(venv_path)):
+            return False
+        
+        origin = entry.metadata.get("origin")
+        if origin and origin != str(worktree_path):
+            await asyncio.to_thread(self._relocate, venv_path, origin, str(worktree_path))
+        
+        return True
+    
+    @staticmethod
+    def _relocate(venv_path: Path, old_root: str, new_root: str) -> None:
+        """Rewrite absolute paths of the original worktree to the new one."""
+        old, new = old_root.encode(), new_root.encode()
+        candidates = [p for p in (venv_path / "bin").iterdir() if p.is_file() and not p.is_symlink()]
+        candidates.append(venv_path / "pyvenv.cfg")
+        
+        for lib_root, _, files in os.walk(venv_path / "lib"):
+            candidates.extend(
+                Path(lib_root) / name
+                for name in files
+                if name.endswith(RELOCATABLE_SUFFIXES)
+            )
+        
+        for path in candidates:
+            try:
+                content = path.read_bytes()
+            except OSError:
+                continue
+            if old not in content:
+                continue
+            
+            # Write a new inode instead of editing in place: the file may be a
+            # hardlink into the shared cache.
+            tmp_path = path.with_name(f".{path.name}.relocate")
+            tmp_path.write_bytes(content.replace(old, new))
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+    
+    async def _create_venv(self, venv_path: Path) -> None:
+        if venv_path.exists():
+            await asyncio.to_thread(shutil.rmtree, venv_path)
+        await self._run_command(f"{self.interpreter} -m venv {venv_path}")
+    
+    @staticmethod
+    def _exclude_from_git(worktree_path: Path) -> None:
+        """Keep the virtualenv out of git status for every worktree of the repository."""
+        git_file = worktree_path / ".git"
+        try:
+            if git_file.is_file():
+                # Linked worktree: .git points at <common dir>/worktrees/<name>
+                git_dir = Path(git_file.read_text().split("gitdir:", 1)[1].strip())
+                common_dir = git_dir.parent.parent
+            elif git_file.is_dir():
+                common_dir = git_file
+            else:
+                return
+            
+            exclude = common_dir / "info" / "exclude"
+            existing = exclude.read_text() if exclude.exists() else ""
+            pattern = f"/{VENV_DIR}/"
+            if pattern in existing.splitlines():
+                return
+            
+            if existing and not existing.endswith("\n"):
+                pattern = "\n" + pattern
+            exclude.parent.mkdir(parents=True, exist_ok=True)
+            with open(exclude, "a") as f:
+                f.write(pattern + "\n")
+        except (OSError, IndexError) as e:
+            logger.debug(f"Could not update git exclude for {worktree_path}: {e}")
+    
+    async def _run_command(
+        self,
+        command: str,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        on_output: Optional[OutputCallback] = None
+    ) -> str:
+        """Run a shell command asynchronously."""
+        return await run_shell(command, cwd=cwd, env=env, timeout=timeout, on_output=on_output)
+
+
+def _canonical_name(name: str) -> str:
+    """Normalize a distribution name (PEP 503) so differently spelled names compare equal."""
+    return re.sub(r"[-_.]+", "-", name).lower()
\ No newline at end of file
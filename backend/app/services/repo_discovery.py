@@ -0,0 +1,130 @@
+import asyncio
+import os
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.git_manager import PACKAGE_MANAGERS
+from app.services.process import run_shell
+
+
+# Directories that never contain checkouts worth registering
+SKIPPED_DIRECTORIES = {"__pycache__"} | {d for _, _, d in PACKAGE_MANAGERS if d}
+
+# One git process per candidate: validates it, then prints the bare flag, the
+# current branch and the branch origin/HEAD points at, separated by a blank line
+PROBE_COMMAND = (
+    "git rev-parse --is-bare-repository || exit 1; "
+    "git symbolic-ref -q --short HEAD; echo; "
+    "git symbolic-ref -q refs/remotes/origin/HEAD || true"
+)
+
+
+@dataclass
+class DiscoveredRepository:
+    path: str
+    name: str
+    default_branch: Optional[str] = None
+    is_bare: bool = False
+    error: Optional[str] = None  # set when the candidate is not a usable repository
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class RepositoryDiscovery:
+    """Finds git repositories under a directory tree.
+    
+    The tree is walked level by level with at most ``max_concurrency``
+    directory listings and git probes in flight. Linked worktrees and
+    submodules (a ``.git`` file rather than a directory) are not reported,
+    and the walk does not descend into repositories it finds.
+    """
+    
+    def __init__(self, max_concurrency: int = 16, probe_timeout: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.probe_timeout = probe_timeout
+    
+    async def discover(self, root: str, max_depth: int) -> AsyncIterator[DiscoveredRepository]:
+        """Yield repositories up to ``max_depth`` levels below ``root`` as they are validated."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        level = [Path(root).expanduser().absolute()]
+        
+        for depth in range(max_depth + 1):
+            listings = await asyncio.gather(*(self._scan(directory, semaphore) for directory in level))
+            
+            candidates, next_level = [], []
+            for directory, (is_repository, subdirectories) in zip(level, listings):
+                if is_repository:
+                    candidates.append(directory)
+                elif depth < max_depth:
+                    next_level.extend(subdirectories)
+            
+            probes = [asyncio.ensure_future(self._probe(path, semaphore)) for path in candidates]
+            for probe in asyncio.as_completed(probes):
+                yield await probe
+            
+            level = next_level
+    
+    async def _scan(self, directory: Path, semaphore: asyncio.Semaphore) -> Tuple[bool, List[Path]]:
+        async with semaphore:
+            return await asyncio.to_thread(_scan_directory, directory)
+    
+    async def _probe(self, path: Path, semaphore: asyncio.Semaphore) -> DiscoveredRepository:
+        found = DiscoveredRepository(path=str(path), name=path.name[:100])
+        if path.name.endswith(".git") and len(path.name) > 4:
+            found.name = path.name[:-4][:100]
+        
+        async with semaphore:
+            try:
+                # The ceiling keeps git from falling back to an enclosing repository
+                output = await run_shell(
+                    PROBE_COMMAND,
+                    cwd=str(path),
+                    env={**os.environ, "GIT_CEILING_DIRECTORIES": str(path.parent)},
+                    timeout=self.probe_timeout
+                )
+            except RuntimeError as e:
+                found.error = str(e).splitlines()[-1]
+                return found
+        
+        head, _, origin = output.partition("\n\n")
+        lines = head.splitlines()
+        found.is_bare = lines[0].strip() == "true"
+        origin_head = origin.strip()
+        if origin_head.startswith("refs/remotes/origin/"):
+            found.default_branch = origin_head[len("refs/remotes/origin/"):]
+        elif len(lines) > 1 and lines[1].strip():
+            found.default_branch = lines[1].strip()
+        return found
+
+
+def _scan_directory(directory: Path) -> Tuple[bool, List[Path]]:
+    """Return whether a directory is a repository, and its subdirectories worth descending into."""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return False, []
+    
+    names = {entry.name: entry for entry in entries}
+    dot_git = names.get(".git")
+    if dot_git is not None:
+        # A .git file belongs to a linked worktree or a submodule
+        return dot_git.is_dir(follow_symlinks=False), []
+    if "HEAD" in names and "objects" in names and "refs" in names:
+        # Bare repository
+        return True, []
+    
+    subdirectories = [
+        Path(entry.path) for entry in entries
+        if entry.is_dir(follow_symlinks=False)
+        and not entry.name.startswith(".")
+        and entry.name not in SKIPPED_DIRECTORIES
+    ]
+    return False, subdirectories
+
+
+def get_repository_discovery() -> RepositoryDiscovery:
+    """Create the repository discovery service configured by the application settings."""
+    return RepositoryDiscovery(max_concurrency=settings.REPO_DISCOVERY_CONCURRENCY)
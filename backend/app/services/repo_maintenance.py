@@ -0,0 +1,215 @@
+import shlex
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Task, Repository, TaskStatus, BranchPrunePolicy, RepositoryMaintenance
+from app.services.git_manager import GitWorktreeManager
+from app.services.git_scheduler import git_scheduler
+from app.services.process import run_shell
+
+
+# Run one at a time, in this order: loose objects must be packed before the
+# multi-pack-index can cover them, and each step releases the repository lock
+MAINTENANCE_TASKS = ["loose-objects", "incremental-repack", "commit-graph", "pack-refs"]
+
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+class RepositoryMaintenanceService:
+    """Keeps registered repositories fast as task branches and worktrees pile up.
+    
+    A run packs loose objects, repacks incrementally behind a multi-pack-index,
+    writes the commit-graph and packs refs, prunes stale worktree entries and
+    deletes finished task branches allowed by the repository's prune policy.
+    The metadata queries DevBud issues most are timed before and after.
+    Scheduled runs only touch repositories that are idle.
+    """
+    
+    def __init__(
+        self,
+        git_manager: GitWorktreeManager,
+        interval_seconds: int,
+        idle_seconds: int
+    ):
+        self.git_manager = git_manager
+        self.interval_seconds = interval_seconds
+        self.idle_seconds = idle_seconds
+    
+    async def run_due(self, db: AsyncSession) -> List[RepositoryMaintenance]:
+        """Maintain every active repository that is idle and has not been maintained recently."""
+        query = select(Repository).where(Repository.is_active == True)
+        repositories = (await db.execute(query)).scalars().all()
+        
+        runs = []
+        for repository in repositories:
+            if await self.is_due(db, repository):
+                runs.append(await self.run(db, repository))
+        return runs
+    
+    async def is_due(self, db: AsyncSession, repository: Repository) -> bool:
+        """Whether a repository is idle and its last run is older than the interval."""
+        now = datetime.utcnow()
+        
+        last = await RepositoryMaintenance.last_run(db, repository.id)
+        if last is not None and now - last.created_at < timedelta(seconds=self.interval_seconds):
+            return False
+        
+        query = select(
+            func.count(Task.id).filter(Task.status.in_([TaskStatus.PENDING, TaskStatus.RUNNING])),
+            func.max(Task.updated_at)
+        ).where(Task.repository_id == repository.id)
+        active, last_activity = (await db.execute(query)).one()
+        
+        if active:
+            return False
+        return last_activity is None or now - last_activity >= timedelta(seconds=self.idle_seconds)
+    
+    async def run(self, db: AsyncSession, repository: Repository) -> RepositoryMaintenance:
+        """Maintain one repository and record the outcome."""
+        repo_path = str(Path(repository.path).expanduser().absolute())
+        started = time.monotonic()
+        record = RepositoryMaintenance(repository_id=repository.id, tasks=[], pruned_branches=[])
+        
+        try:
+            record.before = await self.measure(repo_path)
+            
+            for name in MAINTENANCE_TASKS:
+                record.tasks.append(await self._run_task(repo_path, name))
+            
+            await self.git_manager.prune_worktrees(repo_path)
+            record.pruned_branches = await self.prune_branches(db, repository, repo_path)
+            
+            record.after = await self.measure(repo_path)
+            failed = [task["task"] for task in record.tasks if task["status"] == "failed"]
+            record.status = "failed" if failed else "succeeded"
+            if failed:
+                record.error_message = f"git maintenance task(s) failed: {', '.join(failed)}"
+        except Exception as e:
+            logger.error(f"Maintenance of {repository.name} failed: {e}")
+            record.status = "failed"
+            record.error_message = str(e)
+        
+        record.duration_seconds = time.monotonic() - started
+        db.add(record)
+        await db.commit()
+        
+        logger.info(
+            f"Maintained {repository.name} in {record.duration_seconds:.1f}s: {record.status}, "
+            f"{len(record.pruned_branches or [])} branch(es) pruned"
+        )
+        return record
+    
+    async def measure(self, repo_path: str) -> Dict:
+        """Time the metadata queries task startup depends on and count objects and refs."""
+        timings = {}
+        outputs = {}
+        for name, command in [
+            ("worktree_list", "git worktree list --porcelain"),
+            ("rev_parse", "git rev-parse HEAD"),
+            ("for_each_ref", "git for-each-ref --format='%(objectname) %(refname)'"),
+        ]:
+            started = time.monotonic()
+            outputs[name] = await run_shell(command, cwd=repo_path)
+            timings[name] = time.monotonic() - started
+        
+        counts = {}
+        for line in (await run_shell("git count-objects -v", cwd=repo_path)).splitlines():
+            key, _, value = line.partition(": ")
+            if value.isdigit():
+                counts[key] = int(value)
+        
+        return {
+            "timings": timings,
+            "loose_objects": counts.get("count", 0),
+            "packs": counts.get("packs", 0),
+            "refs": len(outputs["for_each_ref"].splitlines())
+        }
+    
+    async def prune_branches(
+        self,
+        db: AsyncSession,
+        repository: Repository,
+        repo_path: Optional[str] = None
+    ) -> List[str]:
+        """Delete branches of finished tasks whose worktrees are gone, as the prune policy allows."""
+        policy = repository.branch_prune_policy or BranchPrunePolicy.MERGED
+        if policy == BranchPrunePolicy.NEVER:
+            return []
+        repo_path = repo_path or str(Path(repository.path).expanduser().absolute())
+        
+        query = select(Task.branch_name).where(
+            Task.repository_id == repository.id,
+            Task.status.in_(FINISHED_STATUSES),
+            Task.is_pinned == False,
+            Task.worktree_path.is_(None)
+        )
+        candidates = set((await db.execute(query)).scalars().all())
+        candidates.discard(repository.default_branch)
+        if not candidates:
+            return []
+        
+        # Branches still checked out in a worktree cannot be deleted
+        checked_out = {
+            worktree["branch"][len("refs/heads/"):]
+            for worktree in await self.git_manager.list_worktrees(repo_path)
+            if worktree.get("branch", "").startswith("refs/heads/")
+        }
+        candidates -= checked_out
+        
+        if policy == BranchPrunePolicy.MERGED:
+            try:
+                merged = await run_shell(
+                    f"git for-each-ref --merged {shlex.quote(repository.default_ref)} --format='%(refname:short)' refs/heads",
+                    cwd=repo_path
+                )
+            except RuntimeError as e:
+                logger.warning(f"Cannot tell which task branches of {repository.name} are merged: {e}")
+                return []
+            candidates &= set(merged.splitlines())
+        else:
+            existing = await run_shell(
+                "git for-each-ref --format='%(refname:short)' refs/heads",
+                cwd=repo_path
+            )
+            candidates &= set(existing.splitlines())
+        
+        if not candidates:
+            return []
+        
+        branches = sorted(candidates)
+        await git_scheduler.write(repo_path, lambda: run_shell(
+            f"git branch -D {' '.join(shlex.quote(branch) for branch in branches)}",
+            cwd=repo_path
+        ))
+        logger.info(f"Pruned {len(branches)} task branch(es) of {repository.name} ({policy.value})")
+        return branches
+    
+    async def _run_task(self, repo_path: str, name: str) -> Dict:
+        started = time.monotonic()
+        result = {"task": name, "status": "succeeded", "error": None}
+        try:
+            await git_scheduler.write(repo_path, lambda: run_shell(
+                f"git maintenance run --task={name}",
+                cwd=repo_path
+            ))
+        except RuntimeError as e:
+            logger.warning(f"git maintenance task {name} failed in {repo_path}: {e}")
+            result["status"] = "failed"
+            result["error"] = str(e)
+        result["duration_seconds"] = time.monotonic() - started
+        return result
+
+
+def get_repository_maintenance() -> RepositoryMaintenanceService:
+    """Create the maintenance service configured by the application settings."""
+    return RepositoryMaintenanceService(
+        git_manager=GitWorktreeManager(base_path=settings.WORKTREE_BASE_PATH),
+        interval_seconds=settings.MAINTENANCE_INTERVAL_SECONDS,
+        idle_seconds=settings.MAINTENANCE_IDLE_SECONDS
+    )
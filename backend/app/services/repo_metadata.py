@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+from app.core.config import settings
+from app.services.git_batch import GitBatch, GitBatchError, get_git_batch_pool
+from app.services.git_manager import GitWorktreeManager
+from app.services.process import run_shell
+from app.services.websocket_manager import get_redis
+
+
+REDIS_KEY_PREFIX = "devbud:repo-metadata:"
+
+
+@dataclass
+class RepositoryMetadata:
+    """Git state of a repository as shown by the dashboard."""
+    path: str
+    head_branch: str
+    head_commit: Optional[str]
+    branches: Dict[str, str] = field(default_factory=dict)  # branch name -> commit
+    worktrees: List[Dict] = field(default_factory=list)
+    is_dirty: bool = False
+    fingerprint: str = ""
+    dirty_checked_at: float = 0.0
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class RepositoryMetadataCache:
+    """Caches repository metadata until git's on-disk state changes.
+    
+    Entries are keyed by a fingerprint of the modification times of HEAD,
+    refs, packed-refs, the index and the worktree administrative files, so
+    checking freshness costs a few stat calls instead of git processes. The
+    working tree itself cannot be fingerprinted cheaply, so the dirty flag
+    is also refreshed once ``dirty_ttl`` seconds have passed. With
+    ``use_redis`` entries are shared between the API and worker processes.
+    """
+    
+    def __init__(
+        self,
+        git_manager: Optional[GitWorktreeManager] = None,
+        use_redis: bool = False,
+        dirty_ttl: float = 10.0
+    ):
+        self.git_manager = git_manager or GitWorktreeManager()
+        self.use_redis = use_redis
+        self.dirty_ttl = dirty_ttl
+        self._entries: Dict[str, RepositoryMetadata] = {}
+    
+    async def get(self, repo_path: str) -> Optional[RepositoryMetadata]:
+        """Return metadata for a repository, or None if it is not a git repository."""
+        key = str(Path(repo_path).expanduser().absolute())
+        
+        try:
+            batch = await get_git_batch_pool().get(key)
+            fingerprint = await asyncio.to_thread(self.fingerprint, batch)
+        except (GitBatchError, OSError):
+            self._entries.pop(key, None)
+            return None
+        
+        metadata = self._entries.get(key)
+        if metadata is None or metadata.fingerprint != fingerprint:
+            metadata = await self._load_shared(key, fingerprint)
+            if metadata is None:
+                metadata = await self._collect(key, batch, fingerprint)
+                await self._store_shared(key, metadata)
+        
+        if time.time() - metadata.dirty_checked_at >= self.dirty_ttl:
+            metadata.is_dirty = await self._is_dirty(key, batch)
+            metadata.dirty_checked_at = time.time()
+            await self._store_shared(key, metadata)
+        
+        self._entries[key] = metadata
+        return metadata
+    
+    async def get_many(self, repo_paths: List[str]) -> Dict[str, Optional[RepositoryMetadata]]:
+        """Return metadata for several repositories concurrently."""
+        results = await asyncio.gather(*(self.get(path) for path in repo_paths))
+        return dict(zip(repo_paths, results))
+    
+    def invalidate(self, repo_path: str) -> None:
+        """Drop the cached entry of a repository."""
+        self._entries.pop(str(Path(repo_path).expanduser().absolute()), None)
+    
+    @staticmethod
+    def fingerprint(batch: GitBatch) -> str:
+        """Summarize the modification times of the files git updates when refs or worktrees change."""
+        paths = [
+            batch.git_dir / "HEAD",
+            batch.git_dir / "index",
+            batch.common_dir / "packed-refs",
+        ]
+        # Updating a loose ref renames a lock file into its directory, bumping the directory mtime
+        for directory in [batch.common_dir / "refs" / "heads", batch.common_dir / "worktrees"]:
+            for root, dirs, files in os.walk(directory):
+                paths.append(Path(root))
+                if Path(root).parent == batch.common_dir / "worktrees":
+                    paths.extend(Path(root) / name for name in ("HEAD", "gitdir"))
+        
+        parts = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                parts.append("-")
+                continue
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        
+        return ",".join(parts)
+    
+    async def _collect(self, repo_path: str, batch: GitBatch, fingerprint: str) -> RepositoryMetadata:
+        head_commit, branches, worktrees, is_dirty = await asyncio.gather(
+            batch.resolve("HEAD"),
+            self._branches(repo_path),
+            self.git_manager.list_worktrees(repo_path),
+            self._is_dirty(repo_path, batch)
+        )
+        
+        return RepositoryMetadata(
+            path=repo_path,
+            head_branch=batch.head(),
+            head_commit=head_commit,
+            branches=branches,
+            worktrees=worktrees,
+            is_dirty=is_dirty,
+            fingerprint=fingerprint,
+            dirty_checked_at=time.time()
+        )
+    
+    async def _branches(self, repo_path: str) -> Dict[str, str]:
+        result = await run_shell(
+            "git for-each-ref --format='%(objectname) %(refname:short)' refs/heads",
+            cwd=repo_path
+        )
+        return {
+            name: commit
+            for commit, name in (line.split(" ", 1) for line in result.splitlines() if line)
+        }
+    
+    async def _is_dirty(self, repo_path: str, batch: GitBatch) -> bool:
+        if batch.git_dir == batch.repo_path:
+            # Bare mirror: there is no working tree
+            return False
+        
+        # Without optional locks status does not rewrite the index, which would change the fingerprint
+        result = await run_shell(
+            "git --no-optional-locks status --porcelain",
+            cwd=repo_path
+        )
+        return bool(result.strip())
+    
+    async def _load_shared(self, key: str, fingerprint: str) -> Optional[RepositoryMetadata]:
+        if not self.use_redis:
+            return None
+        
+        try:
+            cached = await get_redis().get(f"{REDIS_KEY_PREFIX}{key}")
+        except Exception as e:
+            logger.debug(f"Repository metadata cache unavailable in Redis: {e}")
+            return None
+        
+        if not cached:
+            return None
+        
+        metadata = RepositoryMetadata(**json.loads(cached))
+        return metadata if metadata.fingerprint == fingerprint else None
+    
+    async def _store_shared(self, key: str, metadata: RepositoryMetadata) -> None:
+        if not self.use_redis:
+            return
+        
+        try:
+            await get_redis().set(
+                f"{REDIS_KEY_PREFIX}{key}",
+                json.dumps(metadata.to_dict()),
+                ex=settings.REPO_METADATA_CACHE_TTL
+            )
+        except Exception as e:
+            logger.debug(f"Failed to share repository metadata through Redis: {e}")
+
+
+_metadata_cache: Optional[RepositoryMetadataCache] = None
+
+
+def get_repository_metadata_cache() -> RepositoryMetadataCache:
+    """Return the process-wide repository metadata cache configured by the application settings."""
+    global _metadata_cache
+    if _metadata_cache is None:
+        _metadata_cache = RepositoryMetadataCache(
+            use_redis=settings.REPO_METADATA_CACHE_REDIS,
+            dirty_ttl=settings.REPO_METADATA_DIRTY_TTL
+        )
+    return _metadata_cache
\ No newline at end of file
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import re
+import shlex
+import shutil
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+
+from app.core.config import settings
+from app.services.process import run_shell
+
+
+# Task branches live in the mirror's refs/heads, so remote branches are kept apart
+FETCH_REFSPEC = "+refs/heads/*:refs/remotes/origin/*"
+
+
+class RepositoryMirrorManager:
+    """Keeps one bare mirror per remote repository on this host.
+    
+    Task worktrees are added to the mirror itself, so they share its object
+    store: a remote's objects are downloaded once per host, and later
+    refreshes are incremental fetches.
+    """
+    
+    def __init__(self, base_path: str = "~/.devbud/mirrors", fetch_timeout: Optional[int] = None):
+        self.base_path = Path(base_path).expanduser()
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.fetch_timeout = fetch_timeout
+    
+    def mirror_path(self, remote_url: str) -> Path:
+        """Deterministic mirror location for a remote, identical on every host."""
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", remote_url.rstrip("/").rsplit("/", 1)[-1])
+        name = name[:-4] if name.endswith(".git") else name
+        digest = hashlib.sha1(remote_url.encode()).hexdigest()[:12]
+        return self.base_path / f"{name or 'repository'}-{digest}.git"
+    
+    async def ensure(self, remote_url: str) -> Path:
+        """Clone the mirror if this host has none yet, otherwise fetch new objects."""
+        path = self.mirror_path(remote_url)
+        if path.exists():
+            await self.fetch(remote_url)
+        else:
+            await self._clone(remote_url, path)
+        return path
+    
+    async def fetch(self, remote_url: str) -> None:
+        """Incrementally fetch a remote into its mirror."""
+        path = self.mirror_path(remote_url)
+        await run_shell("git fetch --prune --quiet origin", cwd=str(path), timeout=self.fetch_timeout)
+        logger.info(f"Fetched {remote_url} into {path}")
+    
+    async def default_branch(self, remote_url: str) -> Optional[str]:
+        """The remote's default branch as recorded when the mirror was cloned."""
+        try:
+            ref = await run_shell(
+                "git symbolic-ref --short refs/remotes/origin/HEAD",
+                cwd=str(self.mirror_path(remote_url))
+            )
+        except RuntimeError:
+            return None
+        return ref.strip().split("/", 1)[-1]
+    
+    async def _clone(self, remote_url: str, path: Path) -> None:
+        # Build the mirror next to its final location and rename it into place,
+        # so an interrupted clone never leaves a half-populated mirror behind
+        staging = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        if staging.exists():
+            shutil.rmtree(staging)
+        
+        try:
+            await run_shell(f"git init --bare --quiet {shlex.quote(str(staging))}")
+            await run_shell(f"git remote add origin {shlex.quote(remote_url)}", cwd=str(staging))
+            await run_shell(f"git config remote.origin.fetch '{FETCH_REFSPEC}'", cwd=str(staging))
+            await run_shell("git fetch --quiet origin", cwd=str(staging), timeout=self.fetch_timeout)
+            try:
+                await run_shell("git remote set-head origin --auto", cwd=str(staging))
+            except RuntimeError as e:
+                logger.warning(f"Could not determine default branch of {remote_url}: {e}")
+            os.rename(staging, path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not path.exists():
+                raise
+            # Another process finished cloning first; its mirror is just as good
+        
+        logger.info(f"Cloned mirror of {remote_url} into {path}")
+
+
+def get_mirror_manager() -> RepositoryMirrorManager:
+    """Create the mirror manager configured by the application settings."""
+    return RepositoryMirrorManager(
+        base_path=settings.MIRROR_BASE_PATH,
+        fetch_timeout=settings.GIT_FETCH_TIMEOUT
+    )
\ No newline at end of file
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Dict, Optional
+from loguru import logger
+
+from app.core.config import settings
+from app.models import Repository
+from app.services.websocket_manager import get_redis
+
+
+SLOTS_KEY_PREFIX = "devbud:repo-slots:"
+
+# Slots are members of a sorted set scored by lease expiry in Redis server time
+# (milliseconds), so worker clocks never matter. Expired leases of dead workers
+# are dropped before counting; a holder already in the set is refused with -1,
+# so one task never runs twice at once.
+ACQUIRE_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local expiry = now_ms + tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now_ms)
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return -1
+end
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], expiry, ARGV[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+RENEW_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now_ms + tonumber(ARGV[2]), ARGV[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class SlotAlreadyHeld(Exception):
+    """The holder already has a slot, i.e. the task is executing elsewhere."""
+
+
+class RepositorySemaphore:
+    """Limits how many tasks run at once on a repository, across all workers.
+    
+    A slot is a lease in Redis that expires unless renewed. While a slot is
+    held its lease is renewed in the background, so the slot of a worker
+    that dies is recovered ``lease_seconds`` later. Without Redis the limit
+    cannot be enforced and every task is let through.
+    """
+    
+    def __init__(self, repository_id: str, limit: int, lease_seconds: float = 60.0):
+        self.key = f"{SLOTS_KEY_PREFIX}{repository_id}"
+        self.limit = limit
+        self.lease_ms = int(lease_seconds * 1000)
+        self._renewers: Dict[str, asyncio.Task] = {}
+    
+    async def acquire(self, holder: str) -> bool:
+        """Take a slot for ``holder`` if one is free and keep it renewed until released.
+        
+        Raises SlotAlreadyHeld if ``holder`` has a slot already, e.g. a task
+        dispatched again while a worker is still starting it.
+        """
+        try:
+            acquired = await get_redis().eval(ACQUIRE_SCRIPT, 1, self.key, holder, self.limit, self.lease_ms)
+        except Exception as e:
+            logger.warning(f"Cannot enforce the task limit of {self.key}: {e}")
+            return True
+        
+        if acquired == -1:
+            raise SlotAlreadyHeld(f"{holder} already holds a slot of {self.key}")
+        if acquired and holder not in self._renewers:
+            self._renewers[holder] = asyncio.create_task(self._renew(holder))
+        return bool(acquired)
+    
+    async def release(self, holder: str) -> None:
+        """Stop renewing ``holder``'s slot and free it; releasing twice is harmless."""
+        renewer = self._renewers.pop(holder, None)
+        if renewer is not None:
+            renewer.cancel()
+            await asyncio.gather(renewer, return_exceptions=True)
+        try:
+            await get_redis().zrem(self.key, holder)
+        except Exception as e:
+            # The lease expires on its own
+            logger.warning(f"Failed to release slot of {holder} in {self.key}: {e}")
+    
+    async def _renew(self, holder: str) -> None:
+        interval = self.lease_ms / 3000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await get_redis().eval(RENEW_SCRIPT, 1, self.key, holder, self.lease_ms):
+                    # Lost after missing renewals; the task keeps running over the limit
+                    logger.warning(f"Slot of {holder} in {self.key} expired before it was renewed")
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to renew slot of {holder} in {self.key}: {e}")
+
+
+def get_repository_semaphore(repository_id: str, repository: Optional[Repository] = None) -> RepositorySemaphore:
+    """Create the task semaphore of a repository configured by the application settings."""
+    limit = (repository.max_concurrent_tasks if repository else None) or settings.MAX_CONCURRENT_TASKS_PER_REPO
+    return RepositorySemaphore(repository_id, limit, lease_seconds=settings.TASK_SLOT_LEASE_SECONDS)
\ No newline at end of file
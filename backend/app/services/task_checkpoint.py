@@ -0,0 +1,147 @@
+import asyncio
+import shlex
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+from loguru import logger
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Task
+from app.services.git_manager import GitWorktreeManager
+from app.services.process import run_shell
+
+
+CHECKPOINT_REF_PREFIX = "refs/devbud/checkpoints/"
+
+
+def checkpoint_ref(task_id: str) -> str:
+    """Hidden ref holding a task's latest checkpoint; never fetched or shown as a branch."""
+    return f"{CHECKPOINT_REF_PREFIX}{task_id}"
+
+
+class TaskCheckpointer:
+    """Checkpoints a running task's worktree and watches for preemption requests.
+    
+    Every ``interval`` seconds (when set) the worktree is committed to the
+    task's checkpoint ref. The task row is polled every ``poll_seconds``;
+    once ``preempt_requested`` is set a final checkpoint is taken and
+    ``on_preempt`` is called to stop the task so it can be requeued and
+    resumed from the checkpoint by any worker.
+    """
+    
+    def __init__(
+        self,
+        git_manager: GitWorktreeManager,
+        task_id: str,
+        repo_path: str,
+        worktree_path: str,
+        interval: Optional[int],
+        on_preempt: Callable[[], Awaitable],
+        poll_seconds: float = 5.0,
+        push: bool = False
+    ):
+        self.git_manager = git_manager
+        self.task_id = task_id
+        self.repo_path = repo_path
+        self.worktree_path = worktree_path
+        self.interval = interval
+        self.on_preempt = on_preempt
+        self.poll_seconds = poll_seconds
+        self.push = push
+        self.preempted = False
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start checkpointing in the background."""
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop checkpointing; no final checkpoint is taken."""
+        self._stop.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def checkpoint(self) -> Optional[str]:
+        """Commit the worktree to the checkpoint ref and record it on the task."""
+        ref = checkpoint_ref(self.task_id)
+        commit = await self.git_manager.checkpoint(
+            self.worktree_path, ref, message=f"DevBud checkpoint of task {self.task_id}"
+        )
+        if commit is None:
+            return None
+        
+        if self.push:
+            # Workers on other hosts fetch the checkpoint from the remote to resume
+            await run_shell(f"git push --quiet --force origin {ref}:{ref}", cwd=self.repo_path)
+        
+        # A separate session: the task's own session is busy streaming output
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Task).where(Task.id == UUID(self.task_id)).values(
+                checkpoint_commit=commit,
+                checkpointed_at=datetime.utcnow()
+            ))
+            await db.commit()
+        
+        logger.info(f"Checkpointed task {self.task_id} at {commit}")
+        return commit
+    
+    async def _run(self) -> None:
+        last_checkpoint = time.monotonic()
+        
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.poll_seconds)
+                return
+            except asyncio.TimeoutError:
+                pass
+            
+            try:
+                if await self._preempt_requested():
+                    await self.checkpoint()
+                    self.preempted = True
+                    await self.on_preempt()
+                    return
+                
+                if self.interval and time.monotonic() - last_checkpoint >= self.interval:
+                    await self.checkpoint()
+                    last_checkpoint = time.monotonic()
+            except Exception as e:
+                # A failed checkpoint loses at most one interval of work; never fail the task
+                logger.warning(f"Checkpoint of task {self.task_id} failed: {e}")
+    
+    async def _preempt_requested(self) -> bool:
+        async with AsyncSessionLocal() as db:
+            query = select(Task.preempt_requested).where(Task.id == UUID(self.task_id))
+            return bool((await db.execute(query)).scalar_one_or_none())
+
+
+async def fetch_checkpoint(repo_path: str, task_id: str) -> None:
+    """Fetch a task's checkpoint pushed by a worker on another host."""
+    ref = checkpoint_ref(task_id)
+    await run_shell(f"git fetch --quiet origin {shlex.quote(f'+{ref}:{ref}')}", cwd=repo_path)
+
+
+def get_task_checkpointer(
+    git_manager: GitWorktreeManager,
+    task: Task,
+    repo_path: str,
+    worktree_path: str,
+    push: bool,
+    on_preempt: Callable[[], Awaitable]
+) -> TaskCheckpointer:
+    """Create a checkpointer for a task configured by the application settings."""
+    return TaskCheckpointer(
+        git_manager,
+        str(task.id),
+        repo_path,
+        worktree_path,
+        interval=task.checkpoint_interval or settings.TASK_CHECKPOINT_INTERVAL,
+        on_preempt=on_preempt,
+        poll_seconds=settings.TASK_PREEMPT_POLL_SECONDS,
+        push=push
+    )
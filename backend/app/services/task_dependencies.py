@@ -0,0 +1,113 @@
+import os
+import shlex
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task, TaskStatus
+from app.services.git_batch import get_git_batch_pool
+from app.services.git_manager import DEVBUD_GIT_IDENTITY
+from app.services.process import run_shell
+
+
+FAILED_STATUSES = (TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+def resolve_dependencies(
+    waiting: List[Task],
+    statuses: Dict[UUID, TaskStatus]
+) -> Tuple[List[Task], List[Tuple[Task, str]]]:
+    """Split waiting tasks by the state of the tasks they depend on.
+    
+    Returns the tasks whose dependencies all completed (ready to dispatch)
+    and the tasks to cancel, with the reason, because a dependency failed,
+    was cancelled or no longer exists. Cancellation cascades: a waiting
+    task depending on one cancelled here is cancelled too. Tasks in neither
+    list wait for dependencies still pending or running.
+    """
+    statuses = dict(statuses)
+    doomed: Dict[UUID, Tuple[Task, str]] = {}
+    changed = True
+    while changed:
+        changed = False
+        for task in waiting:
+            if task.id in doomed:
+                continue
+            for parent_id in task.depends_on or []:
+                status = statuses.get(UUID(parent_id))
+                if status is None or status in FAILED_STATUSES:
+                    reason = f"Dependency {parent_id} {'no longer exists' if status is None else status.value}"
+                    doomed[task.id] = (task, reason)
+                    statuses[task.id] = TaskStatus.CANCELLED
+                    changed = True
+                    break
+    
+    ready = [
+        task for task in waiting
+        if task.id not in doomed
+        and all(statuses.get(UUID(parent_id)) == TaskStatus.COMPLETED for parent_id in task.depends_on or [])
+    ]
+    return ready, list(doomed.values())
+
+
+async def dependency_statuses(db: AsyncSession, tasks: List[Task]) -> Dict[UUID, TaskStatus]:
+    """Status of every task the given tasks depend on, in one query."""
+    parent_ids = {UUID(parent_id) for task in tasks for parent_id in task.depends_on or []}
+    if not parent_ids:
+        return {}
+    query = select(Task.id, Task.status).where(Task.id.in_(parent_ids))
+    return dict((await db.execute(query)).all())
+
+
+async def result_commit(repo_path: str, task: Task) -> Optional[str]:
+    """A commit holding a task's final worktree contents on top of its branch.
+    
+    None when neither the task branch nor its base commit exists anymore.
+    """
+    batch = await get_git_batch_pool().get(repo_path)
+    parent = await batch.resolve(f"refs/heads/{task.branch_name}") or task.base_commit
+    if parent is None:
+        return None
+    
+    parent_tree = await batch.resolve(f"{parent}^{{tree}}")
+    if not task.result_tree or task.result_tree == parent_tree:
+        return parent
+    
+    # The result may include work the task never committed
+    return (await run_shell(
+        f"git commit-tree {task.result_tree} -p {parent} -m {shlex.quote(f'Result of task {task.branch_name}')}",
+        cwd=repo_path,
+        env={**os.environ, **DEVBUD_GIT_IDENTITY}
+    )).strip()
+
+
+async def dependency_commits(db: AsyncSession, repo_path: str, task: Task) -> List[str]:
+    """Result commits of a task's dependencies, in the order they were given."""
+    query = select(Task).where(Task.id.in_([UUID(parent_id) for parent_id in task.depends_on or []]))
+    parents = {str(parent.id): parent for parent in (await db.execute(query)).scalars().all()}
+    
+    commits = []
+    for parent_id in task.depends_on or []:
+        parent = parents.get(parent_id)
+        if parent is None or parent.status != TaskStatus.COMPLETED:
+            raise RuntimeError(f"Dependency {parent_id} has not completed")
+        commit = await result_commit(repo_path, parent)
+        if commit is None:
+            raise RuntimeError(f"Result of dependency {parent_id} no longer exists")
+        commits.append(commit)
+    return commits
+
+
+async def merge_dependencies(worktree_path: str, commits: List[str]) -> None:
+    """Merge further dependency results into a worktree based on the first one."""
+    try:
+        await run_shell(
+            f"git merge -q --no-edit -m {shlex.quote('Merge task dependencies')} {' '.join(commits)}",
+            cwd=worktree_path,
+            env={**os.environ, **DEVBUD_GIT_IDENTITY}
+        )
+    except RuntimeError:
+        conflicts = (await run_shell("git diff --name-only --diff-filter=U", cwd=worktree_path)).split()
+        await run_shell("git merge --abort || git reset -q --hard", cwd=worktree_path)
+        raise RuntimeError(f"Results of the task's dependencies conflict in: {', '.join(conflicts) or 'unknown files'}")
\ No newline at end of file
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import shlex
+
+from app.core.config import settings
+from app.services.process import run_shell
+
+
+DIFF_HEADER = "diff --git a/"
+
+
+@dataclass
+class FileDiff:
+    path: str
+    additions: int
+    deletions: int
+    binary: bool = False
+    truncated: bool = False
+    patch: Optional[str] = None
+
+
+class TaskDiffService:
+    """Computes diffstats and per-file diffs between a task's base commit and result tree.
+    
+    Both ends are content-addressed object ids, so a generated patch never
+    goes stale: patches are cached by (base, head, path) in a size-bounded
+    LRU and each page of files costs at most one ``git diff`` run.
+    """
+    
+    def __init__(self, max_file_bytes: int, cache_bytes: int):
+        self.max_file_bytes = max_file_bytes
+        self.cache_bytes = cache_bytes
+        # (base, head, path) -> (patch, truncated)
+        self._cache: "OrderedDict[Tuple[str, str, str], Tuple[str, bool]]" = OrderedDict()
+        self._cached_bytes = 0
+    
+    async def diffstat(self, repo_path: str, base: str, head: str) -> Dict:
+        """Summarize the files changed between two commits or trees."""
+        output = await run_shell(
+            f"git diff --numstat -z --no-renames {base} {head}",
+            cwd=repo_path
+        )
+        
+        files = []
+        for record in output.split("\0"):
+            if not record:
+                continue
+            additions, deletions, path = record.split("\t", 2)
+            binary = additions == "-"
+            files.append({
+                "path": path,
+                "additions": 0 if binary else int(additions),
+                "deletions": 0 if binary else int(deletions),
+                "binary": binary
+            })
+        
+        return {
+            "files_changed": len(files),
+            "additions": sum(f["additions"] for f in files),
+            "deletions": sum(f["deletions"] for f in files),
+            "files": files
+        }
+    
+    async def file_diffs(
+        self,
+        repo_path: str,
+        base: str,
+        head: str,
+        files: List[Dict]
+    ) -> List[FileDiff]:
+        """Build unified diffs for a page of diffstat entries, generating only uncached ones."""
+        diffs = [
+            FileDiff(
+                path=f["path"],
+                additions=f["additions"],
+                deletions=f["deletions"],
+                binary=f["binary"]
+            )
+            for f in files
+        ]
+        
+        missing = [
+            d.path for d in diffs
+            if not d.binary and (base, head, d.path) not in self._cache
+        ]
+        if missing:
+            for path, patch in (await self._generate(repo_path, base, head, missing)).items():
+                self._store((base, head, path), patch)
+        
+        for diff in diffs:
+            if diff.binary:
+                continue
+            key = (base, head, diff.path)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            diff.patch, diff.truncated = self._cache.get(key, ("", False))
+        
+        return diffs
+    
+    async def _generate(
+        self,
+        repo_path: str,
+        base: str,
+        head: str,
+        paths: List[str]
+    ) -> Dict[str, str]:
+        pathspecs = " ".join(shlex.quote(f":(literal){path}") for path in paths)
+        output = await run_shell(
+            f"git -c core.quotePath=false diff --no-color --no-renames {base} {head} -- {pathspecs}",
+            cwd=repo_path
+        )
+        
+        patches: Dict[str, str] = {}
+        for chunk in output.split(f"\n{DIFF_HEADER}"):
+            if not chunk:
+                continue
+            if not chunk.startswith(DIFF_HEADER):
+                chunk = DIFF_HEADER + chunk
+            # Without renames both sides name the same path: "diff --git a/<p> b/<p>"
+            header = chunk.split("\n", 1)[0][len(DIFF_HEADER):]
+            path = header[:(len(header) - 3) // 2]
+            patches[path] = chunk if chunk.endswith("\n") else chunk + "\n"
+        
+        return patches
+    
+    def _store(self, key: Tuple[str, str, str], patch: str) -> None:
+        encoded = patch.encode()
+        truncated = len(encoded) > self.max_file_bytes
+        if truncated:
+            patch = encoded[:self.max_file_bytes].decode(errors="ignore")
+        
+        self._cache[key] = (patch, truncated)
+        self._cached_bytes += len(patch)
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, (evicted, _) = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+
+_diff_service: Optional[TaskDiffService] = None
+
+
+def get_task_diff_service() -> TaskDiffService:
+    """Return the process-wide diff service configured by the application settings."""
+    global _diff_service
+    if _diff_service is None:
+        _diff_service = TaskDiffService(
+            max_file_bytes=settings.TASK_DIFF_MAX_FILE_BYTES,
+            cache_bytes=settings.TASK_DIFF_CACHE_BYTES
+        )
+    return _diff_service
\ No newline at end of file
@@ -0,0 +1,119 @@
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Task, TaskStatus
+
+
+# Shortest duration ever predicted, in seconds: starting a task alone takes about this long
+MIN_DURATION = 60.0
+
+# Samples a repository needs before its own history outweighs the average of all repositories
+PRIOR_WEIGHT = 3.0
+
+Sample = Tuple[UUID, int, float]  # repository id, instruction length, duration in seconds
+
+
+class DurationModel:
+    """Expected run time of a task from its repository and the length of its instructions.
+    
+    log(duration) = intercept(repository) + slope * log(instruction length).
+    The slope is shared by all repositories; each repository's intercept
+    weighs its recent tasks most, so the prediction follows trends, and is
+    pulled towards the average intercept while its history is short.
+    """
+    
+    def __init__(
+        self,
+        slope: float = 0.0,
+        intercept: Optional[float] = None,
+        intercepts: Optional[Dict[UUID, float]] = None,
+        default: float = 900.0
+    ):
+        self.slope = slope
+        self.intercept = intercept
+        self.intercepts = intercepts or {}
+        self.default = default
+    
+    def predict(self, repository_id: UUID, instruction_length: int) -> float:
+        """Expected run time in seconds."""
+        intercept = self.intercepts.get(repository_id, self.intercept)
+        if intercept is None:
+            return self.default
+        return max(math.exp(intercept + self.slope * math.log(max(instruction_length, 1))), MIN_DURATION)
+
+
+def fit_duration_model(samples: List[Sample], half_life: float = 20.0, default: float = 900.0) -> DurationModel:
+    """Fit the model to finished tasks, most recent first.
+    
+    A repository's k-th most recent task weighs 0.5 ** (k / half_life).
+    """
+    by_repository: Dict[UUID, List[Tuple[float, float]]] = defaultdict(list)
+    for repository_id, length, duration in samples:
+        by_repository[repository_id].append((math.log(max(length, 1)), math.log(max(duration, 1.0))))
+    if not by_repository:
+        return DurationModel(default=default)
+    
+    # Slope from the variation within each repository, so repositories that are simply slower
+    # and have longer instructions do not make length look more important than it is
+    covariance = variance = 0.0
+    for points in by_repository.values():
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        covariance += sum((x - mean_x) * (y - mean_y) for x, y in points)
+        variance += sum((x - mean_x) ** 2 for x, _ in points)
+    # Longer instructions never predict shorter tasks
+    slope = min(max(covariance / variance, 0.0), 2.0) if variance > 0 else 0.0
+    
+    residuals: Dict[UUID, Tuple[float, float]] = {}
+    for repository_id, points in by_repository.items():
+        weights = [0.5 ** (k / half_life) for k in range(len(points))]
+        total = sum(weight * (y - slope * x) for weight, (x, y) in zip(weights, points))
+        residuals[repository_id] = (total, sum(weights))
+    
+    intercept = sum(total for total, _ in residuals.values()) / sum(weight for _, weight in residuals.values())
+    intercepts = {
+        repository_id: (total + PRIOR_WEIGHT * intercept) / (weight + PRIOR_WEIGHT)
+        for repository_id, (total, weight) in residuals.items()
+    }
+    return DurationModel(slope=slope, intercept=intercept, intercepts=intercepts, default=default)
+
+
+async def load_duration_model(db: AsyncSession) -> DurationModel:
+    """Fit the model to the most recently completed tasks."""
+    query = select(
+        Task.repository_id,
+        func.length(Task.instructions),
+        Task.started_at,
+        Task.completed_at
+    ).where(
+        Task.status == TaskStatus.COMPLETED,
+        Task.started_at.isnot(None),
+        Task.completed_at.isnot(None)
+    ).order_by(Task.completed_at.desc()).limit(settings.TASK_DURATION_HISTORY)
+    
+    samples = [
+        (repository_id, length or 0, (completed_at - started_at).total_seconds())
+        for repository_id, length, started_at, completed_at in (await db.execute(query)).all()
+    ]
+    return fit_duration_model(
+        samples,
+        half_life=settings.TASK_DURATION_HALF_LIFE,
+        default=settings.TASK_DURATION_DEFAULT
+    )
+
+
+_model: Optional[Tuple[float, DurationModel]] = None
+
+
+async def get_duration_model(db: AsyncSession) -> DurationModel:
+    """The duration model, refitted at most every TASK_DURATION_MODEL_TTL seconds."""
+    global _model
+    if _model is None or time.monotonic() - _model[0] > settings.TASK_DURATION_MODEL_TTL:
+        _model = (time.monotonic(), await load_duration_model(db))
+    return _model[1]
\ No newline at end of file
@@ -1,18 +1,45 @@
 from celery import Celery
+from celery.concurrency import get_implementation
+from celery.concurrency.solo import TaskPool as SoloPool
+from celery.concurrency.thread import TaskPool as ThreadPool
+from celery.signals import worker_init, worker_shutdown, worker_process_init, worker_process_shutdown
 from celery.result import AsyncResult
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from uuid import UUID
 import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import List, Optional
+from loguru import logger
 
 from app.core.config import settings
-from app.core.database import AsyncSessionLocal
-from app.models import Task, Repository, TaskStatus
+from app.core.database import AsyncSessionLocal, configure_process_engine, dispose_engine
+from app.models import Task, Repository, TaskStatus, InstallPolicy, DependencyInstall, MergeTrain
 from app.services.git_manager import GitWorktreeManager
+from app.services.dependency_cache import get_dependency_cache
 from app.services.claude_runner import ClaudeCodeRunner
-from app.services.websocket_manager import broadcast_task_output
+from app.services.websocket_manager import broadcast_task_output, broadcast_task_event
+from app.services.task_startup import StartupPipeline, TaskOutputStream
+from app.services.process import OutputCallback
+from app.services.repo_mirror import get_mirror_manager
+from app.services.task_diff import get_task_diff_service
+from app.services.worktree_gc import get_worktree_gc
+from app.services.repo_maintenance import get_repository_maintenance
+from app.services.merge_train import get_merge_train_service
+from app.services.task_verification import get_task_verifier
+from app.services.repo_semaphore import SlotAlreadyHeld, get_repository_semaphore
+from app.services.task_scheduler import get_task_scheduler
+from app.services.task_dependencies import dependency_commits, merge_dependencies
+from app.services.websocket_manager import get_redis
+from app.services.worktree_watcher import watch_worktree
+from app.services.worker_loop import worker_loop
+from app.services.task_checkpoint import (
+    TaskCheckpointer,
+    checkpoint_ref,
+    fetch_checkpoint,
+    get_task_checkpointer
+)
 
 # Create Celery app
 celery_app = Celery('devbud', broker=settings.REDIS_URL)
@@ -24,8 +51,51 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    beat_schedule={
+        'collect-worktrees': {
+            'task': 'collect_worktrees',
+            'schedule': settings.WORKTREE_GC_INTERVAL,
+        },
+        'dispatch-tasks': {
+            'task': 'dispatch_tasks',
+            'schedule': settings.TASK_DISPATCH_INTERVAL,
+        },
+        'maintain-repositories': {
+            'task': 'maintain_repositories',
+            'schedule': settings.MAINTENANCE_CHECK_INTERVAL,
+        },
+    },
 )
 
+# Pools running tasks in the worker process itself, for which Celery does not send both worker_process_* signals
+INLINE_POOLS = (SoloPool, ThreadPool)
+
+
+@worker_init.connect
+def configure_worker(sender=None, **kwargs):
+    """One-time process setup when the worker boots, instead of on every task."""
+    git_manager = GitWorktreeManager(base_path=settings.WORKTREE_BASE_PATH)
+    asyncio.run(git_manager.configure_git())
+    
+    # A prefork worker starts the loop in each pool process instead: not before forking
+    if sender is not None and issubclass(get_implementation(sender.pool_cls), INLINE_POOLS):
+        start_worker_loop()
+
+
+@worker_process_init.connect
+def start_worker_loop(**kwargs):
+    """Give each pool process its own engine and one event loop shared by all its tasks."""
+    if worker_loop.is_running:
+        return
+    configure_process_engine()
+    worker_loop.start()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_loop(**kwargs):
+    worker_loop.stop(shutdown=dispose_engine())
+
 
 @asynccontextmanager
 async def get_db_session():
@@ -50,8 +120,8 @@ def execute_task(
     instructions: str
 ):
     """Execute a Claude Code task in the background."""
-    # Run async function in sync context
-    asyncio.run(_execute_task_async(
+    # Run on the process's event loop, reusing its connections
+    worker_loop.run(_execute_task_async(
         task_id,
         repository_id,
         repo_path,
@@ -60,6 +130,21 @@ def execute_task(
     ))
 
 
+async def _hold_claim(task_id: str, interval: float) -> None:
+    """Keep refreshing a starting task's dispatch time so the scheduler does not take it for lost."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with get_db_session() as db:
+                await db.execute(
+                    update(Task)
+                    .where(Task.id == UUID(task_id), Task.status == TaskStatus.PENDING)
+                    .values(dispatched_at=datetime.utcnow())
+                )
+        except Exception as e:
+            logger.warning(f"Failed to refresh the claim of task {task_id}: {e}")
+
+
 async def _execute_task_async(
     task_id: str,
     repository_id: str,
@@ -68,7 +153,10 @@ async def _execute_task_async(
     instructions: str
 ):
     """Async implementation of task execution."""
-    git_manager = GitWorktreeManager(base_path=settings.WORKTREE_BASE_PATH)
+    git_manager = GitWorktreeManager(
+        base_path=settings.WORKTREE_BASE_PATH,
+        dependency_cache=get_dependency_cache()
+    )
     claude_runner = ClaudeCodeRunner()
     
     async with get_db_session() as db:
@@ -77,44 +165,178 @@ async def _execute_task_async(
         result = await db.execute(query)
         task = result.scalar_one_or_none()
         
-        if not task:
+        if not task or task.status != TaskStatus.PENDING:
+            # Gone, or cancelled while waiting for a slot
             return
         
+        repository = await db.get(Repository, UUID(repository_id))
+        slot = get_repository_semaphore(repository_id, repository)
+        try:
+            acquired = await slot.acquire(task_id)
+        except SlotAlreadyHeld:
+            # Dispatched again while another worker still starts it: leave the task and its slot to that one
+            logger.warning(f"Task {task_id} is already being executed, dropping the duplicate")
+            return
+        if not acquired:
+            # Over the repository's limit: stay pending without holding this worker
+            logger.info(f"Task {task_id} waits for a free slot of repository {repository_id}")
+            # Still on its way: the scheduler must not take the message for lost and dispatch it again
+            task.dispatched_at = datetime.utcnow()
+            execute_task.apply_async(
+                (task_id, repository_id, repo_path, branch_name, instructions),
+                countdown=settings.TASK_SLOT_RETRY_SECONDS
+            )
+            return
+        
+        # Claim the task before the (possibly long) setup, and keep the claim fresh until it runs
+        task.dispatched_at = datetime.utcnow()
+        await db.commit()
+        claim = asyncio.create_task(_hold_claim(task_id, settings.TASK_DISPATCH_TIMEOUT / 3))
+        
         try:
-            # Start the task
+            sparse_patterns = task.sparse_patterns or (repository.sparse_patterns if repository else None)
+            output_stream = TaskOutputStream(db, task)
+            pipeline = StartupPipeline(task_id)
+            pushes_checkpoints = bool(
+                settings.TASK_CHECKPOINT_PUSH and repository and repository.remote_url
+            )
+            
+            async def prepare_worktree() -> str:
+                base_branch = None
+                if repository and repository.remote_url and not task.depends_on:
+                    # Branch from the latest remote default branch; tasks starting together share one fetch
+                    async with pipeline.stage("fetch"):
+                        mirrors = get_mirror_manager()
+                        if not mirrors.mirror_path(repository.remote_url).exists():
+                            await mirrors.ensure(repository.remote_url)
+                        base_branch = await git_manager.fetch_base(
+                            repo_path,
+                            repository.default_branch,
+                            freshness=settings.GIT_FETCH_FRESHNESS_SECONDS,
+                            timeout=settings.GIT_FETCH_TIMEOUT
+                        )
+                
+                async with pipeline.stage("checkout"):
+                    if task.checkpoint_commit:
+                        # Preempted earlier: resume from the latest checkpoint
+                        if pushes_checkpoints:
+                            await fetch_checkpoint(repo_path, task_id)
+                        worktree_path = await git_manager.restore_worktree(
+                            repo_path=repo_path,
+                            branch_name=branch_name,
+                            checkpoint=task.checkpoint_commit,
+                            sparse_patterns=sparse_patterns
+                        )
+                    else:
+                        # A task with dependencies starts from their results instead of the default branch
+                        parent_commits = await dependency_commits(db, repo_path, task) if task.depends_on else []
+                        worktree_path = await git_manager.create_worktree(
+                            repo_path=repo_path,
+                            branch_name=branch_name,
+                            base_branch=parent_commits[0] if parent_commits else base_branch,
+                            install_dependencies=False,
+                            sparse_patterns=sparse_patterns
+                        )
+                        if len(parent_commits) > 1:
+                            try:
+                                await merge_dependencies(worktree_path, parent_commits[1:])
+                            except BaseException:
+                                await git_manager.remove_worktree(worktree_path)
+                                raise
+                        task.base_commit = await git_manager.get_head_commit(worktree_path)
+                try:
+                    async with pipeline.stage("install"):
+                        await _install_task_dependencies(
+                            db, git_manager, task, repository, worktree_path,
+                            on_output=output_stream.write,
+                            directories=sparse_patterns
+                        )
+                except BaseException:
+                    await git_manager.remove_worktree(worktree_path)
+                    raise
+                return worktree_path
+            
+            async def prepare_runner() -> None:
+                async with pipeline.stage("runner"):
+                    await claude_runner.prepare()
+            
+            # Start the task: checkout and install overlap with runner preparation
             try:
-                worktree_path = await git_manager.create_worktree(
-                    repo_path=repo_path,
-                    branch_name=branch_name
-                )
+                async with pipeline.stage("startup"):
+                    worktree_path, _ = await pipeline.run_concurrently(
+                        prepare_worktree(),
+                        prepare_runner()
+                    )
+                await output_stream.flush()
             except Exception as e:
+                await output_stream.flush()
                 error_msg = f"Failed to create worktree: {str(e)}"
                 await task.append_output(db, error_msg)
                 # Ensure task is marked as failed since it never started
                 task.status = TaskStatus.FAILED
                 task.completed_at = datetime.utcnow()
+                task.startup_timings = pipeline.timings
                 task.output = (task.output or "") + f"\nTask failed at {task.completed_at}\n"
                 db.add(task)
                 await db.commit()
                 await broadcast_task_output(task_id, error_msg)
                 raise e
+            finally:
+                claim.cancel()
             
+            task.startup_timings = pipeline.timings
+            await task.append_output(db, pipeline.summary())
             await task.start(db, worktree_path)
             
-            # Stream output from Claude Code
+            # Stream output from Claude Code, and file changes in the worktree alongside it
+            watcher = watch_worktree(task_id, worktree_path, task.base_commit)
+            if settings.WORKTREE_WATCH_ENABLED:
+                watcher.start()
+            checkpointer = get_task_checkpointer(
+                git_manager, task, repo_path, worktree_path,
+                push=pushes_checkpoints,
+                on_preempt=lambda: claude_runner.stop_task(task_id)
+            )
+            checkpointer.start()
             output_buffer = []
-            async for output in claude_runner.start_task(task_id, worktree_path, instructions):
-                # Save output
-                output_buffer.append(output)
-                await task.append_output(db, output)
-                
-                # Broadcast to WebSocket clients
-                await broadcast_task_output(task_id, output)
+            try:
+                async for output in claude_runner.start_task(task_id, worktree_path, instructions):
+                    # Save output
+                    output_buffer.append(output)
+                    await task.append_output(db, output)
+                    
+                    # Broadcast to WebSocket clients
+                    await broadcast_task_output(task_id, output)
+            finally:
+                await checkpointer.stop()
+                await watcher.stop()
+            
+            if checkpointer.preempted:
+                # Free this worker; any worker resumes the task from its checkpoint
+                await git_manager.remove_worktree(worktree_path)
+                await task.requeue(db, reason="Preempted")
+                await broadcast_task_event(task_id, "preempted", {"checkpoint": task.checkpoint_commit})
+                return
             
             # Task completed
             success = await claude_runner.get_task_status(task_id) == "completed"
+            await _settle_checkpoint(git_manager, checkpointer, task, repo_path, success)
+            await _record_task_result(git_manager, task, repo_path, worktree_path)
+            if success and repository and repository.verify_command and task.result_tree:
+                await _verify_task_result(task, repository, repo_path, worktree_path)
             await task.complete(db, success=success)
-            
+        
+        except asyncio.CancelledError:
+            # Cancelled by an async worker shutting down before the task wound down
+            if task.status == TaskStatus.RUNNING:
+                await claude_runner.stop_task(task_id)
+                await task.complete(db, success=False, output="Task failed: worker shut down")
+            else:
+                # Not started yet: let it be dispatched again
+                task.dispatched_at = None
+                await db.commit()
+            raise
+        
         except Exception as e:
             # Task failed
             error_msg = f"Task failed: {str(e)}"
@@ -126,6 +348,239 @@ async def _execute_task_async(
             await broadcast_task_output(task_id, error_msg)
             
             raise e
+        
+        finally:
+            claim.cancel()
+            await asyncio.gather(claim, return_exceptions=True)
+            await slot.release(task_id)
+            # A slot is free: hand out the next waiting task (or this one, if preempted)
+            dispatch_tasks.delay()
+
+
+async def _settle_checkpoint(
+    git_manager: GitWorktreeManager,
+    checkpointer: TaskCheckpointer,
+    task: Task,
+    repo_path: str,
+    success: bool
+) -> None:
+    """Drop a successful task's checkpoint; keep a final one for a failed task so it can be resumed."""
+    try:
+        if success:
+            if task.checkpoint_commit:
+                await git_manager.delete_ref(repo_path, checkpoint_ref(str(task.id)))
+                task.checkpoint_commit = None
+        elif checkpointer.interval:
+            task.checkpoint_commit = await checkpointer.checkpoint() or task.checkpoint_commit
+    except Exception as e:
+        logger.warning(f"Failed to settle checkpoint of task {task.id}: {e}")
+
+
+async def _record_task_result(
+    git_manager: GitWorktreeManager,
+    task: Task,
+    repo_path: str,
+    worktree_path: str
+) -> None:
+    """Snapshot the worktree and store the diffstat against the task's base commit."""
+    try:
+        task.result_tree = await git_manager.snapshot_tree(worktree_path)
+        if task.base_commit:
+            task.diffstat = await get_task_diff_service().diffstat(
+                repo_path, task.base_commit, task.result_tree
+            )
+    except Exception as e:
+        # The diff is informational; it must never change the task outcome
+        logger.warning(f"Failed to record result of task {task.id}: {e}")
+
+
+async def _verify_task_result(
+    task: Task,
+    repository: Repository,
+    repo_path: str,
+    worktree_path: str
+) -> None:
+    """Run the repository's verification command on the result and compare it with the base commit."""
+    task_id = str(task.id)
+    await broadcast_task_event(task_id, "verification", {"status": "running"})
+    try:
+        await get_task_verifier().verify_task(repository, task, repo_path, worktree_path)
+    except Exception as e:
+        # Verification reports on the result; it must never change the task outcome
+        logger.warning(f"Failed to verify result of task {task_id}: {e}")
+        task.verification_status = "error"
+        task.verification = {"error": str(e)}
+    await broadcast_task_event(task_id, "verification", {"status": task.verification_status})
+
+
+async def _install_task_dependencies(
+    db: AsyncSession,
+    git_manager: GitWorktreeManager,
+    task: Task,
+    repository: Optional[Repository],
+    worktree_path: str,
+    on_output: Optional[OutputCallback] = None,
+    directories: Optional[List[str]] = None
+) -> None:
+    """Install a worktree's dependencies per the repository's policy and record the outcome."""
+    policy = repository.install_policy if repository else InstallPolicy.ALWAYS
+    base_commit = task.base_commit or await git_manager.get_head_commit(worktree_path)
+    
+    previous_lockfile_hash = None
+    if repository and policy == InstallPolicy.ON_LOCKFILE_CHANGE:
+        previous = await DependencyInstall.last_successful(db, repository.id, base_commit)
+        previous_lockfile_hash = previous.lockfile_hash if previous else None
+    
+    result = await git_manager.install_dependencies(
+        worktree_path,
+        policy=policy.value,
+        command=repository.install_command if repository else None,
+        timeout=(repository.install_timeout if repository else None) or settings.DEPENDENCY_INSTALL_TIMEOUT,
+        previous_lockfile_hash=previous_lockfile_hash,
+        on_output=on_output,
+        directories=directories
+    )
+    
+    if repository:
+        db.add(DependencyInstall(
+            repository_id=repository.id,
+            task_id=task.id,
+            base_commit=base_commit,
+            lockfile_hash=result.lockfile_hash,
+            policy=policy,
+            command=result.command,
+            status=result.status,
+            duration_seconds=result.duration_seconds,
+            error_message=result.error
+        ))
+        await db.commit()
+    
+    logger.info(
+        f"Dependency install for task {task.id}: {result.status} "
+        f"in {result.duration_seconds:.1f}s (policy: {policy.value})"
+    )
+    
+    if result.status == "failed":
+        raise RuntimeError(f"Dependency installation failed: {result.error}")
+
+
+@celery_app.task(name='collect_worktrees')
+def collect_worktrees(dry_run: bool = False) -> dict:
+    """Evict finished and orphaned worktrees that exceed the disk quotas."""
+    return worker_loop.run(_collect_worktrees_async(dry_run))
+
+
+async def _collect_worktrees_async(dry_run: bool) -> dict:
+    async with get_db_session() as db:
+        report = await get_worktree_gc().collect(db, dry_run=dry_run)
+    return report.to_dict()
+
+
+@celery_app.task(name='maintain_repositories')
+def maintain_repositories(repository_id: Optional[str] = None) -> List[dict]:
+    """Run git maintenance on one repository, or on every idle repository that is due."""
+    return worker_loop.run(_maintain_repositories_async(repository_id))
+
+
+async def _maintain_repositories_async(repository_id: Optional[str]) -> List[dict]:
+    maintenance = get_repository_maintenance()
+    async with get_db_session() as db:
+        if repository_id is None:
+            runs = await maintenance.run_due(db)
+        else:
+            repository = await db.get(Repository, UUID(repository_id))
+            runs = [await maintenance.run(db, repository)] if repository is not None else []
+        
+        return [
+            {
+                "repository_id": str(run.repository_id),
+                "status": run.status,
+                "pruned_branches": run.pruned_branches,
+                "duration_seconds": run.duration_seconds
+            }
+            for run in runs
+        ]
+
+
+@celery_app.task(name='dispatch_tasks')
+def dispatch_tasks() -> int:
+    """Hand waiting tasks to the workers in weighted fair order, as capacity allows."""
+    return worker_loop.run(_dispatch_tasks_async())
+
+
+async def _dispatch_tasks_async() -> int:
+    # One dispatcher at a time, or two passes could hand out the same capacity
+    lock = get_redis().lock("devbud:task-dispatch", timeout=60, blocking_timeout=10)
+    if not await lock.acquire():
+        return 0
+    try:
+        # All messages of a pass go out through one producer and broker connection
+        with celery_app.producer_or_acquire() as producer:
+            async with get_db_session() as db:
+                dispatched = await get_task_scheduler().dispatch(
+                    db,
+                    send=lambda task, repository: execute_task.apply_async(
+                        (
+                            str(task.id),
+                            str(task.repository_id),
+                            repository.path,
+                            task.branch_name,
+                            task.instructions
+                        ),
+                        producer=producer
+                    )
+                )
+        return len(dispatched)
+    finally:
+        await lock.release()
+
+
+@celery_app.task(name='run_merge_train')
+def run_merge_train(train_id: str) -> dict:
+    """Merge a train's completed tasks into its integration branch."""
+    return worker_loop.run(_run_merge_train_async(train_id))
+
+
+async def _run_merge_train_async(train_id: str) -> dict:
+    async with get_db_session() as db:
+        train = await db.get(MergeTrain, UUID(train_id))
+        if train is None:
+            return {}
+        repository = await db.get(Repository, train.repository_id)
+        
+        query = select(Task).where(Task.id.in_([UUID(task_id) for task_id in train.task_ids]))
+        tasks_by_id = {str(task.id): task for task in (await db.execute(query)).scalars().all()}
+        tasks = [tasks_by_id[task_id] for task_id in train.task_ids if task_id in tasks_by_id]
+        
+        train.status = "running"
+        await db.commit()
+        
+        try:
+            report = await get_merge_train_service().run(
+                repository, tasks, train.integration_branch, train.verify_command
+            )
+            train.status = "succeeded"
+            train.base_commit = report.base_commit
+            train.head_commit = report.head_commit
+            train.report = report.to_dict()
+        except Exception as e:
+            logger.error(f"Merge train {train_id} failed: {e}")
+            train.status = "failed"
+            train.error_message = str(e)
+        
+        train.completed_at = datetime.utcnow()
+        await db.commit()
+        return {"status": train.status, "head_commit": train.head_commit}
+
+
+# The coroutine behind each task, awaited directly by the asyncio-native worker
+ASYNC_TASKS = {
+    'execute_task': _execute_task_async,
+    'collect_worktrees': _collect_worktrees_async,
+    'maintain_repositories': _maintain_repositories_async,
+    'dispatch_tasks': _dispatch_tasks_async,
+    'run_merge_train': _run_merge_train_async,
+}
 
 
 def get_task_result(task_id: str) -> AsyncResult:
@@ -0,0 +1,303 @@
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from loguru import logger
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Task, Repository, TaskStatus, TaskPriority
+from app.services.task_dependencies import dependency_statuses, resolve_dependencies
+from app.services.task_durations import get_duration_model
+
+
+PRIORITY_RANKS = {TaskPriority.URGENT: 0, TaskPriority.NORMAL: 1, TaskPriority.BATCH: 2}
+
+POLICIES = ("fair", "shortest")
+
+InFlight = Tuple[UUID, Optional[datetime], float]  # repository id, start (None if not started yet), expected duration
+
+
+def fair_order(
+    tasks: List[Task],
+    weights: Dict[UUID, int],
+    active: Dict[UUID, int]
+) -> List[Task]:
+    """Order waiting tasks for dispatch.
+    
+    Priorities are strict. Within a priority, repositories share dispatches in
+    proportion to their weights (weighted fair queueing): the k-th waiting
+    task of a repository with ``n`` tasks already active gets the virtual
+    finish time (n + k) / weight, and tasks go out by virtual finish time. A
+    repository's own tasks keep their creation order.
+    """
+    queues: Dict[Tuple[int, UUID], List[Task]] = defaultdict(list)
+    for task in sorted(tasks, key=lambda t: t.created_at):
+        queues[(PRIORITY_RANKS[task.priority or TaskPriority.NORMAL], task.repository_id)].append(task)
+    
+    keyed = []
+    for (rank, repository_id), queue in queues.items():
+        weight = max(weights.get(repository_id) or 1, 1)
+        running = active.get(repository_id, 0)
+        for k, task in enumerate(queue, 1):
+            keyed.append(((rank, (running + k) / weight, task.created_at), task))
+    
+    return [task for _, task in sorted(keyed, key=lambda item: item[0])]
+
+
+def shortest_first_order(
+    tasks: List[Task],
+    durations: Dict[UUID, float],
+    now: datetime,
+    aging_seconds: float
+) -> List[Task]:
+    """Order waiting tasks shortest expected run time first, which cuts the average wait.
+    
+    Priorities are strict. Waiting shortens a task's effective run time to
+    duration / (1 + waited / aging_seconds): after ``aging_seconds`` a task
+    competes as if it were half as long, and the longest task eventually
+    goes before any task arriving later, so none waits forever.
+    """
+    def key(task: Task):
+        waited = max((now - task.created_at).total_seconds(), 0.0)
+        effective = durations[task.id] / (1 + waited / aging_seconds)
+        return PRIORITY_RANKS[task.priority or TaskPriority.NORMAL], effective, task.created_at
+    
+    return sorted(tasks, key=key)
+
+
+@dataclass
+class TaskForecast:
+    """When a pending or running task is expected to start and finish."""
+    expected_duration: float  # seconds
+    expected_start_at: datetime
+    expected_finish_at: datetime
+    queue_position: Optional[int] = None
+
+
+def simulate_schedule(
+    queue: List[Task],
+    blocked: List[Task],
+    in_flight: Dict[UUID, InFlight],
+    durations: Dict[UUID, float],
+    capacity: int,
+    limits: Dict[UUID, int],
+    now: datetime
+) -> Dict[UUID, TaskForecast]:
+    """Play the dispatcher forward with expected run times.
+    
+    Tasks in flight hold their slots until they are expected to finish (any
+    moment, once overdue). Queued tasks then take the earliest free slot, in
+    dispatch order and within their repository's limit. Tasks blocked on
+    dependencies follow in creation order, so their dependencies come
+    first, and start no earlier than the last of those finishes.
+    """
+    slots = [now] * capacity
+    repository_slots: Dict[UUID, List[datetime]] = {}
+    
+    def take(repository_id: UUID, earliest: datetime, finish: Optional[datetime] = None, duration: float = 0.0):
+        own = repository_slots.setdefault(
+            repository_id, [now] * (limits.get(repository_id) or settings.MAX_CONCURRENT_TASKS_PER_REPO)
+        )
+        start = max(heapq.heappop(slots), heapq.heappop(own), earliest)
+        finish = finish or start + timedelta(seconds=duration)
+        heapq.heappush(slots, finish)
+        heapq.heappush(own, finish)
+        return start, finish
+    
+    forecasts = {}
+    for task_id, (repository_id, started_at, duration) in sorted(in_flight.items(), key=lambda item: item[1][1] or now):
+        start = started_at or now
+        _, finish = take(repository_id, now, finish=max(start + timedelta(seconds=duration), now))
+        forecasts[task_id] = TaskForecast(duration, start, finish)
+    
+    for position, task in enumerate(queue, 1):
+        start, finish = take(task.repository_id, now, duration=durations[task.id])
+        forecasts[task.id] = TaskForecast(durations[task.id], start, finish, queue_position=position)
+    
+    for task in sorted(blocked, key=lambda t: t.created_at):
+        earliest = max(
+            [forecasts[UUID(parent_id)].expected_finish_at for parent_id in task.depends_on or [] if UUID(parent_id) in forecasts],
+            default=now
+        )
+        start, finish = take(task.repository_id, earliest, duration=durations[task.id])
+        forecasts[task.id] = TaskForecast(durations[task.id], start, finish)
+    
+    return forecasts
+
+
+class TaskScheduler:
+    """Hands pending tasks to the workers in weighted fair order.
+    
+    At most ``capacity`` tasks are running or dispatched at once, and no
+    repository gets more than its concurrent task limit, so the worker queue
+    only holds what can start now and everything else waits here, where
+    the order can still change as tasks arrive. A task dispatched but not
+    started within ``dispatch_timeout`` seconds stops counting as active
+    and is dispatched again.
+    Tasks with dependencies wait until those completed, and are cancelled
+    once one of them failed.
+    
+    The ``fair`` policy orders tasks by weighted fair queueing; ``shortest``
+    starts the shortest expected tasks first, with aging.
+    """
+    
+    def __init__(
+        self,
+        capacity: int,
+        dispatch_timeout: int = 600,
+        policy: str = "fair",
+        aging_seconds: float = 900.0
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}'; expected one of {', '.join(POLICIES)}")
+        self.capacity = capacity
+        self.dispatch_timeout = dispatch_timeout
+        self.policy = policy
+        self.aging_seconds = aging_seconds
+    
+    async def queue(self, db: AsyncSession) -> List[Task]:
+        """Waiting tasks in the order they will be dispatched."""
+        waiting, active, repositories = await self._load(db)
+        ready, _ = resolve_dependencies(waiting, await dependency_statuses(db, waiting))
+        return await self._order(db, ready, active, repositories)
+    
+    async def dispatch(self, db: AsyncSession, send: Callable[[Task, Repository], None]) -> List[Task]:
+        """Mark the tasks that can start now as dispatched, then ``send`` each to the workers."""
+        waiting, active, repositories = await self._load(db)
+        ready, doomed = resolve_dependencies(waiting, await dependency_statuses(db, waiting))
+        for task, reason in doomed:
+            await task.cancel(db, reason=reason)
+        if doomed:
+            logger.info(f"Cancelled {len(doomed)} task(s) whose dependencies failed")
+        
+        free = self.capacity - sum(active.values())
+        if free <= 0 or not ready:
+            return []
+        
+        dispatched = []
+        redispatched = 0
+        now = datetime.utcnow()
+        for task in await self._order(db, ready, active, repositories):
+            if free <= 0:
+                break
+            repository = repositories.get(task.repository_id)
+            if repository is None:
+                continue
+            limit = repository.max_concurrent_tasks or settings.MAX_CONCURRENT_TASKS_PER_REPO
+            if active.get(task.repository_id, 0) >= limit:
+                continue
+            
+            redispatched += task.dispatched_at is not None
+            task.dispatched_at = now
+            active[task.repository_id] = active.get(task.repository_id, 0) + 1
+            free -= 1
+            dispatched.append(task)
+        
+        # Committed first: a worker must never pick up a task still marked as waiting
+        await db.commit()
+        for task in dispatched:
+            send(task, repositories[task.repository_id])
+        
+        if dispatched:
+            logger.info(f"Dispatched {len(dispatched)} task(s); {len(ready) - len(dispatched)} ready and waiting")
+        if redispatched:
+            logger.warning(f"Dispatched {redispatched} task(s) again that never started after their last dispatch")
+        return dispatched
+    
+    async def forecast(self, db: AsyncSession) -> Dict[UUID, TaskForecast]:
+        """Expected start and finish of every pending and running task, and queue positions."""
+        now = datetime.utcnow()
+        model = await get_duration_model(db)
+        waiting, active, repositories = await self._load(db)
+        ready, doomed = resolve_dependencies(waiting, await dependency_statuses(db, waiting))
+        queue = await self._order(db, ready, active, repositories)
+        
+        excluded = {task.id for task in ready} | {task.id for task, _ in doomed}
+        blocked = [task for task in waiting if task.id not in excluded]
+        durations = {task.id: model.predict(task.repository_id, len(task.instructions or "")) for task in waiting}
+        
+        stale = now - timedelta(seconds=self.dispatch_timeout)
+        query = select(
+            Task.id,
+            Task.repository_id,
+            Task.status,
+            Task.started_at,
+            func.length(Task.instructions)
+        ).where(or_(
+            Task.status == TaskStatus.RUNNING,
+            and_(Task.status == TaskStatus.PENDING, Task.dispatched_at >= stale)
+        ))
+        in_flight = {
+            task_id: (
+                repository_id,
+                # A dispatched task may have started before, if it was preempted
+                started_at if status == TaskStatus.RUNNING else None,
+                model.predict(repository_id, length or 0)
+            )
+            for task_id, repository_id, status, started_at, length in (await db.execute(query)).all()
+        }
+        
+        limits = {repository_id: repository.max_concurrent_tasks for repository_id, repository in repositories.items()}
+        return simulate_schedule(queue, blocked, in_flight, durations, self.capacity, limits, now)
+    
+    async def _order(
+        self,
+        db: AsyncSession,
+        ready: List[Task],
+        active: Dict[UUID, int],
+        repositories: Dict[UUID, Repository]
+    ) -> List[Task]:
+        if self.policy == "shortest":
+            model = await get_duration_model(db)
+            durations = {task.id: model.predict(task.repository_id, len(task.instructions or "")) for task in ready}
+            return shortest_first_order(ready, durations, datetime.utcnow(), self.aging_seconds)
+        return fair_order(ready, self._weights(repositories), active)
+    
+    async def _load(self, db: AsyncSession) -> Tuple[List[Task], Dict[UUID, int], Dict[UUID, Repository]]:
+        stale = datetime.utcnow() - timedelta(seconds=self.dispatch_timeout)
+        query = select(Task).where(Task.status == TaskStatus.PENDING)
+        # A task dispatched but not claimed in time lost its message (a crashed worker, a flushed
+        # broker): it waits again, or it would stay pending forever. A worker starting a task
+        # keeps its dispatch time fresh, so a claimed task is never taken for lost
+        waiting = [
+            task for task in (await db.execute(query)).scalars().all()
+            if task.dispatched_at is None or task.dispatched_at < stale
+        ]
+        
+        query = select(Task.repository_id, func.count(Task.id)).where(or_(
+            Task.status == TaskStatus.RUNNING,
+            and_(Task.status == TaskStatus.PENDING, Task.dispatched_at >= stale)
+        )).group_by(Task.repository_id)
+        active = dict((await db.execute(query)).all())
+        
+        repository_ids = {task.repository_id for task in waiting}
+        repositories = {}
+        if repository_ids:
+            # Only the columns needed: loading repositories would load all their tasks too
+            query = select(
+                Repository.id,
+                Repository.path,
+                Repository.scheduling_weight,
+                Repository.max_concurrent_tasks
+            ).where(Repository.id.in_(repository_ids))
+            repositories = {row.id: row for row in (await db.execute(query)).all()}
+        
+        return waiting, active, repositories
+    
+    @staticmethod
+    def _weights(repositories: Dict[UUID, Repository]) -> Dict[UUID, int]:
+        return {repository_id: repository.scheduling_weight for repository_id, repository in repositories.items()}
+
+
+def get_task_scheduler() -> TaskScheduler:
+    """Create the task scheduler configured by the application settings."""
+    return TaskScheduler(
+        capacity=settings.TASK_DISPATCH_CAPACITY,
+        dispatch_timeout=settings.TASK_DISPATCH_TIMEOUT,
+        policy=settings.TASK_SCHEDULING_POLICY,
+        aging_seconds=settings.TASK_SJF_AGING_SECONDS
+    )
\ No newline at end of file
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Dict, List
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task
+from app.services.websocket_manager import broadcast_task_output, broadcast_task_event
+
+
+class TaskOutputStream:
+    """Streams output lines to WebSocket clients as they arrive and to the task log in batches.
+    
+    Install steps can print thousands of lines; committing each one would make
+    the database the bottleneck, so log writes are flushed periodically.
+    """
+    
+    def __init__(
+        self,
+        db: AsyncSession,
+        task: Task,
+        flush_interval: float = 1.0,
+        max_buffered_lines: int = 200
+    ):
+        self.db = db
+        self.task = task
+        self.flush_interval = flush_interval
+        self.max_buffered_lines = max_buffered_lines
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+    
+    async def write(self, output: str) -> None:
+        """Publish a line immediately and buffer it for the task log."""
+        await broadcast_task_output(str(self.task.id), output)
+        self._buffer.append(output if output.endswith("\n") else f"{output}\n")
+        
+        if (
+            len(self._buffer) >= self.max_buffered_lines
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+    
+    async def flush(self) -> None:
+        """Append buffered lines to the task log."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        
+        output = "".join(self._buffer)
+        self._buffer.clear()
+        await self.task.append_output(self.db, output.rstrip("\n"))
+
+
+class StartupPipeline:
+    """Runs the stages of task startup, overlapping independent ones, and records their durations.
+    
+    Stages only broadcast their progress; the database session is left to the
+    stage that owns it so concurrently running stages never share it.
+    """
+    
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.timings: Dict[str, float] = {}
+    
+    @asynccontextmanager
+    async def stage(self, name: str):
+        """Time a startup stage and report its progress to the task's clients."""
+        await broadcast_task_event(self.task_id, "stage", {"stage": name, "status": "started"})
+        started = time.monotonic()
+        
+        try:
+            yield
+        except BaseException:
+            self.timings[name] = round(time.monotonic() - started, 3)
+            await broadcast_task_event(self.task_id, "stage", {
+                "stage": name,
+                "status": "failed",
+                "duration": self.timings[name]
+            })
+            raise
+        
+        self.timings[name] = round(time.monotonic() - started, 3)
+        await broadcast_task_event(self.task_id, "stage", {
+            "stage": name,
+            "status": "completed",
+            "duration": self.timings[name]
+        })
+        await broadcast_task_output(self.task_id, f"[startup] {name} finished in {self.timings[name]:.1f}s\n")
+        logger.info(f"Task {self.task_id} startup stage '{name}' took {self.timings[name]:.3f}s")
+    
+    def summary(self) -> str:
+        """Describe stage durations for the task log."""
+        stages = ", ".join(f"{name} {duration:.1f}s" for name, duration in self.timings.items())
+        return f"[startup] {stages}"
+    
+    async def run_concurrently(self, *stages: Awaitable):
+        """Run independent stages together; if one fails the others are cancelled."""
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Let cancelled stages run their cleanup before propagating the failure
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
\ No newline at end of file
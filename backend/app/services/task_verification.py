@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import os
+import shlex
+import time
+import uuid
+import weakref
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from loguru import logger
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Repository, Task, VerificationResult
+from app.services.dependency_cache import get_dependency_cache
+from app.services.git_batch import get_git_batch_pool
+from app.services.git_manager import GitWorktreeManager
+from app.services.git_scheduler import git_scheduler
+from app.services.process import run_shell
+
+
+OUTPUT_TAIL_CHARS = 4000
+
+# (passed, duration in seconds, output) of one run of the verification command
+RunOutcome = Tuple[bool, float, str]
+
+# Verifications in progress on each event loop, so tasks finishing together share a run
+_in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, asyncio.Future]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def command_hash(command: str) -> str:
+    return hashlib.sha256(command.encode()).hexdigest()
+
+
+def compare(passed: bool, baseline_passed: Optional[bool]) -> str:
+    """Verdict of a result compared with the result of its base commit."""
+    if baseline_passed is None:
+        return "passed" if passed else "failed"
+    if passed:
+        return "passed" if baseline_passed else "fixed"
+    return "regressed" if baseline_passed else "failing"
+
+
+class TaskVerifier:
+    """Runs a repository's verification command on completed tasks.
+    
+    Results are cached per repository by tree and command, so a tree is
+    verified at most once: the baseline of a base commit is computed by the
+    first task started from it and shared by the rest, and a result identical
+    to an already verified tree is never run again. The result is verified
+    in the task's worktree, the baseline in a scratch worktree at the base
+    commit. Without a ``session_factory`` results are cached in memory only.
+    """
+    
+    def __init__(
+        self,
+        git_manager: GitWorktreeManager,
+        timeout: Optional[int] = None,
+        session_factory: Optional[Callable] = AsyncSessionLocal
+    ):
+        self.git_manager = git_manager
+        self.timeout = timeout
+        self.session_factory = session_factory
+        self._memory: Dict[Tuple, VerificationResult] = {}
+    
+    async def verify_task(
+        self,
+        repository: Repository,
+        task: Task,
+        repo_path: str,
+        worktree_path: str
+    ) -> Dict:
+        """Verify a task's result and its base commit and store the verdict on the task."""
+        command = repository.verify_command
+        timeout = repository.verify_timeout or self.timeout
+        
+        result, cached = await self.verify_tree(
+            repository.id, task.result_tree, command,
+            run=lambda: self.run_command(worktree_path, command, timeout)
+        )
+        verification = {"result": self._summary(result, cached), "baseline": None}
+        
+        baseline = None
+        if task.base_commit:
+            batch = await get_git_batch_pool().get(repo_path)
+            base_tree = await batch.resolve(f"{task.base_commit}^{{tree}}")
+            baseline, cached = await self.verify_tree(
+                repository.id, base_tree, command,
+                run=lambda: self._run_at_commit(repository, repo_path, task.base_commit, command, timeout)
+            )
+            verification["baseline"] = self._summary(baseline, cached)
+        
+        task.verification_status = compare(result.passed, baseline.passed if baseline else None)
+        task.verification = verification
+        logger.info(f"Verified task {task.id}: {task.verification_status}")
+        return verification
+    
+    async def verify_tree(
+        self,
+        repository_id,
+        tree: str,
+        command: str,
+        run: Callable[[], Awaitable[RunOutcome]]
+    ) -> Tuple[VerificationResult, bool]:
+        """The result of ``command`` on ``tree``, calling ``run`` only when none is cached.
+        
+        Also returns whether the result was reused rather than run here.
+        """
+        key = (repository_id, tree, command_hash(command))
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached, True
+        
+        in_flight = _in_flight.setdefault(asyncio.get_running_loop(), {})
+        if key in in_flight:
+            return await asyncio.shield(in_flight[key]), True
+        
+        job = asyncio.ensure_future(self._run_and_store(repository_id, key, run))
+        in_flight[key] = job
+        job.add_done_callback(lambda _: in_flight.pop(key, None))
+        return await asyncio.shield(job), False
+    
+    @staticmethod
+    async def run_command(cwd: str, command: str, timeout: Optional[int] = None) -> RunOutcome:
+        """Run the verification command; a nonzero exit status or a timeout fails it."""
+        started = time.monotonic()
+        try:
+            output = await run_shell(command, cwd=cwd, timeout=timeout)
+            passed = True
+        except RuntimeError as e:
+            output = str(e)
+            passed = False
+        return passed, time.monotonic() - started, output[-OUTPUT_TAIL_CHARS:]
+    
+    async def _run_at_commit(
+        self,
+        repository: Repository,
+        repo_path: str,
+        commit: str,
+        command: str,
+        timeout: Optional[int]
+    ) -> RunOutcome:
+        scratch = self.git_manager.base_path / os.path.basename(repo_path) / f".verify-{uuid.uuid4().hex[:12]}"
+        scratch.parent.mkdir(parents=True, exist_ok=True)
+        await git_scheduler.write(repo_path, lambda: run_shell(
+            f"git worktree add --detach {shlex.quote(str(scratch))} {commit}",
+            cwd=repo_path
+        ))
+        try:
+            await self.git_manager.install_dependencies(
+                str(scratch),
+                policy=repository.install_policy.value,
+                command=repository.install_command,
+                timeout=repository.install_timeout or settings.DEPENDENCY_INSTALL_TIMEOUT
+            )
+            return await self.run_command(str(scratch), command, timeout)
+        finally:
+            await self.git_manager.remove_worktree(str(scratch))
+    
+    async def _lookup(self, key: Tuple) -> Optional[VerificationResult]:
+        if self.session_factory is None:
+            return self._memory.get(key)
+        async with self.session_factory() as db:
+            return await VerificationResult.lookup(db, *key)
+    
+    async def _run_and_store(
+        self,
+        repository_id,
+        key: Tuple,
+        run: Callable[[], Awaitable[RunOutcome]]
+    ) -> VerificationResult:
+        passed, duration, output = await run()
+        record = VerificationResult(
+            repository_id=repository_id,
+            tree=key[1],
+            command_hash=key[2],
+            passed=passed,
+            duration_seconds=duration,
+            output=output
+        )
+        
+        if self.session_factory is None:
+            self._memory[key] = record
+            return record
+        
+        async with self.session_factory() as db:
+            db.add(record)
+            try:
+                await db.commit()
+            except IntegrityError:
+                # A worker on another host verified the same tree first
+                await db.rollback()
+                return await VerificationResult.lookup(db, *key) or record
+        return record
+    
+    @staticmethod
+    def _summary(result: VerificationResult, cached: bool) -> Dict:
+        return {
+            "tree": result.tree,
+            "passed": result.passed,
+            "duration_seconds": result.duration_seconds,
+            "cached": cached,
+            "output": result.output
+        }
+
+
+def get_task_verifier() -> TaskVerifier:
+    """Create the task verifier configured by the application settings."""
+    return TaskVerifier(
+        git_manager=GitWorktreeManager(
+            base_path=settings.WORKTREE_BASE_PATH,
+            dependency_cache=get_dependency_cache()
+        ),
+        timeout=settings.TASK_VERIFY_TIMEOUT
+    )
\ No newline at end of file
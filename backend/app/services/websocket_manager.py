@@ -1,8 +1,16 @@
 """WebSocket manager for broadcasting task updates."""
-from typing import Dict, Set
+from typing import Any, Dict, Optional, Set
 from fastapi import WebSocket
+from loguru import logger
+import redis.asyncio as aioredis
 import json
 import asyncio
+import weakref
+
+from app.core.config import settings
+
+# Workers publish task messages here; the API process relays them to its WebSocket clients
+TASK_CHANNEL_PREFIX = "devbud:task:"
 
 
 class ConnectionManager:
@@ -38,6 +46,29 @@ class ConnectionManager:
 # Global connection manager instance
 manager = ConnectionManager()
 
+# Redis clients are bound to the event loop that created them
+_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the Redis client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _redis_clients.get(loop)
+    if client is None:
+        client = aioredis.from_url(settings.REDIS_URL)
+        _redis_clients[loop] = client
+    return client
+
+
+async def publish_task_message(task_id: str, message: str):
+    """Publish a message for a task's WebSocket clients, wherever they are connected."""
+    try:
+        await get_redis().publish(f"{TASK_CHANNEL_PREFIX}{task_id}", message)
+    except Exception as e:
+        # Without Redis only clients connected to this process can be reached
+        logger.debug(f"Could not publish task message for {task_id}: {e}")
+        await manager.send_message(task_id, message)
+
 
 async def broadcast_task_output(task_id: str, output: str):
     """Broadcast task output to all connected clients."""
@@ -48,4 +79,45 @@ async def broadcast_task_output(task_id: str, output: str):
         "timestamp": asyncio.get_event_loop().time()
     })
     
-    await manager.send_message(task_id, message)
\ No newline at end of file
+    await publish_task_message(task_id, message)
+
+
+async def broadcast_task_event(task_id: str, event_type: str, data: Optional[Dict[str, Any]] = None):
+    """Broadcast a structured task event (e.g. a startup stage) to all connected clients."""
+    message = json.dumps({
+        "type": event_type,
+        "task_id": task_id,
+        **(data or {}),
+        "timestamp": asyncio.get_event_loop().time()
+    })
+    
+    await publish_task_message(task_id, message)
+
+
+async def relay_task_messages(retry_delay: float = 5.0):
+    """Forward task messages published by workers to this process's WebSocket clients."""
+    while True:
+        pubsub = None
+        try:
+            pubsub = get_redis().pubsub()
+            await pubsub.psubscribe(f"{TASK_CHANNEL_PREFIX}*")
+            
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                
+                channel = message["channel"].decode()
+                task_id = channel[len(TASK_CHANNEL_PREFIX):]
+                await manager.send_message(task_id, message["data"].decode())
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Task message relay disconnected: {e}")
+            await asyncio.sleep(retry_delay)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
\ No newline at end of file
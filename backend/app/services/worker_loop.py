@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+from loguru import logger
+
+
+class WorkerLoop:
+    """One long-lived event loop per worker process, running in a background thread.
+    
+    Celery tasks are synchronous; instead of a fresh loop per task they submit
+    their coroutines here and wait for the result. Everything bound to a loop
+    (database connection pools, Redis clients, git batch processes, locks) is
+    therefore created once per process and reused by every task.
+    """
+    
+    def __init__(self, name: str = "devbud-worker-loop"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop unless it is already running."""
+        with self._lock:
+            if not self.is_running:
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            return self.loop
+    
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop from a synchronous caller and return its result."""
+        self.start()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("WorkerLoop.run() called from the loop itself; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+    
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.start())
+    
+    def stop(self, shutdown: Optional[Coroutine] = None, timeout: float = 30.0) -> None:
+        """Run ``shutdown`` (e.g. disposing connection pools), then stop and close the loop."""
+        with self._lock:
+            if not self.is_running:
+                if shutdown is not None:
+                    shutdown.close()
+                return
+            loop, thread = self.loop, self._thread
+        
+        if shutdown is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(shutdown, loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"Worker loop shutdown failed: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+    
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+
+# The current process's loop; a forked child starts its own on first use
+worker_loop = WorkerLoop()
\ No newline at end of file
@@ -0,0 +1,276 @@
+import asyncio
+import os
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Task, Repository, TaskStatus
+from app.services.git_manager import GitWorktreeManager
+
+
+ACTIVE_STATUSES = (TaskStatus.PENDING.value, TaskStatus.RUNNING.value)
+
+
+@dataclass
+class WorktreeUsage:
+    """Disk usage and ownership of a single worktree under the worktree base path."""
+    path: str
+    size_bytes: int
+    last_accessed_at: datetime
+    repository_id: Optional[str] = None
+    task_id: Optional[str] = None
+    task_status: Optional[str] = None
+    pinned: bool = False
+    reason: Optional[str] = None  # why the worktree is (or would be) evicted
+
+
+@dataclass
+class GCReport:
+    """Outcome of a garbage collection pass."""
+    dry_run: bool
+    quota_bytes: int
+    total_bytes: int = 0
+    freed_bytes: int = 0
+    repository_bytes: Dict[str, int] = field(default_factory=dict)
+    worktrees: List[WorktreeUsage] = field(default_factory=list)
+    evicted: List[WorktreeUsage] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class WorktreeGarbageCollector:
+    """Enforces disk quotas on task worktrees, evicting least recently accessed ones first.
+    
+    Worktrees of pending, running or pinned tasks are never evicted, including
+    those of tasks still starting up. Worktrees whose task or repository no
+    longer exists are always evicted.
+    """
+    
+    def __init__(
+        self,
+        git_manager: GitWorktreeManager,
+        quota_bytes: int,
+        repository_quota_bytes: int,
+        max_concurrency: int = 8
+    ):
+        self.git_manager = git_manager
+        self.quota_bytes = quota_bytes
+        self.repository_quota_bytes = repository_quota_bytes
+        self.max_concurrency = max_concurrency
+    
+    async def collect(self, db: AsyncSession, dry_run: bool = True) -> GCReport:
+        """Measure every worktree and evict what the quotas require."""
+        report = GCReport(dry_run=dry_run, quota_bytes=self.quota_bytes)
+        
+        repositories = {
+            str(repo.id): repo
+            for repo in (await db.execute(select(Repository))).scalars().all()
+        }
+        tasks_by_path = await self._load_tasks(db, repositories)
+        
+        report.worktrees = await self._measure(self.find_worktrees(), tasks_by_path, repositories)
+        report.total_bytes = sum(w.size_bytes for w in report.worktrees)
+        for usage in report.worktrees:
+            if usage.repository_id:
+                report.repository_bytes[usage.repository_id] = (
+                    report.repository_bytes.get(usage.repository_id, 0) + usage.size_bytes
+                )
+        
+        victims = self._select_victims(report, repositories)
+        
+        if not dry_run:
+            touched_repositories = set()
+            for usage in victims:
+                try:
+                    await self.git_manager.remove_worktree(usage.path)
+                except Exception as e:
+                    report.errors.append(f"{usage.path}: {e}")
+                    continue
+                
+                report.evicted.append(usage)
+                report.freed_bytes += usage.size_bytes
+                task = tasks_by_path.get(usage.path)
+                if task is not None:
+                    task.worktree_path = None
+                    db.add(task)
+                    touched_repositories.add(str(task.repository_id))
+            
+            await db.commit()
+            
+            for repository_id, repository in repositories.items():
+                if repository_id in touched_repositories or not repository.is_active:
+                    await self._prune(repository, report)
+        else:
+            report.evicted = victims
+            report.freed_bytes = sum(w.size_bytes for w in victims)
+        
+        logger.info(
+            f"Worktree GC ({'dry run' if dry_run else 'applied'}): "
+            f"{len(report.evicted)} evicted, {report.freed_bytes} of {report.total_bytes} bytes freed"
+        )
+        return report
+    
+    def find_worktrees(self) -> List[Path]:
+        """Find worktree roots under the base path (branch names may contain slashes)."""
+        worktrees = []
+        
+        for root, dirs, files in os.walk(self.git_manager.base_path):
+            if ".git" in files or ".git" in dirs:
+                worktrees.append(Path(root))
+                dirs.clear()
+            else:
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+        
+        return worktrees
+    
+    def _select_victims(
+        self,
+        report: GCReport,
+        repositories: Dict[str, Repository]
+    ) -> List[WorktreeUsage]:
+        """Choose worktrees to evict: orphans first, then LRU per repository, then LRU globally."""
+        victims: List[WorktreeUsage] = []
+        candidates: List[WorktreeUsage] = []
+        repository_bytes = dict(report.repository_bytes)
+        total = report.total_bytes
+        
+        for usage in report.worktrees:
+            if usage.pinned or usage.task_status in ACTIVE_STATUSES:
+                continue
+            if usage.task_id is None:
+                usage.reason = "orphaned"
+                victims.append(usage)
+            else:
+                candidates.append(usage)
+        
+        for usage in victims:
+            total -= usage.size_bytes
+            if usage.repository_id:
+                repository_bytes[usage.repository_id] -= usage.size_bytes
+        
+        candidates.sort(key=lambda u: u.last_accessed_at)
+        
+        # Per-repository quotas
+        for usage in candidates:
+            repository = repositories.get(usage.repository_id)
+            quota = (
+                repository.worktree_quota_bytes
+                if repository is not None and repository.worktree_quota_bytes
+                else self.repository_quota_bytes
+            )
+            if repository_bytes.get(usage.repository_id, 0) > quota:
+                usage.reason = "repository quota"
+                victims.append(usage)
+                repository_bytes[usage.repository_id] -= usage.size_bytes
+                total -= usage.size_bytes
+        
+        # Global quota
+        for usage in candidates:
+            if total <= self.quota_bytes:
+                break
+            if usage.reason is None:
+                usage.reason = "global quota"
+                victims.append(usage)
+                total -= usage.size_bytes
+        
+        return victims
+    
+    async def _load_tasks(self, db: AsyncSession, repositories: Dict[str, Repository]) -> Dict[str, Task]:
+        query = select(Task).where(or_(
+            Task.worktree_path.isnot(None),
+            Task.status.in_([TaskStatus.PENDING, TaskStatus.RUNNING])
+        ))
+        result = await db.execute(query)
+        
+        tasks_by_path = {}
+        starting = []
+        for task in result.scalars().all():
+            if task.worktree_path:
+                tasks_by_path[str(Path(task.worktree_path).expanduser().absolute())] = task
+            else:
+                starting.append(task)
+        
+        # A task records its worktree path only once checkout and install are done;
+        # until then its worktree is where the git manager creates it
+        for task in starting:
+            repository = repositories.get(str(task.repository_id))
+            if repository is not None:
+                path = self.git_manager.base_path / Path(repository.path).expanduser().name / task.branch_name
+                tasks_by_path[str(path.absolute())] = task
+        
+        return tasks_by_path
+    
+    async def _measure(
+        self,
+        paths: List[Path],
+        tasks_by_path: Dict[str, Task],
+        repositories: Dict[str, Repository]
+    ) -> List[WorktreeUsage]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def measure(path: Path) -> WorktreeUsage:
+            async with semaphore:
+                size_bytes, accessed = await asyncio.to_thread(_disk_usage, path)
+            
+            usage = WorktreeUsage(
+                path=str(path),
+                size_bytes=size_bytes,
+                last_accessed_at=datetime.utcfromtimestamp(accessed)
+            )
+            
+            task = tasks_by_path.get(str(path))
+            repository = repositories.get(str(task.repository_id)) if task is not None else None
+            if task is not None and repository is not None and repository.is_active:
+                usage.task_id = str(task.id)
+                usage.repository_id = str(task.repository_id)
+                usage.task_status = task.status.value
+                usage.pinned = bool(task.is_pinned)
+                if task.completed_at and task.completed_at > usage.last_accessed_at:
+                    usage.last_accessed_at = task.completed_at
+            
+            return usage
+        
+        return await asyncio.gather(*(measure(path) for path in paths))
+    
+    async def _prune(self, repository: Repository, report: GCReport) -> None:
+        try:
+            await self.git_manager.prune_worktrees(repository.path)
+        except Exception as e:
+            report.errors.append(f"prune {repository.path}: {e}")
+
+
+def get_worktree_gc() -> WorktreeGarbageCollector:
+    """Create the worktree garbage collector configured by the application settings."""
+    return WorktreeGarbageCollector(
+        git_manager=GitWorktreeManager(base_path=settings.WORKTREE_BASE_PATH),
+        quota_bytes=settings.WORKTREE_QUOTA_BYTES,
+        repository_quota_bytes=settings.WORKTREE_REPOSITORY_QUOTA_BYTES
+    )
+
+
+def _disk_usage(path: Path):
+    """Return (bytes on disk, last access timestamp) for a worktree.
+    
+    Files hardlinked from the dependency cache are shared by several
+    worktrees, so each link is charged its share of the blocks.
+    """
+    total = 0
+    stat = os.stat(path)
+    accessed = max(stat.st_atime, stat.st_mtime)
+    
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                file_stat = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            total += file_stat.st_blocks * 512 // max(file_stat.st_nlink, 1)
+    
+    return total, accessed
\ No newline at end of file
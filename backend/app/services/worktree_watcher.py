@@ -0,0 +1,209 @@
+import asyncio
+import os
+import shlex
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from loguru import logger
+from watchfiles import Change, awatch
+
+from app.core.config import settings
+from app.services.git_manager import PACKAGE_MANAGERS
+from app.services.process import run_shell
+from app.services.websocket_manager import broadcast_task_event
+
+
+# Directories never reported: git's own state and installed dependencies
+SKIPPED_DIRECTORIES = {".git"} | {d for _, _, d in PACKAGE_MANAGERS if d}
+
+EventPublisher = Callable[[str, str, Optional[Dict]], Awaitable[None]]
+
+
+class WorktreeWatcher:
+    """Streams file changes in a running task's worktree to its live channel.
+    
+    Filesystem notifications (inotify on Linux) are debounced into batches;
+    each batch is coalesced to one change per path, filtered through the
+    worktree's ``.gitignore`` rules, annotated with line counts against the
+    task's base commit and published as a ``file_change`` event.
+    """
+    
+    def __init__(
+        self,
+        task_id: str,
+        worktree_path: str,
+        base_commit: Optional[str] = None,
+        debounce_ms: int = 500,
+        max_file_bytes: int = 256 * 1024,
+        publish: EventPublisher = broadcast_task_event
+    ):
+        self.task_id = task_id
+        self.worktree_path = Path(worktree_path).expanduser().absolute()
+        self.base_commit = base_commit or "HEAD"
+        self.debounce_ms = debounce_ms
+        self.max_file_bytes = max_file_bytes
+        self.publish = publish
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    async def __aenter__(self) -> "WorktreeWatcher":
+        self.start()
+        return self
+    
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+    
+    def start(self) -> None:
+        """Start watching in the background."""
+        self._task = asyncio.create_task(self._watch())
+    
+    async def stop(self) -> None:
+        """Stop watching; changes still inside the debounce window are dropped."""
+        self._stop.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def _watch(self) -> None:
+        try:
+            async for changes in awatch(
+                self.worktree_path,
+                watch_filter=self._watch_filter,
+                debounce=self.debounce_ms,
+                stop_event=self._stop
+            ):
+                try:
+                    await self._publish(changes)
+                except Exception as e:
+                    logger.warning(f"Failed to publish file changes of task {self.task_id}: {e}")
+        except Exception as e:
+            # Watching is informational; it must never affect the task
+            logger.warning(f"Stopped watching worktree of task {self.task_id}: {e}")
+    
+    def _watch_filter(self, change: Change, path: str) -> bool:
+        parts = Path(path).relative_to(self.worktree_path).parts
+        return not any(part in SKIPPED_DIRECTORIES for part in parts)
+    
+    async def _publish(self, changes: Set[Tuple[Change, str]]) -> None:
+        coalesced = self.coalesce(changes, self.worktree_path)
+        ignored = await self._ignored(list(coalesced))
+        coalesced = {path: change for path, change in coalesced.items() if path not in ignored}
+        if not coalesced:
+            return
+        
+        # Editors that save by renaming a temporary file over the original look like a create
+        tracked = await self._tracked(list(coalesced))
+        for path in tracked:
+            if coalesced.get(path) == "created":
+                coalesced[path] = "modified"
+        
+        deltas = await self._line_deltas(coalesced, tracked)
+        await self.publish(self.task_id, "file_change", {
+            "changes": [
+                {"path": path, "change": change, **deltas.get(path, {"additions": 0, "deletions": 0, "binary": False})}
+                for path, change in sorted(coalesced.items())
+            ]
+        })
+    
+    @staticmethod
+    def coalesce(changes: Set[Tuple[Change, str]], root: Path) -> Dict[str, str]:
+        """Reduce a batch to one change per file, relative to the worktree root.
+        
+        A file created and deleted within the batch is dropped; one deleted and
+        recreated counts as modified. Directories are not reported.
+        """
+        seen: Dict[str, Set[Change]] = {}
+        for change, path in changes:
+            seen.setdefault(path, set()).add(change)
+        
+        coalesced = {}
+        for path, kinds in seen.items():
+            if os.path.isdir(path):
+                continue
+            if not os.path.isfile(path):
+                if Change.added in kinds:
+                    continue  # created and removed again within the batch
+                change = "deleted"
+            elif Change.added in kinds and Change.deleted not in kinds:
+                change = "created"
+            else:
+                change = "modified"
+            coalesced[str(Path(path).relative_to(root))] = change
+        
+        return coalesced
+    
+    async def _ignored(self, paths: List[str]) -> Set[str]:
+        """Paths matched by .gitignore rules (tracked files are never ignored)."""
+        if not paths:
+            return set()
+        
+        process = await asyncio.create_subprocess_exec(
+            "git", "check-ignore", "-z", "--stdin",
+            cwd=str(self.worktree_path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate("\0".join(paths).encode() + b"\0")
+        # Exit status 1 means nothing is ignored
+        return {path for path in stdout.decode().split("\0") if path}
+    
+    async def _tracked(self, paths: List[str]) -> Set[str]:
+        """Paths that exist in the base commit."""
+        if not paths:
+            return set()
+        
+        pathspecs = " ".join(shlex.quote(f":(literal){path}") for path in paths)
+        output = await run_shell(
+            f"git ls-tree -r -z --name-only {self.base_commit} -- {pathspecs}",
+            cwd=str(self.worktree_path)
+        )
+        return {path for path in output.split("\0") if path}
+    
+    async def _line_deltas(self, changes: Dict[str, str], tracked: Set[str]) -> Dict[str, Dict]:
+        """Lines added and deleted per file against the base commit."""
+        pathspecs = " ".join(shlex.quote(f":(literal){path}") for path in changes)
+        output = await run_shell(
+            f"git diff --numstat -z --no-renames {self.base_commit} -- {pathspecs}",
+            cwd=str(self.worktree_path)
+        )
+        
+        deltas = {}
+        for record in output.split("\0"):
+            if not record:
+                continue
+            additions, deletions, path = record.split("\t", 2)
+            binary = additions == "-"
+            deltas[path] = {
+                "additions": 0 if binary else int(additions),
+                "deletions": 0 if binary else int(deletions),
+                "binary": binary
+            }
+        
+        # Untracked files do not show up in the diff: every line is new
+        for path, change in changes.items():
+            if path not in deltas and path not in tracked and change != "deleted":
+                deltas[path] = await asyncio.to_thread(self._count_lines, self.worktree_path / path)
+        
+        return deltas
+    
+    def _count_lines(self, path: Path) -> Dict:
+        try:
+            with open(path, "rb") as f:
+                data = f.read(self.max_file_bytes)
+        except OSError:
+            return {"additions": 0, "deletions": 0, "binary": False}
+        if b"\0" in data:
+            return {"additions": 0, "deletions": 0, "binary": True}
+        lines = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+        return {"additions": lines, "deletions": 0, "binary": False}
+
+
+def watch_worktree(task_id: str, worktree_path: str, base_commit: Optional[str] = None) -> WorktreeWatcher:
+    """Create a worktree watcher configured by the application settings."""
+    return WorktreeWatcher(
+        task_id,
+        worktree_path,
+        base_commit=base_commit,
+        debounce_ms=settings.WORKTREE_WATCH_DEBOUNCE_MS,
+        max_file_bytes=settings.TASK_DIFF_MAX_FILE_BYTES
+    )
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Benchmark repository metadata queries: spawn-per-call vs. long-lived git batch processes
+
+Usage: python benchmark_git_metadata.py [repo_path ...] [--queries N] [--concurrency N]
+
+Both variants answer the same three lookups per query (git directory, current
+branch, HEAD commit) with the same number of queries in flight, so the
+difference is the cost of spawning processes.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.git_batch import GitBatchPool
+from app.services.process import run_shell
+
+
+async def run_queries(query, repos, queries, concurrency):
+    """Run `queries` queries round-robin over the repositories, at most `concurrency` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def bounded(repo):
+        async with semaphore:
+            await query(repo)
+    
+    await asyncio.gather(*(bounded(repos[i % len(repos)]) for i in range(queries)))
+
+
+async def spawn_per_call(repos, queries, concurrency):
+    """The original approach: one shell and one git process per lookup."""
+    
+    async def query(repo):
+        await run_shell("git rev-parse --git-dir", cwd=repo)
+        await run_shell("git rev-parse --abbrev-ref HEAD", cwd=repo)
+        await run_shell("git rev-parse HEAD", cwd=repo)
+    
+    await run_queries(query, repos, queries, concurrency)
+
+
+async def batched(repos, queries, concurrency):
+    """Long-lived batch processes; concurrent queries are pipelined."""
+    pool = GitBatchPool()
+    
+    async def query(repo):
+        batch = await pool.get(repo)
+        batch.head()
+        await batch.resolve("HEAD")
+    
+    try:
+        await run_queries(query, repos, queries, concurrency)
+    finally:
+        await pool.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("repos", nargs="*", default=[os.path.dirname(os.path.abspath(__file__))])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    
+    print(
+        f"=== Git metadata benchmark: {args.queries} queries over {len(args.repos)} repositories, "
+        f"{args.concurrency} in flight ===\n"
+    )
+    
+    results = {}
+    for name, run in [("spawn per call", spawn_per_call), ("batch processes", batched)]:
+        started = time.perf_counter()
+        await run(args.repos, args.queries, args.concurrency)
+        elapsed = time.perf_counter() - started
+        results[name] = elapsed
+        print(f"{name:>16}: {elapsed:7.3f}s  ({args.queries / elapsed:8.1f} queries/s)")
+    
+    print(f"\nSpeedup: {results['spawn per call'] / results['batch processes']:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
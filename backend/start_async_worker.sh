@@ -0,0 +1,14 @@
+#!/bin/bash
+# Start the asyncio-native worker: many tasks at once in one process
+
+# Load environment variables
+export $(cat .env.local | xargs)
+
+echo "Starting async worker..."
+echo "REDIS_URL: $REDIS_URL"
+echo "WORKTREE_BASE_PATH: $WORKTREE_BASE_PATH"
+
+# Consumes the same queue as the Celery worker; stop it with SIGTERM to let running tasks wind down
+venv/bin/python -m app.services.async_worker \
+    --queues=celery \
+    --concurrency=${ASYNC_WORKER_CONCURRENCY:-32}
\ No newline at end of file
@@ -25,7 +25,7 @@ class TestTaskAPI:
             "instructions": "Implement test feature"
         }
         
-        with patch('app.api.endpoints.tasks.execute_task.delay') as mock_celery:
+        with patch('app.api.endpoints.tasks.dispatch_tasks.delay') as mock_celery:
             response = client.post("/api/v1/tasks/", json=task_payload)
         
         assert response.status_code == 201
@@ -68,7 +68,7 @@ class TestTaskAPI:
             "instructions": "First task"
         }
         
-        with patch('app.api.endpoints.tasks.execute_task.delay'):
+        with patch('app.api.endpoints.tasks.dispatch_tasks.delay'):
             client.post("/api/v1/tasks/", json=task_payload)
         
         # Try to create second task with same branch
@@ -78,6 +78,42 @@ class TestTaskAPI:
         assert response.status_code == 400
         assert "already exists" in response.json()["detail"]
     
+    def test_create_task_batch(self, client, test_repo_path):
+        """Test batch creation inserts the valid tasks and reports the others per item."""
+        repo_payload = {
+            "name": "test-repo",
+            "path": test_repo_path,
+            "default_branch": "main"
+        }
+        repo_id = client.post("/api/v1/repositories/", json=repo_payload).json()["id"]
+        
+        batch_payload = {
+            "tasks": [
+                {"repository_id": repo_id, "branch_name": "feature-a", "instructions": "First task"},
+                {"repository_id": repo_id, "branch_name": "feature-b", "instructions": "Second task"},
+                {"repository_id": repo_id, "branch_name": "feature-a", "instructions": "Same branch"},
+                {
+                    "repository_id": "00000000-0000-0000-0000-000000000000",
+                    "branch_name": "feature-c",
+                    "instructions": "Unknown repository"
+                }
+            ]
+        }
+        
+        with patch('app.api.endpoints.tasks.dispatch_tasks.delay') as mock_celery:
+            response = client.post("/api/v1/tasks/batch", json=batch_payload)
+        
+        assert response.status_code == 207
+        data = response.json()
+        assert (data["created"], data["failed"]) == (2, 2)
+        assert [item["index"] for item in data["results"]] == [0, 1, 2, 3]
+        assert data["results"][0]["task"]["branch_name"] == "feature-a"
+        assert data["results"][1]["task"]["status"] == "pending"
+        assert "already has an active task" in data["results"][2]["error"]
+        assert data["results"][3]["error"] == "Repository not found"
+        # The whole batch is queued with one message
+        mock_celery.assert_called_once()
+    
     def test_list_tasks(self, client):
         """Test listing all tasks."""
         with patch('app.api.endpoints.tasks.get_all_tasks') as mock_get_tasks:
@@ -121,7 +157,7 @@ class TestTaskAPI:
             "instructions": "Test instructions"
         }
         
-        with patch('app.api.endpoints.tasks.execute_task.delay'):
+        with patch('app.api.endpoints.tasks.dispatch_tasks.delay'):
             create_response = client.post("/api/v1/tasks/", json=task_payload)
         task_id = create_response.json()["id"]
         
@@ -151,7 +187,7 @@ class TestTaskAPI:
             "instructions": "Test instructions"
         }
         
-        with patch('app.api.endpoints.tasks.execute_task.delay'):
+        with patch('app.api.endpoints.tasks.dispatch_tasks.delay'):
             create_response = client.post("/api/v1/tasks/", json=task_payload)
         task_id = create_response.json()["id"]
         
@@ -181,7 +217,7 @@ class TestTaskAPI:
             "instructions": "Test instructions"
         }
         
-        with patch('app.api.endpoints.tasks.execute_task.delay'):
+        with patch('app.api.endpoints.tasks.dispatch_tasks.delay'):
             create_response = client.post("/api/v1/tasks/", json=task_payload)
         task_id = create_response.json()["id"]
         
@@ -231,4 +267,36 @@ class TestTaskAPI:
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
-        assert data[0]["repository_id"] == repo_id
\ No newline at end of file
+        assert data[0]["repository_id"] == repo_id    
+    async def test_get_task_diff_missing_worktree(self, tmp_path):
+        """Test diffing a running task whose worktree is gone returns 404 instead of failing in git."""
+        from fastapi import HTTPException
+        from app.api.endpoints.tasks import get_task_diff
+        
+        task = Mock(
+            base_commit="abc123",
+            diffstat=None,
+            result_tree=None,
+            worktree_path=str(tmp_path / "removed"),
+            repository=Mock(path=str(tmp_path))
+        )
+        db = AsyncMock()
+        db.execute.return_value = Mock(scalar_one_or_none=Mock(return_value=task))
+        
+        with patch('app.api.endpoints.tasks.GitWorktreeManager.snapshot_tree') as mock_snapshot:
+            with pytest.raises(HTTPException) as exc_info:
+                await get_task_diff(task_id="task-1", page=1, per_page=20, db=db)
+        
+        assert exc_info.value.status_code == 404
+        mock_snapshot.assert_not_called()
+        
+        # A worktree removed while it is being read is reported as a conflict
+        (tmp_path / "removed").mkdir()
+        with patch(
+            'app.api.endpoints.tasks.GitWorktreeManager.snapshot_tree',
+            side_effect=RuntimeError("not a git repository")
+        ):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_task_diff(task_id="task-1", page=1, per_page=20, db=db)
+        
+        assert exc_info.value.status_code == 409
\ No newline at end of file
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+import uuid
+from celery import Celery
+
+
+@pytest.mark.unit
+class TestAsyncWorker:
+    """Test the asyncio-native worker against an in-memory broker."""
+    
+    @pytest.fixture
+    def app(self):
+        return Celery("test-async-worker", broker="memory://")
+    
+    @pytest.fixture
+    def queue(self):
+        # The in-memory broker is shared by the whole process
+        return f"test-{uuid.uuid4().hex}"
+    
+    async def wait_for(self, condition, timeout=10.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not condition():
+            assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+            await asyncio.sleep(0.02)
+    
+    def test_decode_message_protocols(self):
+        """Test task messages of both Celery protocols decode to the same call."""
+        from app.services.async_worker import decode_message
+        
+        headers = {"task": "execute_task", "id": "abc", "eta": "2026-01-01T00:00:00+00:00"}
+        v2 = decode_message([["t1", "r1"], {"instructions": "x"}, {}], headers)
+        v1 = decode_message({"task": "execute_task", "id": "abc", "args": ["t1", "r1"], "kwargs": {"instructions": "x"}}, {})
+        
+        assert (v2.name, v2.id, v2.args, v2.kwargs) == ("execute_task", "abc", ("t1", "r1"), {"instructions": "x"})
+        assert (v1.name, v1.args, v1.kwargs, v1.eta) == (v2.name, v2.args, v2.kwargs, None)
+        assert v2.eta.year == 2026 and v2.eta.tzinfo is not None
+    
+    async def test_runs_tasks_concurrently_up_to_the_limit(self, app, queue):
+        """Test many tasks run side by side in one process, never more than the concurrency."""
+        from app.services.async_worker import AsyncWorker
+        
+        active, peak, done = [0], [0], []
+        
+        async def work(n):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.2)
+            active[0] -= 1
+            done.append(n)
+        
+        worker = AsyncWorker(app, {"work": work}, concurrency=3, queues=[queue])
+        for n in range(7):
+            app.send_task("work", args=(n,), queue=queue)
+        
+        running = asyncio.create_task(worker.run())
+        await self.wait_for(lambda: len(done) == 7)
+        worker.stop()
+        await running
+        
+        assert sorted(done) == list(range(7))
+        assert peak[0] == 3
+        assert worker.processed == 7
+    
+    async def test_shutdown_winds_down_running_tasks_and_returns_held_ones(self, app, queue):
+        """Test shutdown lets running tasks finish after the hook and hands held messages back."""
+        from app.services.async_worker import AsyncWorker
+        
+        winding_down = asyncio.Event()
+        done = []
+        
+        async def slow(n):
+            await winding_down.wait()
+            done.append(n)
+        
+        async def before_shutdown(running):
+            assert [message.args for message in running] == [(1,)]
+            winding_down.set()
+        
+        worker = AsyncWorker(app, {"slow": slow}, concurrency=2, queues=[queue], before_shutdown=before_shutdown)
+        app.send_task("slow", args=(1,), queue=queue)
+        # Retried with a countdown: held without taking a slot
+        app.send_task("slow", args=(2,), queue=queue, countdown=60)
+        
+        running = asyncio.create_task(worker.run())
+        await self.wait_for(lambda: len(worker.running) == 1 and len(worker._held) == 1)
+        worker.stop()
+        await running
+        
+        assert done == [1]
+        with app.connection_for_read() as connection:
+            assert connection.default_channel.queue_declare(queue, passive=True).message_count == 1
\ No newline at end of file
@@ -0,0 +1,119 @@
+import pytest
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+
+@pytest.mark.unit
+class TestDependencyCache:
+    """Test DependencyCache service."""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create DependencyCache instance with test path."""
+        from app.services.dependency_cache import DependencyCache
+        return DependencyCache(base_path=str(tmp_path / "cache"), link_mode="hardlink")
+    
+    @pytest.fixture
+    def node_modules(self, tmp_path):
+        """Create a fake installed node_modules tree."""
+        path = tmp_path / "project" / "node_modules"
+        (path / "left-pad").mkdir(parents=True)
+        (path / "left-pad" / "index.js").write_text("module.exports = () => {}")
+        (path / ".bin").mkdir()
+        os.symlink("../left-pad/index.js", path / ".bin" / "left-pad")
+        return path
+    
+    def test_compute_key_depends_on_lockfile_contents(self, cache, tmp_path):
+        """Test cache keys change with the lockfile contents."""
+        lockfile = tmp_path / "package-lock.json"
+        lockfile.write_text('{"lockfileVersion": 3}')
+        first = cache.compute_key("npm install", [lockfile])
+        
+        assert cache.compute_key("npm install", [lockfile]) == first
+        assert cache.compute_key("yarn install", [lockfile]) != first
+        
+        lockfile.write_text('{"lockfileVersion": 2}')
+        assert cache.compute_key("npm install", [lockfile]) != first
+    
+    async def test_populate_and_materialize(self, cache, node_modules, tmp_path):
+        """Test a populated entry is materialized with hardlinks."""
+        await cache.populate("abc", str(node_modules))
+        
+        destination = tmp_path / "worktree" / "node_modules"
+        assert await cache.materialize("abc", str(destination)) is True
+        
+        materialized = destination / "left-pad" / "index.js"
+        cached = cache.lookup("abc") / "left-pad" / "index.js"
+        assert materialized.read_text() == "module.exports = () => {}"
+        assert os.stat(materialized).st_ino == os.stat(cached).st_ino
+        assert os.path.islink(destination / ".bin" / "left-pad")
+    
+    async def test_auto_mode_never_shares_inodes(self, node_modules, tmp_path):
+        """Test the default mode gives worktrees their own files, so writing one leaves the cache intact."""
+        from app.services.dependency_cache import DependencyCache
+        
+        cache = DependencyCache(base_path=str(tmp_path / "cache"), link_mode="auto")
+        await cache.populate("abc", str(node_modules))
+        destination = tmp_path / "worktree" / "node_modules"
+        await cache.materialize("abc", str(destination))
+        
+        materialized = destination / "left-pad" / "index.js"
+        cached = cache.lookup("abc") / "left-pad" / "index.js"
+        assert os.stat(materialized).st_ino != os.stat(cached).st_ino
+        
+        with open(materialized, "w") as f:
+            f.write("patched")
+        assert cached.read_text() == "module.exports = () => {}"
+    
+    async def test_materialize_miss(self, cache, tmp_path):
+        """Test materializing an unknown key reports a miss."""
+        assert await cache.materialize("missing", str(tmp_path / "node_modules")) is False
+        assert not (tmp_path / "node_modules").exists()
+    
+    async def test_evict_least_recently_used(self, cache, node_modules):
+        """Test eviction removes the least recently used entries first."""
+        await cache.populate("old", str(node_modules))
+        await cache.populate("new", str(node_modules))
+        
+        past = time.time() - 3600
+        os.utime(cache.entry_path("old") / "entry.json", (past, past))
+        entry_size = cache.entries()[0].size_bytes
+        
+        evicted = cache.evict(max_bytes=entry_size)
+        
+        assert evicted == ["old"]
+        assert cache.lookup("old") is None
+        assert cache.lookup("new") is not None
+    
+    async def test_install_dependencies_uses_cache(self, tmp_path):
+        """Test a second worktree with the same lockfile skips the install."""
+        from app.services.dependency_cache import DependencyCache
+        from app.services.git_manager import GitWorktreeManager
+        
+        cache = DependencyCache(base_path=str(tmp_path / "cache"), link_mode="hardlink")
+        git_manager = GitWorktreeManager(
+            base_path=str(tmp_path / "worktrees"),
+            dependency_cache=cache
+        )
+        
+        async def fake_install(command, cwd=None, timeout=None, on_output=None):
+            (Path(cwd) / "node_modules" / "pkg").mkdir(parents=True)
+            (Path(cwd) / "node_modules" / "pkg" / "index.js").write_text("")
+            return ""
+        
+        worktrees = []
+        for name in ["first", "second"]:
+            worktree = tmp_path / name
+            worktree.mkdir()
+            (worktree / "package.json").write_text('{"name": "test"}')
+            (worktree / "package-lock.json").write_text('{"lockfileVersion": 3}')
+            worktrees.append(worktree)
+        
+        with patch.object(git_manager, "_run_command", side_effect=fake_install) as mock_run:
+            await git_manager._install_dependencies(str(worktrees[0]))
+            await git_manager._install_dependencies(str(worktrees[1]))
+        
+        mock_run.assert_called_once_with("npm install", cwd=str(worktrees[0]), timeout=None, on_output=None)
+        assert (worktrees[1] / "node_modules" / "pkg" / "index.js").exists()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import pytest
+import subprocess
+
+
+@pytest.mark.unit
+class TestGitBatch:
+    """Test long-lived git batch processes."""
+    
+    @pytest.fixture
+    async def pool(self):
+        """Create a batch process pool and stop its processes afterwards."""
+        from app.services.git_batch import GitBatchPool
+        
+        pool = GitBatchPool(max_processes=2)
+        yield pool
+        await pool.close()
+    
+    async def test_pipelined_queries(self, pool, test_repo_path):
+        """Test concurrent queries over one process get their own replies."""
+        head = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=test_repo_path,
+            capture_output=True,
+            text=True
+        ).stdout.strip()
+        
+        batch = await pool.get(test_repo_path)
+        results = await batch.info_many(["HEAD", "does-not-exist", "HEAD^{tree}", "HEAD"])
+        
+        assert results[0].oid == head
+        assert results[0].type == "commit"
+        assert results[1] is None
+        assert results[2].type == "tree"
+        assert results[3].oid == head
+        assert (await batch.contents("HEAD")).startswith(b"tree ")
+    
+    async def test_sees_ref_updates(self, pool, test_repo_path):
+        """Test a running process resolves refs and the branch as they change."""
+        batch = await pool.get(test_repo_path)
+        before = await batch.resolve("HEAD")
+        
+        subprocess.run(["git", "checkout", "-q", "-b", "batch-test"], cwd=test_repo_path, check=True)
+        subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "next"], cwd=test_repo_path, check=True)
+        
+        assert batch.head() == "batch-test"
+        assert await batch.resolve("HEAD") != before
+        assert await batch.resolve("HEAD~1") == before
+    
+    async def test_pool_reuses_and_evicts(self, pool, test_repo_path, tmp_path):
+        """Test one process is kept per repository up to the pool limit."""
+        from app.services.git_batch import GitBatchError
+        
+        others = []
+        for name in ["second", "third"]:
+            repo = tmp_path / name
+            repo.mkdir()
+            subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+            others.append(str(repo))
+        
+        first = await pool.get(test_repo_path)
+        assert await pool.get(test_repo_path) is first
+        
+        await pool.get(others[0])
+        await pool.get(others[1])
+        
+        assert not first.is_alive
+        with pytest.raises(GitBatchError):
+            await pool.get(str(tmp_path))
\ No newline at end of file
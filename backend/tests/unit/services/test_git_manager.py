@@ -1,5 +1,6 @@
 import pytest
 import os
+import shutil
 import subprocess
 from pathlib import Path
 from unittest.mock import AsyncMock, patch, MagicMock
@@ -183,4 +184,175 @@ class TestGitWorktreeManager:
             
             # Verify worktree was cleaned up
             worktrees = await git_manager.list_worktrees(test_repo_path)
-            assert not any("feature-fail" in w["path"] for w in worktrees)
\ No newline at end of file
+            assert not any("feature-fail" in w["path"] for w in worktrees)
+    
+    async def test_install_policy_never(self, git_manager, tmp_path):
+        """Test the never policy skips installation entirely."""
+        (tmp_path / "package.json").write_text("{}")
+        
+        with patch('app.services.git_manager.GitWorktreeManager._run_command') as mock_run:
+            result = await git_manager.install_dependencies(str(tmp_path), policy="never")
+        
+        assert result.status == "skipped"
+        mock_run.assert_not_called()
+    
+    async def test_install_policy_on_lockfile_change(self, tmp_path):
+        """Test installs are skipped while the lockfile hash is unchanged and the cache restores everything."""
+        from app.services.dependency_cache import DependencyCache
+        from app.services.git_manager import GitWorktreeManager
+        
+        cache = DependencyCache(base_path=str(tmp_path / "cache"), link_mode="hardlink")
+        git_manager = GitWorktreeManager(base_path=str(tmp_path / "worktrees"), dependency_cache=cache)
+        worktree = tmp_path / "worktree"
+        (worktree / "node_modules" / "left-pad").mkdir(parents=True)
+        (worktree / "node_modules" / "left-pad" / "index.js").write_text("module.exports = 1")
+        (worktree / "package.json").write_text("{}")
+        (worktree / "yarn.lock").write_text("# yarn lockfile v1\n")
+        lockfile_hash = git_manager.lockfile_hash(str(worktree))
+        await cache.populate(
+            DependencyCache.compute_key("yarn install", [worktree / "yarn.lock"]), str(worktree / "node_modules")
+        )
+        shutil.rmtree(worktree / "node_modules")
+        
+        with patch('app.services.git_manager.GitWorktreeManager._run_command') as mock_run:
+            skipped = await git_manager.install_dependencies(
+                str(worktree),
+                policy="on_lockfile_change",
+                previous_lockfile_hash=lockfile_hash
+            )
+            mock_run.assert_not_called()
+            
+            installed = await git_manager.install_dependencies(
+                str(worktree),
+                policy="on_lockfile_change",
+                previous_lockfile_hash="stale"
+            )
+        
+        assert skipped.status == "skipped"
+        assert (worktree / "node_modules" / "left-pad" / "index.js").exists()
+        assert installed.status == "succeeded"
+        assert installed.command == "yarn install"
+        assert installed.lockfile_hash == lockfile_hash
+    
+    async def test_install_policy_on_lockfile_change_without_cache(self, git_manager, tmp_path):
+        """Test an unchanged lockfile still installs when the cache cannot restore the dependencies."""
+        (tmp_path / "package.json").write_text("{}")
+        (tmp_path / "yarn.lock").write_text("# yarn lockfile v1\n")
+        
+        with patch('app.services.git_manager.GitWorktreeManager._run_command') as mock_run:
+            result = await git_manager.install_dependencies(
+                str(tmp_path),
+                policy="on_lockfile_change",
+                previous_lockfile_hash=git_manager.lockfile_hash(str(tmp_path))
+            )
+        
+        assert result.status == "succeeded"
+        mock_run.assert_called_once_with("yarn install", cwd=str(tmp_path), timeout=None, on_output=None)
+    
+    async def test_install_policy_custom_command_timeout(self, git_manager, tmp_path):
+        """Test custom install commands honour their timeout."""
+        result = await git_manager.install_dependencies(
+            str(tmp_path),
+            policy="custom",
+            command="sleep 5",
+            timeout=0.2
+        )
+        
+        assert result.status == "failed"
+        assert result.command == "sleep 5"
+        assert "timed out" in result.error
+        assert result.duration_seconds < 5
+    
+    async def test_create_sparse_worktree(self, git_manager, test_repo_path):
+        """Test sparse worktrees check out only their cone and install only its manifests."""
+        repo = Path(test_repo_path)
+        for directory in ["services/billing", "services/search", "libs/common"]:
+            (repo / directory).mkdir(parents=True)
+            (repo / directory / "package.json").write_text("{}")
+        subprocess.run(["git", "add", "."], cwd=repo, check=True)
+        subprocess.run(["git", "commit", "-q", "-m", "Add packages"], cwd=repo, check=True)
+        
+        run_command = git_manager._run_command
+        
+        async def run_git_only(command, **kwargs):
+            return "" if command == "npm install" else await run_command(command, **kwargs)
+        
+        with patch('app.services.git_manager.GitWorktreeManager._run_command', side_effect=run_git_only) as mock_run:
+            worktree_path = Path(await git_manager.create_worktree(
+                repo_path=test_repo_path,
+                branch_name="feature-sparse",
+                sparse_patterns=["services/billing", "libs/common"]
+            ))
+        
+        assert (worktree_path / "README.md").exists()
+        assert (worktree_path / "services" / "billing" / "package.json").exists()
+        assert (worktree_path / "libs" / "common" / "package.json").exists()
+        assert not (worktree_path / "services" / "search").exists()
+        
+        installs = [call for call in mock_run.call_args_list if call.args[0] == "npm install"]
+        assert sorted(call.kwargs["cwd"] for call in installs) == [
+            str(worktree_path / "libs" / "common"),
+            str(worktree_path / "services" / "billing"),
+        ]
+    
+    async def test_fetch_base_single_flight(self, git_manager, test_repo_path, tmp_path):
+        """Test concurrent fetches of one ref share a fetch and recent fetches are reused."""
+        import asyncio
+        
+        clone = tmp_path / "clone"
+        subprocess.run(["git", "clone", "-q", test_repo_path, str(clone)], check=True)
+        branch = subprocess.run(
+            ["git", "branch", "--show-current"], cwd=test_repo_path, capture_output=True, text=True
+        ).stdout.strip()
+        
+        run_command = git_manager._run_command
+        with patch('app.services.git_manager.GitWorktreeManager._run_command', side_effect=run_command) as mock_run:
+            commits = await asyncio.gather(*(
+                git_manager.fetch_base(str(clone), branch, freshness=60) for _ in range(5)
+            ))
+            subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "upstream"], cwd=test_repo_path, check=True)
+            cached = await git_manager.fetch_base(str(clone), branch, freshness=60)
+            fresh = await git_manager.fetch_base(str(clone), branch, freshness=0)
+        
+        head = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=test_repo_path, capture_output=True, text=True
+        ).stdout.strip()
+        fetches = [call for call in mock_run.call_args_list if call.args[0].startswith("git fetch")]
+        assert len(fetches) == 2
+        assert len(set(commits)) == 1
+        assert cached == commits[0]
+        assert fresh == head != cached
+    
+    async def test_checkpoint_and_restore(self, git_manager, test_repo_path):
+        """Test checkpoints leave the branch and index alone and restore uncommitted work."""
+        def git(cwd, *args):
+            return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+        
+        ref = "refs/devbud/checkpoints/task-1"
+        worktree = Path(await git_manager.create_worktree(
+            repo_path=test_repo_path,
+            branch_name="checkpointed",
+            install_dependencies=False
+        ))
+        head = git(worktree, "rev-parse", "HEAD")
+        (worktree / "README.md").write_text("# Changed\n")
+        (worktree / "notes.txt").write_text("work in progress\n")
+        status = git(worktree, "status", "--porcelain")
+        
+        commit = await git_manager.checkpoint(str(worktree), ref)
+        
+        assert git(test_repo_path, "rev-parse", ref) == commit
+        assert git(worktree, "rev-parse", f"{commit}^") == head
+        assert git(worktree, "rev-parse", "HEAD") == head
+        assert git(worktree, "status", "--porcelain") == status
+        assert await git_manager.checkpoint(str(worktree), ref) is None
+        
+        # Resume on a host that lacks the task branch
+        await git_manager.remove_worktree(str(worktree))
+        git(test_repo_path, "branch", "-D", "checkpointed")
+        restored = Path(await git_manager.restore_worktree(test_repo_path, "checkpointed", commit))
+        
+        assert (restored / "README.md").read_text() == "# Changed\n"
+        assert (restored / "notes.txt").read_text() == "work in progress\n"
+        assert git(restored, "rev-parse", "HEAD") == head
+        assert git(restored, "status", "--porcelain") == status
\ No newline at end of file
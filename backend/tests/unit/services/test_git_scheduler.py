@@ -0,0 +1,98 @@
+import pytest
+import asyncio
+import subprocess
+
+
+@pytest.mark.unit
+class TestGitScheduler:
+    """Test per-repository git operation scheduling."""
+    
+    @pytest.fixture
+    def scheduler(self):
+        """Create GitScheduler instance with fast retries."""
+        from app.services.git_scheduler import GitScheduler
+        return GitScheduler(max_retries=3, base_delay=0.01, max_delay=0.02)
+    
+    async def test_reads_overlap_writes_exclusive(self, scheduler, test_repo_path):
+        """Test reads run together while a write runs alone."""
+        running = []
+        peaks = {"read": 0, "write": 0}
+        
+        def operation(kind):
+            async def run():
+                running.append(kind)
+                peaks[kind] = max(peaks[kind], len(running))
+                await asyncio.sleep(0.02)
+                running.remove(kind)
+            return run
+        
+        await asyncio.gather(
+            *(scheduler.read(test_repo_path, operation("read")) for _ in range(3)),
+            *(scheduler.write(test_repo_path, operation("write")) for _ in range(3))
+        )
+        
+        assert peaks["read"] == 3
+        assert peaks["write"] == 1
+        metrics = next(iter(scheduler.metrics().values()))
+        assert metrics["reads"] == 3
+        assert metrics["writes"] == 3
+    
+    async def test_worktrees_share_repository_lock(self, scheduler, test_repo_path, tmp_path):
+        """Test a linked worktree is scheduled with its main repository."""
+        worktree = tmp_path / "linked"
+        subprocess.run(["git", "worktree", "add", "-q", "-b", "linked", str(worktree)], cwd=test_repo_path, check=True)
+        
+        assert scheduler._key(str(worktree)) == scheduler._key(test_repo_path)
+    
+    async def test_retries_lock_errors(self, scheduler, test_repo_path):
+        """Test lock contention is retried and other errors are not."""
+        attempts = []
+        
+        async def contended():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError("fatal: Unable to create '/repo/.git/index.lock': File exists.")
+            return "done"
+        
+        async def broken():
+            raise RuntimeError("fatal: not a valid object name")
+        
+        assert await scheduler.write(test_repo_path, contended) == "done"
+        with pytest.raises(RuntimeError, match="not a valid object"):
+            await scheduler.write(test_repo_path, broken)
+        
+        metrics = next(iter(scheduler.metrics().values()))
+        assert metrics["lock_retries"] == 2
+        assert metrics["lock_failures"] == 0
+    
+    async def test_parallel_worktree_creation(self, test_repo_path, tmp_path):
+        """Test concurrent worktree creation against one repository succeeds."""
+        from app.services.git_manager import GitWorktreeManager
+        
+        git_manager = GitWorktreeManager(base_path=str(tmp_path / "worktrees"))
+        paths = await asyncio.gather(*(
+            git_manager.create_worktree(test_repo_path, f"parallel-{i}", install_dependencies=False)
+            for i in range(6)
+        ))
+        
+        assert len(set(paths)) == 6
+    
+    async def test_configure_git_once(self, tmp_path, monkeypatch):
+        """Test safe.directory is added once, not on every call or boot."""
+        import app.services.git_manager as git_manager_module
+        from app.services.git_manager import GitWorktreeManager
+        
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setattr(git_manager_module, "_git_configured", False)
+        git_manager = GitWorktreeManager(base_path=str(tmp_path / "worktrees"))
+        
+        await git_manager.configure_git()
+        monkeypatch.setattr(git_manager_module, "_git_configured", False)  # a new process
+        await git_manager.configure_git()
+        
+        entries = subprocess.run(
+            ["git", "config", "--global", "--get-all", "safe.directory"],
+            capture_output=True,
+            text=True
+        ).stdout.split()
+        assert entries == ["*"]
\ No newline at end of file
@@ -0,0 +1,87 @@
+import pytest
+import subprocess
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+
+@pytest.mark.unit
+class TestMergeTrainService:
+    """Test MergeTrainService."""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        """Create a merge train service over a test worktree base."""
+        from app.services.git_manager import GitWorktreeManager
+        from app.services.merge_train import MergeTrainService
+        
+        return MergeTrainService(GitWorktreeManager(base_path=str(tmp_path / "worktrees")), verify_timeout=60)
+    
+    def repository(self, path):
+        from app.models import InstallPolicy
+        
+        default_branch = self.git(path, "branch", "--show-current")
+        return SimpleNamespace(
+            id="repo",
+            path=path,
+            default_branch=default_branch,
+            default_ref=f"refs/heads/{default_branch}",
+            install_policy=InstallPolicy.NEVER,
+            install_command=None,
+            install_timeout=None
+        )
+    
+    def task(self, path, branch, files):
+        """Commit files on a new task branch off the default branch."""
+        base = self.git(path, "rev-parse", "HEAD")
+        self.git(path, "checkout", "-q", "-b", branch)
+        for name, content in files.items():
+            (Path(path) / name).write_text(content)
+        self.git(path, "add", ".")
+        self.git(path, "commit", "-q", "-m", f"Work on {branch}")
+        self.git(path, "checkout", "-q", "-")
+        return SimpleNamespace(id=uuid.uuid4(), branch_name=branch, base_commit=base, result_tree=None)
+    
+    def git(self, path, *args):
+        return subprocess.run(
+            ["git", *args], cwd=path, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    
+    async def test_conflicting_task_is_left_out(self, service, test_repo_path):
+        """Test a task conflicting with the train so far is skipped and the rest merge."""
+        tasks = [
+            self.task(test_repo_path, "task-a", {"README.md": "A"}),
+            self.task(test_repo_path, "task-b", {"README.md": "B"}),
+            self.task(test_repo_path, "task-c", {"c.txt": "c"}),
+        ]
+        
+        report = await service.run(self.repository(test_repo_path), tasks, "train")
+        
+        assert [car.status for car in report.cars] == ["merged", "conflicted", "merged"]
+        assert report.cars[1].conflicts == ["README.md"]
+        assert self.git(test_repo_path, "rev-parse", "train") == report.head_commit
+        assert self.git(test_repo_path, "show", "train:README.md") == "A"
+        assert self.git(test_repo_path, "show", "train:c.txt") == "c"
+        # The scratch worktree is gone
+        assert len(self.git(test_repo_path, "worktree", "list").splitlines()) == 1
+    
+    async def test_bisect_removes_task_breaking_verification(self, service, test_repo_path):
+        """Test the task that breaks verification is found, dropped and the train rebuilt."""
+        tasks = [
+            self.task(test_repo_path, "task-a", {"a.txt": "a"}),
+            self.task(test_repo_path, "task-b", {"broken.txt": "b"}),
+            self.task(test_repo_path, "task-c", {"c.txt": "c"}),
+        ]
+        
+        report = await service.run(
+            self.repository(test_repo_path), tasks, "train", verify_command="test ! -f broken.txt"
+        )
+        
+        assert [car.status for car in report.cars] == ["merged", "failed_verification", "merged"]
+        assert report.baseline_passed is True
+        files = self.git(test_repo_path, "ls-tree", "--name-only", "train").split()
+        assert "a.txt" in files and "c.txt" in files
+        assert "broken.txt" not in files
+        # Each distinct tree is verified once
+        trees = [run.tree for run in report.verifications]
+        assert len(trees) == len(set(trees))
\ No newline at end of file
@@ -0,0 +1,140 @@
+import pytest
+import json
+import os
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+
+@pytest.mark.unit
+class TestPythonEnvBuilder:
+    """Test PythonEnvBuilder service."""
+    
+    @pytest.fixture
+    def builder(self, tmp_path):
+        """Create PythonEnvBuilder instance backed by a test cache."""
+        from app.services.dependency_cache import DependencyCache
+        from app.services.python_env import PythonEnvBuilder
+        
+        cache = DependencyCache(base_path=str(tmp_path / "cache"), link_mode="hardlink")
+        return PythonEnvBuilder(dependency_cache=cache, interpreter="python3")
+    
+    @staticmethod
+    async def fake_run(command, cwd=None, env=None, timeout=None, on_output=None):
+        """Simulate venv creation and pip installs without touching the network."""
+        if " -m venv " in command:
+            venv_path = Path(command.split(" -m venv ", 1)[1])
+            (venv_path / "bin").mkdir(parents=True)
+            (venv_path / "pyvenv.cfg").write_text("home = /usr/bin\n")
+            (venv_path / "bin" / "pip").write_text(f"#!{venv_path}/bin/python\n")
+            return ""
+        
+        site_packages = Path(env["VIRTUAL_ENV"]) / "lib" / "site-packages"
+        site_packages.mkdir(parents=True, exist_ok=True)
+        requirements = (Path(cwd) / "requirements.txt").read_text().split()
+        if "--dry-run" in command:
+            return json.dumps({"install": [{"metadata": {"name": name}} for name in requirements]})
+        if command.startswith("pip list"):
+            return json.dumps([{"name": path.name} for path in site_packages.iterdir()])
+        if command.startswith("pip uninstall"):
+            for name in command.split()[3:]:
+                (site_packages / name).unlink()
+            return ""
+        for requirement in requirements:
+            (site_packages / requirement).write_text("")
+        return ""
+    
+    def make_worktree(self, tmp_path, name, requirements):
+        worktree = tmp_path / name
+        worktree.mkdir()
+        (worktree / "requirements.txt").write_text(requirements)
+        return worktree
+    
+    async def test_build_without_cache(self, tmp_path):
+        """Test an isolated venv is created and dependencies installed into it."""
+        from app.services.python_env import PythonEnvBuilder
+        
+        builder = PythonEnvBuilder(interpreter="python3")
+        worktree = self.make_worktree(tmp_path, "wt", "requests")
+        
+        with patch.object(builder, "_run_command", side_effect=self.fake_run) as mock_run:
+            venv_path = await builder.build(str(worktree), "requirements.txt", "pip install -r requirements.txt")
+        
+        assert venv_path == str(worktree / ".venv")
+        assert (worktree / ".venv" / "lib" / "site-packages" / "requests").exists()
+        install_env = mock_run.call_args_list[-1].kwargs["env"]
+        assert install_env["VIRTUAL_ENV"] == venv_path
+        assert install_env["PATH"].startswith(f"{venv_path}/bin")
+    
+    async def test_warm_start_clones_cached_env(self, builder, tmp_path):
+        """Test a second worktree with the same requirements skips the install."""
+        first = self.make_worktree(tmp_path, "first", "requests")
+        second = self.make_worktree(tmp_path, "second", "requests")
+        
+        with patch.object(builder, "_run_command", side_effect=self.fake_run) as mock_run:
+            await builder.build(str(first), "requirements.txt", "pip install -r requirements.txt")
+            calls_after_first = mock_run.call_count
+            await builder.build(str(second), "requirements.txt", "pip install -r requirements.txt")
+        
+        assert mock_run.call_count == calls_after_first
+        assert (second / ".venv" / "lib" / "site-packages" / "requests").exists()
+        assert (second / ".venv" / "bin" / "pip").read_text() == f"#!{second}/.venv/bin/python\n"
+        # Relocation must not leak into the cached copy or the original worktree
+        assert (first / ".venv" / "bin" / "pip").read_text() == f"#!{first}/.venv/bin/python\n"
+    
+    async def test_changed_requirements_install_delta_on_base(self, builder, tmp_path):
+        """Test a cache miss clones the latest base env before installing."""
+        first = self.make_worktree(tmp_path, "first", "requests")
+        second = self.make_worktree(tmp_path, "second", "requests flask")
+        
+        with patch.object(builder, "_run_command", side_effect=self.fake_run) as mock_run:
+            await builder.build(str(first), "requirements.txt", "pip install -r requirements.txt")
+            mock_run.reset_mock()
+            await builder.build(str(second), "requirements.txt", "pip install -r requirements.txt")
+        
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert commands[0] == "pip install -r requirements.txt"
+        assert not any(" -m venv " in command or command.startswith("pip uninstall") for command in commands)
+        assert (second / ".venv" / "lib" / "site-packages" / "flask").exists()
+    
+    async def test_base_env_packages_not_required_are_removed(self, builder, tmp_path):
+        """Test an env cloned from a base with other requirements ends up with exactly its own packages."""
+        first = self.make_worktree(tmp_path, "first", "requests flask")
+        second = self.make_worktree(tmp_path, "second", "requests Django")
+        
+        with patch.object(builder, "_run_command", side_effect=self.fake_run) as mock_run:
+            await builder.build(str(first), "requirements.txt", "pip install -r requirements.txt")
+            mock_run.reset_mock()
+            await builder.build(str(second), "requirements.txt", "pip install -r requirements.txt")
+        
+        assert mock_run.call_args_list[-1].args[0] == "pip uninstall --yes flask"
+        assert sorted(p.name for p in (second / ".venv" / "lib" / "site-packages").iterdir()) == ["Django", "requests"]
+        # The base environment in the cache is untouched
+        assert (first / ".venv" / "lib" / "site-packages" / "flask").exists()
+    
+    async def test_venv_excluded_from_git(self, tmp_path, test_repo_path):
+        """Test the venv directory is added to the repository's info/exclude."""
+        from app.services.python_env import PythonEnvBuilder
+        
+        worktree = tmp_path / "linked"
+        subprocess.run(
+            ["git", "worktree", "add", "-b", "venv-test", str(worktree)],
+            cwd=test_repo_path,
+            check=True
+        )
+        
+        PythonEnvBuilder._exclude_from_git(worktree)
+        PythonEnvBuilder._exclude_from_git(worktree)
+        
+        exclude = Path(test_repo_path) / ".git" / "info" / "exclude"
+        assert exclude.read_text().splitlines().count("/.venv/") == 1
+        
+        (worktree / ".venv").mkdir()
+        (worktree / ".venv" / "marker").write_text("")
+        status = subprocess.run(
+            ["git", "status", "--porcelain"],
+            cwd=worktree,
+            capture_output=True,
+            text=True
+        )
+        assert ".venv" not in status.stdout
\ No newline at end of file
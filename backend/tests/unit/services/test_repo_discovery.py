@@ -0,0 +1,59 @@
+import pytest
+import subprocess
+from pathlib import Path
+
+
+@pytest.mark.unit
+class TestRepositoryDiscovery:
+    """Test RepositoryDiscovery service."""
+    
+    @pytest.fixture
+    def discovery(self):
+        from app.services.repo_discovery import RepositoryDiscovery
+        return RepositoryDiscovery(max_concurrency=4)
+    
+    def init(self, path, branch="main"):
+        path.mkdir(parents=True)
+        subprocess.run(["git", "init", "-q", "-b", branch], cwd=path, check=True)
+        return path
+    
+    async def discover(self, discovery, root, max_depth):
+        return {
+            str(Path(found.path).relative_to(root)): found
+            async for found in discovery.discover(str(root), max_depth)
+        }
+    
+    async def test_discovers_repositories(self, discovery, tmp_path, test_repo_path):
+        """Test checkouts and bare mirrors are found with their default branches."""
+        root = tmp_path / "src"
+        self.init(root / "app", branch="develop")
+        self.init(root / "team" / "service")
+        self.init(root / "node_modules" / "dependency")
+        (root / "broken" / ".git").mkdir(parents=True)
+        subprocess.run(
+            ["git", "clone", "-q", "--bare", test_repo_path, str(root / "mirror.git")],
+            check=True
+        )
+        subprocess.run(
+            ["git", "symbolic-ref", "refs/remotes/origin/HEAD", "refs/remotes/origin/trunk"],
+            cwd=root / "mirror.git", check=True
+        )
+        
+        found = await self.discover(discovery, root, max_depth=3)
+        
+        assert set(found) == {"app", "team/service", "broken", "mirror.git"}
+        assert found["app"].default_branch == "develop"
+        assert found["team/service"].default_branch == "main"
+        assert found["mirror.git"].is_bare
+        assert found["mirror.git"].name == "mirror"
+        assert found["mirror.git"].default_branch == "trunk"
+        assert found["broken"].error
+        assert not found["app"].error
+    
+    async def test_respects_max_depth(self, discovery, tmp_path):
+        """Test repositories deeper than max_depth are not visited."""
+        self.init(tmp_path / "shallow")
+        self.init(tmp_path / "a" / "b" / "deep")
+        
+        assert set(await self.discover(discovery, tmp_path, max_depth=1)) == {"shallow"}
+        assert set(await self.discover(discovery, tmp_path, max_depth=3)) == {"shallow", "a/b/deep"}
\ No newline at end of file
@@ -0,0 +1,105 @@
+import pytest
+import subprocess
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+
+@pytest.mark.unit
+class TestRepositoryMaintenanceService:
+    """Test RepositoryMaintenanceService."""
+    
+    @pytest.fixture
+    def maintenance(self, tmp_path):
+        """Create a maintenance service over a test worktree base."""
+        from app.services.git_manager import GitWorktreeManager
+        from app.services.repo_maintenance import RepositoryMaintenanceService
+        
+        git_manager = GitWorktreeManager(base_path=str(tmp_path / "worktrees"))
+        return RepositoryMaintenanceService(git_manager, interval_seconds=3600, idle_seconds=60)
+    
+    def repository(self, path, policy=None):
+        from app.models import BranchPrunePolicy
+        
+        default_branch = subprocess.run(
+            ["git", "branch", "--show-current"], cwd=path, capture_output=True, text=True
+        ).stdout.strip()
+        return SimpleNamespace(
+            id="repo",
+            name="test_repo",
+            path=path,
+            default_branch=default_branch,
+            remote_url=None,
+            default_ref=f"refs/heads/{default_branch}",
+            branch_prune_policy=policy or BranchPrunePolicy.MERGED
+        )
+    
+    def db(self, task_branches):
+        """Fake session whose task query returns the given branch names."""
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=task_branches)))
+        ))
+        db.commit = AsyncMock()
+        return db
+    
+    def branches(self, path):
+        output = subprocess.run(
+            ["git", "for-each-ref", "--format=%(refname:short)", "refs/heads"],
+            cwd=path, capture_output=True, text=True, check=True
+        ).stdout
+        return set(output.split())
+    
+    def git(self, path, *args):
+        subprocess.run(["git", *args], cwd=path, check=True, capture_output=True)
+    
+    async def test_run_packs_objects_and_records_timings(self, maintenance, test_repo_path):
+        """Test a run packs loose objects, writes the commit-graph and midx, and measures both sides."""
+        record = await maintenance.run(self.db([]), self.repository(test_repo_path))
+        
+        objects = Path(test_repo_path) / ".git" / "objects"
+        assert record.status == "succeeded", record.error_message
+        assert [task["task"] for task in record.tasks] == [
+            "loose-objects", "incremental-repack", "commit-graph", "pack-refs"
+        ]
+        assert record.before["loose_objects"] > 0
+        assert record.before["packs"] == 0
+        assert record.after["packs"] >= 1
+        assert set(record.before["timings"]) == {"worktree_list", "rev_parse", "for_each_ref"}
+        assert (objects / "pack" / "multi-pack-index").exists()
+        assert (objects / "info" / "commit-graph").exists() or (objects / "info" / "commit-graphs").exists()
+    
+    async def test_prune_merged_task_branches(self, maintenance, test_repo_path, tmp_path):
+        """Test only merged branches of finished tasks without a worktree are deleted."""
+        repository = self.repository(test_repo_path)
+        self.git(test_repo_path, "branch", "task-merged")
+        self.git(test_repo_path, "checkout", "-q", "-b", "task-unmerged")
+        self.git(test_repo_path, "commit", "-q", "--allow-empty", "-m", "unmerged work")
+        self.git(test_repo_path, "checkout", "-q", repository.default_branch)
+        self.git(test_repo_path, "branch", "user-branch")
+        self.git(test_repo_path, "worktree", "add", "-q", str(tmp_path / "checked-out"), "-b", "task-checked-out")
+        
+        pruned = await maintenance.prune_branches(
+            self.db(["task-merged", "task-unmerged", "task-checked-out", "task-missing"]),
+            repository
+        )
+        
+        assert pruned == ["task-merged"]
+        assert self.branches(test_repo_path) == {
+            repository.default_branch, "task-unmerged", "task-checked-out", "user-branch"
+        }
+    
+    async def test_prune_policies(self, maintenance, test_repo_path):
+        """Test the finished policy also deletes unmerged task branches and never deletes nothing."""
+        from app.models import BranchPrunePolicy
+        
+        self.git(test_repo_path, "checkout", "-q", "-b", "task-unmerged")
+        self.git(test_repo_path, "commit", "-q", "--allow-empty", "-m", "unmerged work")
+        self.git(test_repo_path, "checkout", "-q", "-")
+        
+        never = self.repository(test_repo_path, BranchPrunePolicy.NEVER)
+        assert await maintenance.prune_branches(self.db(["task-unmerged"]), never) == []
+        
+        finished = self.repository(test_repo_path, BranchPrunePolicy.FINISHED)
+        assert await maintenance.prune_branches(self.db(["task-unmerged"]), finished) == ["task-unmerged"]
+        assert "task-unmerged" not in self.branches(test_repo_path)
\ No newline at end of file
@@ -0,0 +1,61 @@
+import pytest
+import subprocess
+from unittest.mock import patch
+
+
+@pytest.mark.unit
+class TestRepositoryMetadataCache:
+    """Test RepositoryMetadataCache service."""
+    
+    @pytest.fixture
+    def cache(self):
+        """Create a cache that never rechecks the working tree on its own."""
+        from app.services.repo_metadata import RepositoryMetadataCache
+        return RepositoryMetadataCache(dirty_ttl=3600)
+    
+    async def test_collects_metadata(self, cache, test_repo_path):
+        """Test HEAD, branches and worktrees are reported."""
+        metadata = await cache.get(test_repo_path)
+        
+        assert metadata.head_branch in ["main", "master"]
+        assert metadata.branches[metadata.head_branch] == metadata.head_commit
+        assert metadata.worktrees[0]["path"] == test_repo_path
+        assert metadata.is_dirty is False
+    
+    async def test_unchanged_repository_served_from_cache(self, cache, test_repo_path):
+        """Test no git process is spawned while the repository is unchanged."""
+        first = await cache.get(test_repo_path)
+        
+        with patch("app.services.repo_metadata.run_shell") as mock_run:
+            second = await cache.get(test_repo_path)
+        
+        assert second is first
+        mock_run.assert_not_called()
+    
+    async def test_invalidated_by_ref_changes(self, cache, test_repo_path):
+        """Test new commits and branches invalidate the cached entry."""
+        first = await cache.get(test_repo_path)
+        
+        subprocess.run(["git", "checkout", "-q", "-b", "feature/cache"], cwd=test_repo_path, check=True)
+        subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "next"], cwd=test_repo_path, check=True)
+        
+        second = await cache.get(test_repo_path)
+        assert second.head_branch == "feature/cache"
+        assert second.head_commit != first.head_commit
+        assert "feature/cache" in second.branches
+    
+    async def test_dirty_state_rechecked_after_ttl(self, cache, test_repo_path):
+        """Test working tree changes show up once the dirty TTL has passed."""
+        from pathlib import Path
+        
+        await cache.get(test_repo_path)
+        (Path(test_repo_path) / "README.md").write_text("changed\n")
+        
+        assert (await cache.get(test_repo_path)).is_dirty is False
+        
+        cache.dirty_ttl = 0
+        assert (await cache.get(test_repo_path)).is_dirty is True
+    
+    async def test_not_a_repository(self, cache, tmp_path):
+        """Test paths that are not git repositories have no metadata."""
+        assert await cache.get(str(tmp_path)) is None
\ No newline at end of file
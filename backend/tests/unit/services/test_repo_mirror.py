@@ -0,0 +1,68 @@
+import pytest
+import subprocess
+from pathlib import Path
+
+
+@pytest.mark.unit
+class TestRepositoryMirrorManager:
+    """Test RepositoryMirrorManager service."""
+    
+    @pytest.fixture
+    def mirrors(self, tmp_path):
+        """Create RepositoryMirrorManager instance with test path."""
+        from app.services.repo_mirror import RepositoryMirrorManager
+        return RepositoryMirrorManager(base_path=str(tmp_path / "mirrors"))
+    
+    def rev_parse(self, path, rev):
+        return subprocess.run(
+            ["git", "rev-parse", rev], cwd=path, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    
+    async def test_clone_and_incremental_fetch(self, mirrors, test_repo_path):
+        """Test the first call clones a bare mirror and later calls fetch new commits."""
+        remote_url = f"file://{test_repo_path}"
+        branch = subprocess.run(
+            ["git", "branch", "--show-current"], cwd=test_repo_path, capture_output=True, text=True
+        ).stdout.strip()
+        
+        mirror = await mirrors.ensure(remote_url)
+        
+        assert mirror == mirrors.mirror_path(remote_url)
+        assert self.rev_parse(mirror, "--is-bare-repository") == "true"
+        assert await mirrors.default_branch(remote_url) == branch
+        
+        subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "upstream"], cwd=test_repo_path, check=True)
+        await mirrors.ensure(remote_url)
+        
+        assert self.rev_parse(mirror, f"origin/{branch}") == self.rev_parse(test_repo_path, "HEAD")
+    
+    async def test_worktrees_from_mirror(self, mirrors, test_repo_path, tmp_path):
+        """Test task worktrees branch off the mirror and survive fetches with --prune."""
+        from app.services.git_manager import GitWorktreeManager
+        
+        remote_url = test_repo_path  # plain local paths work as remotes too
+        branch = subprocess.run(
+            ["git", "branch", "--show-current"], cwd=test_repo_path, capture_output=True, text=True
+        ).stdout.strip()
+        mirror = await mirrors.ensure(remote_url)
+        git_manager = GitWorktreeManager(base_path=str(tmp_path / "worktrees"))
+        
+        worktree = await git_manager.create_worktree(
+            repo_path=str(mirror),
+            branch_name="task-branch",
+            base_branch=f"origin/{branch}",
+            install_dependencies=False
+        )
+        await mirrors.fetch(remote_url)
+        
+        assert (Path(worktree) / "README.md").exists()
+        assert self.rev_parse(mirror, "task-branch") == self.rev_parse(test_repo_path, "HEAD")
+    
+    async def test_failed_clone_leaves_nothing_behind(self, mirrors, tmp_path):
+        """Test an unreachable remote raises and leaves no partial mirror."""
+        remote_url = f"file://{tmp_path / 'missing'}"
+        
+        with pytest.raises(RuntimeError):
+            await mirrors.ensure(remote_url)
+        
+        assert list(mirrors.base_path.iterdir()) == []
\ No newline at end of file
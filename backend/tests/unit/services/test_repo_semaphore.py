@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from fakeredis import aioredis
+
+
+@pytest.mark.unit
+class TestRepositorySemaphore:
+    """Test the per-repository task semaphore."""
+    
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        client = aioredis.FakeRedis()
+        monkeypatch.setattr("app.services.repo_semaphore.get_redis", lambda: client)
+        return client
+    
+    async def test_limit_is_enforced_across_workers(self, redis):
+        """Test holders beyond the limit are refused until a slot is released."""
+        from app.services.repo_semaphore import RepositorySemaphore, SlotAlreadyHeld
+        
+        # Two workers, each with its own semaphore object for the same repository
+        first, second = RepositorySemaphore("repo", limit=2), RepositorySemaphore("repo", limit=2)
+        
+        assert await first.acquire("task-1")
+        assert await second.acquire("task-2")
+        assert not await second.acquire("task-3")
+        # A task dispatched twice never gets a second slot
+        with pytest.raises(SlotAlreadyHeld):
+            await second.acquire("task-1")
+        assert await redis.zcard("devbud:repo-slots:repo") == 2
+        
+        await first.release("task-1")
+        await first.release("task-1")
+        assert await second.acquire("task-3")
+        
+        await second.release("task-2")
+        await second.release("task-3")
+        assert await redis.zcard("devbud:repo-slots:repo") == 0
+    
+    async def test_lease_is_renewed_while_held(self, redis):
+        """Test a held slot outlives its lease and blocks others until released."""
+        from app.services.repo_semaphore import RepositorySemaphore
+        
+        holder = RepositorySemaphore("repo", limit=1, lease_seconds=0.3)
+        other = RepositorySemaphore("repo", limit=1, lease_seconds=0.3)
+        assert await holder.acquire("task-1")
+        
+        await asyncio.sleep(0.8)
+        
+        assert not await other.acquire("task-2")
+        await holder.release("task-1")
+        assert await other.acquire("task-2")
+        await other.release("task-2")
+    
+    async def test_slot_of_dead_worker_expires(self, redis):
+        """Test a slot no longer renewed frees up once its lease expires."""
+        from app.services.repo_semaphore import RepositorySemaphore
+        
+        crashed = RepositorySemaphore("repo", limit=1, lease_seconds=0.3)
+        other = RepositorySemaphore("repo", limit=1, lease_seconds=0.3)
+        assert await crashed.acquire("task-1")
+        # The worker dies: its lease stops being renewed and is never released
+        crashed._renewers.pop("task-1").cancel()
+        assert not await other.acquire("task-2")
+        
+        await asyncio.sleep(0.4)
+        
+        assert await other.acquire("task-2")
+        assert await redis.zrange("devbud:repo-slots:repo", 0, -1) == [b"task-2"]
+        await other.release("task-2")
+    
+    async def test_without_redis_tasks_are_let_through(self, monkeypatch):
+        """Test an unreachable Redis never blocks tasks."""
+        from app.services.repo_semaphore import RepositorySemaphore
+        
+        def unreachable():
+            raise ConnectionError("Redis is down")
+        
+        monkeypatch.setattr("app.services.repo_semaphore.get_redis", unreachable)
+        semaphore = RepositorySemaphore("repo", limit=1)
+        
+        assert await semaphore.acquire("task-1")
+        assert await semaphore.acquire("task-2")
+        await semaphore.release("task-1")
\ No newline at end of file
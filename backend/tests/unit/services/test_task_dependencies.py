@@ -0,0 +1,75 @@
+import pytest
+import subprocess
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+
+@pytest.mark.unit
+class TestTaskDependencies:
+    """Test task dependencies."""
+    
+    def git(self, path, *args):
+        return subprocess.run(
+            ["git", *args], cwd=path, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    
+    def task(self, depends_on=None):
+        return SimpleNamespace(id=uuid.uuid4(), depends_on=[str(parent.id) for parent in depends_on or []])
+    
+    def test_failure_cancels_dependents_transitively(self):
+        """Test a failed dependency cancels the whole chain below it, and only finished ones release tasks."""
+        from app.models import TaskStatus
+        from app.services.task_dependencies import resolve_dependencies
+        
+        done, running, failed = self.task(), self.task(), self.task()
+        ready = self.task([done])
+        blocked = self.task([done, running])
+        child = self.task([failed])
+        grandchild = self.task([child, done])
+        statuses = {
+            done.id: TaskStatus.COMPLETED,
+            running.id: TaskStatus.RUNNING,
+            failed.id: TaskStatus.FAILED,
+            child.id: TaskStatus.PENDING,
+        }
+        
+        ready_tasks, doomed = resolve_dependencies([grandchild, ready, blocked, child], statuses)
+        
+        assert ready_tasks == [ready]
+        assert {task.id for task, _ in doomed} == {child.id, grandchild.id}
+        assert dict((task.id, reason) for task, reason in doomed)[child.id] == f"Dependency {failed.id} failed"
+    
+    async def test_dependent_worktree_starts_from_parent_results(self, test_repo_path, tmp_path):
+        """Test a task depending on two others starts from both results, including uncommitted work."""
+        from app.services.git_manager import GitWorktreeManager
+        from app.services.task_dependencies import merge_dependencies, result_commit
+        
+        git_manager = GitWorktreeManager(base_path=str(tmp_path / "worktrees"))
+        base = self.git(test_repo_path, "rev-parse", "HEAD")
+        
+        # The schema task committed its work; the api task left it uncommitted
+        schema_path = await git_manager.create_worktree(test_repo_path, "schema", install_dependencies=False)
+        (Path(schema_path) / "schema.sql").write_text("create table t;")
+        self.git(schema_path, "add", ".")
+        self.git(schema_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "schema")
+        api_path = await git_manager.create_worktree(test_repo_path, "api", install_dependencies=False)
+        (Path(api_path) / "api.py").write_text("app = None")
+        
+        parents = [
+            SimpleNamespace(branch_name="schema", base_commit=base, result_tree=await git_manager.snapshot_tree(schema_path)),
+            SimpleNamespace(branch_name="api", base_commit=base, result_tree=await git_manager.snapshot_tree(api_path)),
+        ]
+        commits = [await result_commit(test_repo_path, parent) for parent in parents]
+        
+        # Committed work is used as is; uncommitted work gets a commit on top of the branch
+        assert commits[0] == self.git(test_repo_path, "rev-parse", "schema")
+        assert self.git(test_repo_path, "rev-parse", f"{commits[1]}^") == self.git(test_repo_path, "rev-parse", "api")
+        
+        tests_path = await git_manager.create_worktree(
+            test_repo_path, "tests", base_branch=commits[0], install_dependencies=False
+        )
+        await merge_dependencies(tests_path, commits[1:])
+        
+        assert (Path(tests_path) / "schema.sql").read_text() == "create table t;"
+        assert (Path(tests_path) / "api.py").read_text() == "app = None"
\ No newline at end of file
@@ -0,0 +1,76 @@
+import pytest
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+
+@pytest.mark.unit
+class TestTaskDiffService:
+    """Test task diffstats and per-file diffs."""
+    
+    @pytest.fixture
+    def diff_service(self):
+        """Create TaskDiffService instance with a small per-file cap."""
+        from app.services.task_diff import TaskDiffService
+        return TaskDiffService(max_file_bytes=2048, cache_bytes=1024 * 1024)
+    
+    @pytest.fixture
+    async def changed_repo(self, test_repo_path):
+        """Make uncommitted text, binary and large changes; return (repo, base, tree)."""
+        from app.services.git_manager import GitWorktreeManager
+        
+        repo = Path(test_repo_path)
+        base = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True, text=True
+        ).stdout.strip()
+        
+        (repo / "README.md").write_text("# Test Repository\nMore docs\n")
+        (repo / "new file.txt").write_text("hello\n")
+        (repo / "image.bin").write_bytes(b"\x00\x01\x02" * 100)
+        (repo / "large.txt").write_text("".join(f"line {i}\n" for i in range(1000)))
+        (repo / "node_modules").mkdir()
+        (repo / "node_modules" / "dep.js").write_text("ignored\n")
+        
+        tree = await GitWorktreeManager().snapshot_tree(str(repo))
+        return str(repo), base, tree
+    
+    async def test_snapshot_leaves_index_untouched(self, changed_repo):
+        """Test snapshotting uncommitted changes does not stage them."""
+        repo, _, tree = changed_repo
+        
+        status = subprocess.run(
+            ["git", "status", "--porcelain"], cwd=repo, capture_output=True, text=True
+        ).stdout
+        assert " M README.md" in status
+        assert "?? image.bin" in status
+        assert len(tree) == 40
+    
+    async def test_diffstat(self, diff_service, changed_repo):
+        """Test the diffstat counts lines, flags binaries and skips dependency directories."""
+        stat = await diff_service.diffstat(*changed_repo)
+        files = {f["path"]: f for f in stat["files"]}
+        
+        assert set(files) == {"README.md", "image.bin", "large.txt", "new file.txt"}
+        assert files["README.md"]["additions"] == 2
+        assert files["README.md"]["deletions"] == 1
+        assert files["image.bin"]["binary"] is True
+        assert stat["files_changed"] == 4
+    
+    async def test_file_diffs_cached_and_capped(self, diff_service, changed_repo):
+        """Test a page is generated in one git run, capped, and then served from cache."""
+        repo, base, tree = changed_repo
+        stat = await diff_service.diffstat(repo, base, tree)
+        
+        diffs = {d.path: d for d in await diff_service.file_diffs(repo, base, tree, stat["files"])}
+        
+        assert "+More docs" in diffs["README.md"].patch
+        assert "+hello" in diffs["new file.txt"].patch
+        assert diffs["image.bin"].patch is None
+        assert diffs["large.txt"].truncated is True
+        assert len(diffs["large.txt"].patch) <= 2048
+        
+        with patch("app.services.task_diff.run_shell") as mock_run:
+            again = await diff_service.file_diffs(repo, base, tree, stat["files"][:2])
+        
+        mock_run.assert_not_called()
+        assert again[0].patch == diffs[again[0].path].patch
\ No newline at end of file
@@ -0,0 +1,43 @@
+import math
+import pytest
+import uuid
+
+
+@pytest.mark.unit
+class TestDurationModel:
+    """Test the task duration model."""
+    
+    def test_learns_repositories_instruction_length_and_trends(self):
+        """Test predictions reflect each repository, longer instructions and recent tasks."""
+        from app.services.task_durations import fit_duration_model
+        
+        slow, fast = uuid.uuid4(), uuid.uuid4()
+        # Most recent first: duration grows with the length of the instructions
+        samples = []
+        for _ in range(10):
+            samples += [(slow, 100, 1200.0), (slow, 400, 2400.0), (fast, 100, 300.0), (fast, 400, 600.0)]
+        
+        model = fit_duration_model(samples, half_life=20)
+        
+        assert model.slope == pytest.approx(0.5)
+        assert model.predict(slow, 100) > model.predict(fast, 100)
+        assert model.predict(fast, 400) == pytest.approx(2 * model.predict(fast, 100))
+        # Unknown repositories get the average of all of them
+        assert model.predict(fast, 100) < model.predict(uuid.uuid4(), 100) < model.predict(slow, 100)
+        
+        # The same repository slowed down recently: newer tasks weigh more than older ones
+        history = [(fast, 100, 900.0)] * 5 + [(fast, 100, 300.0)] * 20
+        recent = fit_duration_model(history, half_life=2).predict(fast, 100)
+        overall = fit_duration_model(history, half_life=math.inf).predict(fast, 100)
+        assert overall == pytest.approx(900.0 ** 0.2 * 300.0 ** 0.8)
+        assert recent > 1.8 * overall
+    
+    def test_short_history_leans_on_other_repositories(self):
+        """Test a repository with one task is pulled towards the rest, and no history gives the default."""
+        from app.services.task_durations import fit_duration_model
+        
+        known, new = uuid.uuid4(), uuid.uuid4()
+        model = fit_duration_model([(known, 100, 600.0)] * 30 + [(new, 100, 6000.0)])
+        
+        assert 600.0 < model.predict(new, 100) < 3000.0
+        assert fit_duration_model([], default=900.0).predict(new, 100) == 900.0
\ No newline at end of file
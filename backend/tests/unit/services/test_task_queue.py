@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from fakeredis import aioredis
+
+
+@pytest.mark.unit
+class TestExecuteTask:
+    """Test the worker side of task execution."""
+    
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        client = aioredis.FakeRedis()
+        monkeypatch.setattr("app.services.repo_semaphore.get_redis", lambda: client)
+        # Progress broadcasts go to the same fake server
+        monkeypatch.setattr("app.services.websocket_manager.get_redis", lambda: client)
+        return client
+    
+    async def test_task_redispatched_while_starting_runs_once(self, redis, monkeypatch):
+        """Test a task dispatched again during its setup is claimed and the duplicate dropped."""
+        from app.core.config import settings
+        from app.models import TaskStatus
+        from app.services import task_queue
+        from app.services.repo_semaphore import RepositorySemaphore
+        
+        # Claims are refreshed every 0.1s
+        monkeypatch.setattr(settings, "TASK_DISPATCH_TIMEOUT", 0.3)
+        task_id, repository_id = str(uuid.uuid4()), str(uuid.uuid4())
+        slots = f"devbud:repo-slots:{repository_id}"
+        task = Mock(
+            id=task_id,
+            status=TaskStatus.PENDING,
+            sparse_patterns=None,
+            depends_on=None,
+            checkpoint_commit=None,
+            dispatched_at=None,
+            output="",
+            append_output=AsyncMock()
+        )
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(scalar_one_or_none=MagicMock(return_value=task)))
+        db.get = AsyncMock(return_value=SimpleNamespace(remote_url=None, sparse_patterns=None))
+        db.commit = AsyncMock()
+        
+        @asynccontextmanager
+        async def session():
+            yield db
+        
+        started, finish = asyncio.Event(), asyncio.Event()
+        
+        async def create_worktree(**kwargs):
+            started.set()
+            await finish.wait()
+            raise RuntimeError("checkout failed")
+        
+        git_manager = Mock(create_worktree=AsyncMock(side_effect=create_worktree))
+        args = (task_id, repository_id, "/repo", "feature", "Do it")
+        with patch.object(task_queue, "get_db_session", session), \
+                patch.object(task_queue, "GitWorktreeManager", return_value=git_manager), \
+                patch.object(task_queue, "ClaudeCodeRunner", return_value=Mock(prepare=AsyncMock())), \
+                patch.object(task_queue, "get_dependency_cache"), \
+                patch.object(task_queue, "get_repository_semaphore", lambda repository_id, repository: RepositorySemaphore(repository_id, limit=2)), \
+                patch.object(task_queue, "execute_task") as mock_execute, \
+                patch.object(task_queue, "dispatch_tasks"):
+            first = asyncio.create_task(task_queue._execute_task_async(*args))
+            await started.wait()
+            
+            # Claimed before the setup started, and kept fresh while it lasts
+            assert task.dispatched_at > datetime.utcnow() - timedelta(seconds=1)
+            db.commit.assert_awaited()
+            await asyncio.sleep(0.35)
+            assert db.execute.await_count > 1
+            
+            # The scheduler dispatched it again: the second execution leaves it alone
+            await task_queue._execute_task_async(*args)
+            assert git_manager.create_worktree.await_count == 1
+            assert await redis.zrange(slots, 0, -1) == [task_id.encode()]
+            mock_execute.apply_async.assert_not_called()
+            
+            finish.set()
+            with pytest.raises(RuntimeError):
+                await first
+        
+        assert task.status == TaskStatus.FAILED
+        assert await redis.zcard(slots) == 0
+        # No more claim refreshes once the task stopped starting
+        refreshes = db.execute.await_count
+        await asyncio.sleep(0.25)
+        assert db.execute.await_count == refreshes
\ No newline at end of file
@@ -0,0 +1,192 @@
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+
+@pytest.mark.unit
+class TestTaskScheduler:
+    """Test weighted fair task scheduling."""
+    
+    def tasks(self, repository_id, count, priority=None, start=0):
+        from app.models import TaskPriority
+        
+        epoch = datetime(2026, 1, 1)
+        return [
+            SimpleNamespace(
+                id=uuid.uuid4(),
+                repository_id=repository_id,
+                priority=priority or TaskPriority.NORMAL,
+                created_at=epoch + timedelta(seconds=start + i),
+                dispatched_at=None,
+                depends_on=None
+            )
+            for i in range(count)
+        ]
+    
+    def test_repositories_interleave_by_weight(self):
+        """Test a heavier repository gets proportionally more of the dispatch order."""
+        from app.services.task_scheduler import fair_order
+        
+        a, b = uuid.uuid4(), uuid.uuid4()
+        # Repository a queued everything first; b must not wait behind all of it
+        waiting = self.tasks(a, 6) + self.tasks(b, 3, start=100)
+        
+        order = fair_order(waiting, weights={a: 2, b: 1}, active={})
+        
+        assert [task.repository_id for task in order] == [a, a, b, a, a, b, a, a, b]
+        # Each repository's own tasks keep their creation order
+        assert [task for task in order if task.repository_id == a] == waiting[:6]
+    
+    def test_priorities_are_strict_and_active_tasks_count(self):
+        """Test urgent tasks go first and repositories already running tasks wait their turn."""
+        from app.models import TaskPriority
+        from app.services.task_scheduler import fair_order
+        
+        a, b = uuid.uuid4(), uuid.uuid4()
+        batch = self.tasks(a, 1, TaskPriority.BATCH)
+        normal_a = self.tasks(a, 2, start=10)
+        normal_b = self.tasks(b, 2, start=20)
+        urgent = self.tasks(b, 1, TaskPriority.URGENT, start=30)
+        
+        order = fair_order(batch + normal_a + normal_b + urgent, weights={}, active={a: 2})
+        
+        assert order == urgent + normal_b + normal_a + batch
+    
+    async def test_dispatch_respects_capacity_and_repository_limits(self):
+        """Test only what can start now is dispatched, and it is committed before it is sent."""
+        from app.services.task_scheduler import TaskScheduler
+        
+        a, b = uuid.uuid4(), uuid.uuid4()
+        waiting = self.tasks(a, 3) + self.tasks(b, 3, start=100)
+        repositories = {
+            a: SimpleNamespace(id=a, path="/a", scheduling_weight=1, max_concurrent_tasks=1),
+            b: SimpleNamespace(id=b, path="/b", scheduling_weight=1, max_concurrent_tasks=None),
+        }
+        scheduler = TaskScheduler(capacity=4)
+        scheduler._load = AsyncMock(return_value=(waiting, {b: 1}, repositories))
+        
+        db = MagicMock()
+        db.commit = AsyncMock()
+        sent = []
+        
+        def send(task, repository):
+            db.commit.assert_awaited_once()
+            sent.append((task, repository.path))
+        
+        dispatched = await scheduler.dispatch(db, send)
+        
+        # Capacity 4 with one active leaves 3: a is capped at 1, b fills the rest
+        assert [task.repository_id for task in dispatched] == [a, b, b]
+        assert [path for _, path in sent] == ["/a", "/b", "/b"]
+        assert all(task.dispatched_at is not None for task in dispatched)
+        assert waiting[1].dispatched_at is None
+    
+    async def test_lost_dispatch_is_dispatched_again(self):
+        """Test a task dispatched longer ago than the timeout waits again, and a recent one does not."""
+        from app.services.task_scheduler import TaskScheduler
+        
+        a = uuid.uuid4()
+        fresh, lost, new = self.tasks(a, 3)
+        fresh.dispatched_at = datetime.utcnow() - timedelta(seconds=60)
+        lost.dispatched_at = datetime.utcnow() - timedelta(seconds=3600)
+        repository = SimpleNamespace(id=a, path="/a", scheduling_weight=1, max_concurrent_tasks=None)
+        
+        db = MagicMock()
+        db.commit = AsyncMock()
+        # Pending tasks, then active counts (only the fresh dispatch), then repositories
+        db.execute = AsyncMock(side_effect=[
+            MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[fresh, lost, new])))),
+            MagicMock(all=MagicMock(return_value=[(a, 1)])),
+            MagicMock(all=MagicMock(return_value=[repository])),
+        ])
+        sent = []
+        
+        dispatched = await TaskScheduler(capacity=4, dispatch_timeout=600).dispatch(
+            db, lambda task, repository: sent.append(task)
+        )
+        
+        assert dispatched == sent == [lost, new]
+        assert lost.dispatched_at > datetime.utcnow() - timedelta(seconds=60)
+    
+    async def test_dependencies_gate_dispatch(self):
+        """Test a task waits for its dependencies and is cancelled when one of them failed."""
+        from app.models import TaskStatus
+        from app.services.task_scheduler import TaskScheduler
+        
+        a = uuid.uuid4()
+        done, running, failed = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        ready, blocked, doomed = self.tasks(a, 3)
+        ready.depends_on = [str(done)]
+        blocked.depends_on = [str(done), str(running)]
+        doomed.depends_on = [str(failed)]
+        doomed.cancel = AsyncMock()
+        
+        scheduler = TaskScheduler(capacity=4)
+        repositories = {a: SimpleNamespace(id=a, path="/a", scheduling_weight=1, max_concurrent_tasks=None)}
+        scheduler._load = AsyncMock(return_value=([ready, blocked, doomed], {}, repositories))
+        
+        db = MagicMock()
+        db.commit = AsyncMock()
+        statuses = [(done, TaskStatus.COMPLETED), (running, TaskStatus.RUNNING), (failed, TaskStatus.FAILED)]
+        db.execute = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=statuses)))
+        
+        dispatched = await scheduler.dispatch(db, lambda task, repository: None)
+        
+        assert dispatched == [ready]
+        doomed.cancel.assert_awaited_once()
+        assert str(failed) in doomed.cancel.await_args.kwargs["reason"]
+    
+    def test_shortest_first_with_aging(self):
+        """Test short tasks go first but a long task that waited long enough is not passed over."""
+        from app.services.task_scheduler import shortest_first_order
+        
+        a = uuid.uuid4()
+        long_task, short_task, newer_short = self.tasks(a, 3)
+        long_task.created_at -= timedelta(hours=2)
+        durations = {long_task.id: 3600.0, short_task.id: 600.0, newer_short.id: 300.0}
+        now = short_task.created_at + timedelta(minutes=5)
+        
+        assert shortest_first_order([long_task, short_task, newer_short], durations, now, 86400) == [
+            newer_short, short_task, long_task
+        ]
+        # After waiting two hours with 10-minute aging, the hour-long task counts as under 5 minutes
+        assert shortest_first_order([long_task, short_task, newer_short], durations, now, 600)[:2] == [
+            newer_short, long_task
+        ]
+    
+    def test_simulated_schedule_gives_start_and_finish_times(self):
+        """Test queued tasks start as slots free up, within repository limits and after their dependencies."""
+        from app.services.task_scheduler import simulate_schedule
+        
+        a, b = uuid.uuid4(), uuid.uuid4()
+        now = datetime(2026, 1, 1, 12)
+        running = uuid.uuid4()
+        first, second = self.tasks(a, 2)
+        other = self.tasks(b, 1)[0]
+        dependent = self.tasks(b, 1, start=10)[0]
+        dependent.depends_on = [str(other.id)]
+        durations = {first.id: 600.0, second.id: 600.0, other.id: 1200.0, dependent.id: 300.0}
+        
+        forecasts = simulate_schedule(
+            queue=[first, second, other],
+            blocked=[dependent],
+            # Running for 5 of its expected 15 minutes
+            in_flight={running: (a, now - timedelta(minutes=5), 900.0)},
+            durations=durations,
+            capacity=3,
+            limits={a: 2},
+            now=now
+        )
+        
+        minutes = lambda at: (at - now).total_seconds() / 60
+        assert minutes(forecasts[running].expected_finish_at) == 10
+        assert forecasts[first.id].queue_position == 1 and minutes(forecasts[first.id].expected_start_at) == 0
+        # Repository a has two slots: its second task waits for the first of them to free up
+        assert minutes(forecasts[second.id].expected_start_at) == 10
+        assert minutes(forecasts[other.id].expected_start_at) == 10
+        # Blocked until the task it depends on finishes, although a slot frees up earlier
+        assert forecasts[dependent.id].queue_position is None
+        assert minutes(forecasts[dependent.id].expected_start_at) == 30
+        assert minutes(forecasts[dependent.id].expected_finish_at) == 35
\ No newline at end of file
@@ -0,0 +1,91 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.mark.unit
+class TestStartupPipeline:
+    """Test task startup pipeline helpers."""
+    
+    @pytest.fixture(autouse=True)
+    def mock_broadcast(self):
+        """Avoid publishing startup events during tests."""
+        with patch('app.services.task_startup.broadcast_task_event', new_callable=AsyncMock) as mock_event, \
+                patch('app.services.task_startup.broadcast_task_output', new_callable=AsyncMock):
+            yield mock_event
+    
+    async def test_stages_overlap_and_record_timings(self, mock_broadcast):
+        """Test independent stages run concurrently and are timed."""
+        from app.services.task_startup import StartupPipeline
+        
+        pipeline = StartupPipeline("task-1")
+        
+        async def stage(name):
+            async with pipeline.stage(name):
+                await asyncio.sleep(0.2)
+            return name
+        
+        started = asyncio.get_event_loop().time()
+        results = await pipeline.run_concurrently(stage("checkout"), stage("runner"))
+        elapsed = asyncio.get_event_loop().time() - started
+        
+        assert results == ["checkout", "runner"]
+        assert elapsed < 0.35
+        assert set(pipeline.timings) == {"checkout", "runner"}
+        assert all(duration >= 0.2 for duration in pipeline.timings.values())
+        statuses = [call.args[2]["status"] for call in mock_broadcast.call_args_list]
+        assert statuses.count("completed") == 2
+    
+    async def test_failed_stage_cancels_others(self):
+        """Test a failing stage cancels the stages running alongside it."""
+        from app.services.task_startup import StartupPipeline
+        
+        pipeline = StartupPipeline("task-1")
+        cleaned_up = asyncio.Event()
+        
+        async def slow_stage():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                cleaned_up.set()
+        
+        async def failing_stage():
+            async with pipeline.stage("runner"):
+                raise FileNotFoundError("claude not found")
+        
+        with pytest.raises(FileNotFoundError):
+            await pipeline.run_concurrently(slow_stage(), failing_stage())
+        
+        assert cleaned_up.is_set()
+        assert "runner" in pipeline.timings
+    
+    async def test_output_stream_batches_log_writes(self):
+        """Test streamed lines are broadcast immediately but written in batches."""
+        from app.services.task_startup import TaskOutputStream
+        
+        task = MagicMock()
+        task.append_output = AsyncMock()
+        stream = TaskOutputStream(db=MagicMock(), task=task, flush_interval=60, max_buffered_lines=3)
+        
+        for line in ["one\n", "two\n", "three\n", "four\n"]:
+            await stream.write(line)
+        
+        task.append_output.assert_awaited_once()
+        assert task.append_output.call_args.args[1] == "one\ntwo\nthree"
+        
+        await stream.flush()
+        assert task.append_output.call_args.args[1] == "four"
+    
+    async def test_run_shell_streams_output(self):
+        """Test command output is delivered line by line as it is produced."""
+        from app.services.process import run_shell
+        
+        lines = []
+        
+        async def on_output(line):
+            lines.append(line)
+        
+        stdout = await run_shell("echo one; echo two >&2; echo three", on_output=on_output)
+        
+        assert stdout == "one\nthree\n"
+        assert sorted(lines) == ["one\n", "three\n", "two\n"]
\ No newline at end of file
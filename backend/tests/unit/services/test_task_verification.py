@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+import subprocess
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+
+@pytest.mark.unit
+class TestTaskVerifier:
+    """Test TaskVerifier."""
+    
+    @pytest.fixture
+    def git_manager(self, tmp_path):
+        from app.services.git_manager import GitWorktreeManager
+        
+        return GitWorktreeManager(base_path=str(tmp_path / "worktrees"))
+    
+    def repository(self, path, command):
+        from app.models import InstallPolicy
+        
+        return SimpleNamespace(
+            id=uuid.uuid4(),
+            path=path,
+            verify_command=command,
+            verify_timeout=None,
+            install_policy=InstallPolicy.NEVER,
+            install_command=None,
+            install_timeout=None
+        )
+    
+    async def task(self, git_manager, path, branch, files):
+        """A task whose worktree off the current commit holds uncommitted files."""
+        base = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=path, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        worktree = await git_manager.create_worktree(path, branch, install_dependencies=False)
+        for name, content in files.items():
+            (Path(worktree) / name).write_text(content)
+        task = SimpleNamespace(
+            id=uuid.uuid4(),
+            base_commit=base,
+            result_tree=await git_manager.snapshot_tree(worktree),
+            verification_status=None,
+            verification=None
+        )
+        return task, worktree
+    
+    async def test_baseline_is_shared_and_identical_trees_are_reused(
+        self, git_manager, test_repo_path, tmp_path
+    ):
+        """Test the baseline runs once per base commit and a verified tree is never run again."""
+        from app.services.task_verification import TaskVerifier
+        
+        runs = tmp_path / "runs.log"
+        repository = self.repository(test_repo_path, f"echo run >> {runs}; test ! -f broken.txt")
+        verifier = TaskVerifier(git_manager, timeout=60, session_factory=None)
+        
+        good, good_worktree = await self.task(git_manager, test_repo_path, "task-a", {"a.txt": "a"})
+        await verifier.verify_task(repository, good, test_repo_path, good_worktree)
+        assert good.verification_status == "passed"
+        assert good.verification["baseline"]["passed"] is True
+        assert len(runs.read_text().splitlines()) == 2
+        
+        broken, broken_worktree = await self.task(git_manager, test_repo_path, "task-b", {"broken.txt": "b"})
+        await verifier.verify_task(repository, broken, test_repo_path, broken_worktree)
+        assert broken.verification_status == "regressed"
+        assert broken.verification["baseline"]["cached"] is True
+        assert len(runs.read_text().splitlines()) == 3
+        
+        # A result identical to an already verified tree is not run again
+        same, same_worktree = await self.task(git_manager, test_repo_path, "task-c", {"a.txt": "a"})
+        assert same.result_tree == good.result_tree
+        await verifier.verify_task(repository, same, test_repo_path, same_worktree)
+        assert same.verification_status == "passed"
+        assert same.verification["result"]["cached"] is True
+        assert len(runs.read_text().splitlines()) == 3
+        
+        # The scratch worktree used for the baseline is gone
+        assert not list((Path(git_manager.base_path) / "test_repo").glob(".verify-*"))
+    
+    async def test_concurrent_verifications_of_a_tree_share_one_run(self, git_manager):
+        """Test tasks verifying the same tree at once wait for a single run."""
+        from app.services.task_verification import TaskVerifier
+        
+        verifier = TaskVerifier(git_manager, session_factory=None)
+        calls = []
+        
+        async def run():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return False, 0.1, "boom"
+        
+        results = await asyncio.gather(*(
+            verifier.verify_tree("repo", "0" * 40, "make test", run) for _ in range(3)
+        ))
+        
+        assert len(calls) == 1
+        assert [cached for _, cached in results].count(False) == 1
+        assert all(result.passed is False for result, _ in results)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+
+@pytest.mark.unit
+class TestWorkerLoop:
+    """Test WorkerLoop."""
+    
+    @pytest.fixture
+    def worker_loop(self):
+        from app.services.worker_loop import WorkerLoop
+        
+        loop = WorkerLoop(name="test-worker-loop")
+        yield loop
+        loop.stop()
+    
+    def test_tasks_share_one_loop_and_its_state(self, worker_loop):
+        """Test successive runs execute on the same loop, so loop-bound resources survive between tasks."""
+        async def current():
+            return asyncio.get_running_loop(), threading.current_thread().name
+        
+        first, thread = worker_loop.run(current())
+        second, _ = worker_loop.run(current())
+        
+        assert first is second
+        assert thread == "test-worker-loop"
+        
+        # A background task started by one run keeps running between runs
+        async def start_ticker():
+            ticks = []
+            
+            async def tick():
+                while True:
+                    ticks.append(1)
+                    await asyncio.sleep(0.01)
+            
+            return ticks, asyncio.get_running_loop().create_task(tick())
+        
+        ticks, ticker = worker_loop.run(start_ticker())
+        count = len(ticks)
+        threading.Event().wait(0.1)
+        assert len(ticks) > count
+        worker_loop.loop.call_soon_threadsafe(ticker.cancel)
+    
+    def test_errors_propagate_and_reentry_is_refused(self, worker_loop):
+        """Test exceptions reach the caller and running from the loop thread fails instead of deadlocking."""
+        async def fail():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError, match="boom"):
+            worker_loop.run(fail())
+        
+        async def reenter():
+            async def noop():
+                return None
+            worker_loop.run(noop())
+        
+        with pytest.raises(RuntimeError, match="from the loop itself"):
+            worker_loop.run(reenter())
+    
+    def test_stop_runs_shutdown_and_restarts_on_demand(self, worker_loop):
+        """Test stopping runs the shutdown coroutine and a later run starts a fresh loop."""
+        async def current():
+            return asyncio.get_running_loop()
+        
+        first = worker_loop.run(current())
+        done = []
+        
+        async def shutdown():
+            done.append(True)
+        
+        worker_loop.stop(shutdown=shutdown())
+        
+        assert done == [True]
+        assert first.is_closed()
+        assert worker_loop.run(current()) is not first
+    
+    @pytest.mark.parametrize("pool, inline", [("solo", True), ("threads", True), ("prefork", False)])
+    def test_worker_signals_manage_the_loop_for_every_pool(self, worker_loop, pool, inline):
+        """Test a solo or thread pool worker runs the loop itself, while prefork leaves it to its pool processes."""
+        from celery.signals import worker_init, worker_shutdown
+        from app.services import task_queue
+        from app.services.git_manager import GitWorktreeManager
+        
+        worker = Mock(pool_cls=pool)
+        with patch.object(task_queue, "worker_loop", worker_loop), \
+                patch.object(task_queue, "configure_process_engine"), \
+                patch.object(task_queue, "dispose_engine", AsyncMock()) as dispose, \
+                patch.object(GitWorktreeManager, "configure_git", AsyncMock()):
+            worker_init.send(sender=worker)
+            assert worker_loop.is_running == inline
+            
+            worker_shutdown.send(sender=worker)
+            assert not worker_loop.is_running
+            assert dispose.await_count == int(inline)
\ No newline at end of file
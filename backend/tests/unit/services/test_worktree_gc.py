@@ -0,0 +1,133 @@
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+
+@pytest.mark.unit
+class TestWorktreeGarbageCollector:
+    """Test WorktreeGarbageCollector service."""
+    
+    @pytest.fixture
+    def collector(self, tmp_path):
+        """Create a collector with small quotas over a test worktree base."""
+        from app.services.git_manager import GitWorktreeManager
+        from app.services.worktree_gc import WorktreeGarbageCollector
+        
+        git_manager = GitWorktreeManager(base_path=str(tmp_path / "worktrees"))
+        return WorktreeGarbageCollector(git_manager, quota_bytes=300, repository_quota_bytes=200)
+    
+    def usage(self, name, size, age, repository_id="repo", status="completed", pinned=False):
+        from app.services.worktree_gc import WorktreeUsage
+        
+        return WorktreeUsage(
+            path=f"/worktrees/{name}",
+            size_bytes=size,
+            last_accessed_at=datetime(2026, 1, 1) - timedelta(hours=age),
+            repository_id=repository_id,
+            task_id=None if repository_id is None else name,
+            task_status=status,
+            pinned=pinned
+        )
+    
+    def report(self, worktrees):
+        from app.services.worktree_gc import GCReport
+        
+        report = GCReport(dry_run=True, quota_bytes=300, worktrees=worktrees)
+        report.total_bytes = sum(w.size_bytes for w in worktrees)
+        for usage in worktrees:
+            if usage.repository_id:
+                report.repository_bytes[usage.repository_id] = (
+                    report.repository_bytes.get(usage.repository_id, 0) + usage.size_bytes
+                )
+        return report
+    
+    def test_find_worktrees_with_nested_branch_names(self, collector, tmp_path):
+        """Test worktree roots are found even when branch names contain slashes."""
+        base = tmp_path / "worktrees"
+        for relative in ["repo/main", "repo/feature/login"]:
+            (base / relative / "src").mkdir(parents=True)
+            (base / relative / ".git").write_text("gitdir: /elsewhere\n")
+        
+        found = sorted(str(p.relative_to(base)) for p in collector.find_worktrees())
+        
+        assert found == ["repo/feature/login", "repo/main"]
+    
+    def test_evicts_least_recently_used_over_repository_quota(self, collector):
+        """Test the oldest finished worktrees go first until the repository fits its quota."""
+        worktrees = [
+            self.usage("newest", 100, age=1),
+            self.usage("middle", 100, age=2),
+            self.usage("oldest", 100, age=3),
+        ]
+        
+        victims = collector._select_victims(self.report(worktrees), {})
+        
+        assert [v.task_id for v in victims] == ["oldest"]
+        assert victims[0].reason == "repository quota"
+    
+    def test_never_evicts_active_or_pinned_worktrees(self, collector):
+        """Test running and pinned tasks keep their worktrees while orphans are always removed."""
+        worktrees = [
+            self.usage("running", 150, age=5, status="running"),
+            self.usage("pinned", 150, age=4, pinned=True),
+            self.usage("done", 50, age=1),
+            self.usage("orphan", 10, age=0, repository_id=None, status=None),
+        ]
+        
+        victims = collector._select_victims(self.report(worktrees), {})
+        
+        assert [(v.path, v.reason) for v in victims] == [
+            ("/worktrees/orphan", "orphaned"),
+            ("/worktrees/done", "repository quota"),
+        ]
+    
+    def test_repository_quota_override(self, collector):
+        """Test a repository's own quota replaces the default one."""
+        worktrees = [self.usage("a", 100, age=2), self.usage("b", 100, age=1)]
+        repositories = {"repo": SimpleNamespace(worktree_quota_bytes=1000)}
+        
+        assert collector._select_victims(self.report(worktrees), repositories) == []
+    
+    def test_global_quota_across_repositories(self, collector):
+        """Test the global quota evicts the oldest worktrees of any repository."""
+        worktrees = [
+            self.usage("a1", 150, age=1, repository_id="a"),
+            self.usage("b1", 150, age=3, repository_id="b"),
+            self.usage("c1", 150, age=2, repository_id="c"),
+        ]
+        
+        victims = collector._select_victims(self.report(worktrees), {})
+        
+        assert [(v.task_id, v.reason) for v in victims] == [("b1", "global quota")]
+    
+    async def test_keeps_worktree_of_task_still_starting(self, collector, tmp_path):
+        """Test a worktree created before its task recorded the path is not taken for an orphan."""
+        from app.models import TaskStatus
+        
+        base = tmp_path / "worktrees"
+        for relative in ["repo/feature/starting", "repo/leftover"]:
+            (base / relative).mkdir(parents=True)
+            (base / relative / ".git").write_text("gitdir: /elsewhere\n")
+        
+        repository = SimpleNamespace(id="r1", path=str(tmp_path / "repo"), is_active=True, worktree_quota_bytes=None)
+        starting = SimpleNamespace(
+            id="t1",
+            repository_id="r1",
+            branch_name="feature/starting",
+            status=TaskStatus.PENDING,
+            worktree_path=None,
+            is_pinned=False,
+            completed_at=None
+        )
+        db = MagicMock()
+        # Repositories, then tasks
+        db.execute = AsyncMock(side_effect=[
+            MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[repository])))),
+            MagicMock(scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[starting])))),
+        ])
+        
+        report = await collector.collect(db, dry_run=True)
+        
+        assert [(v.path, v.reason) for v in report.evicted] == [(str(base / "repo" / "leftover"), "orphaned")]
+        assert {w.task_status for w in report.worktrees} == {"pending", None}
\ No newline at end of file
@@ -0,0 +1,78 @@
+import pytest
+import asyncio
+import subprocess
+from pathlib import Path
+
+
+@pytest.mark.unit
+class TestWorktreeWatcher:
+    """Test WorktreeWatcher service."""
+    
+    def test_coalesce_changes(self, tmp_path):
+        """Test a batch is reduced to one change per file."""
+        from watchfiles import Change
+        from app.services.worktree_watcher import WorktreeWatcher
+        
+        (tmp_path / "new.txt").write_text("new\n")
+        (tmp_path / "saved.txt").write_text("saved\n")
+        (tmp_path / "edited.txt").write_text("edited\n")
+        (tmp_path / "dir").mkdir()
+        
+        changes = {
+            (Change.added, str(tmp_path / "new.txt")),
+            (Change.modified, str(tmp_path / "new.txt")),
+            (Change.deleted, str(tmp_path / "saved.txt")),
+            (Change.added, str(tmp_path / "saved.txt")),
+            (Change.modified, str(tmp_path / "edited.txt")),
+            (Change.added, str(tmp_path / "transient.tmp")),
+            (Change.deleted, str(tmp_path / "transient.tmp")),
+            (Change.deleted, str(tmp_path / "gone.txt")),
+            (Change.added, str(tmp_path / "dir")),
+        }
+        
+        assert WorktreeWatcher.coalesce(changes, tmp_path) == {
+            "new.txt": "created",
+            "saved.txt": "modified",
+            "edited.txt": "modified",
+            "gone.txt": "deleted"
+        }
+    
+    async def test_publishes_debounced_changes(self, test_repo_path):
+        """Test changes are published with line deltas, skipping ignored files and node_modules."""
+        from app.services.worktree_watcher import WorktreeWatcher
+        
+        repo = Path(test_repo_path)
+        (repo / ".gitignore").write_text("*.log\n")
+        (repo / "node_modules").mkdir()
+        subprocess.run(["git", "add", ".gitignore"], cwd=repo, check=True)
+        subprocess.run(["git", "commit", "-q", "-m", "ignore logs"], cwd=repo, check=True)
+        
+        events = []
+        
+        async def publish(task_id, event_type, data):
+            events.append((task_id, event_type, data))
+        
+        watcher = WorktreeWatcher("task-1", test_repo_path, debounce_ms=100, publish=publish)
+        async with watcher:
+            await asyncio.sleep(0.3)  # let the watcher register before writing
+            (repo / "README.md").write_text("# Test Repository\nMore\n")
+            (repo / "notes.txt").write_text("one\ntwo\nthree\n")
+            (repo / "debug.log").write_text("ignored\n")
+            (repo / "node_modules" / "pkg.js").write_text("skipped\n")
+            
+            for _ in range(50):
+                if events:
+                    break
+                await asyncio.sleep(0.1)
+        
+        changes = {
+            change["path"]: change
+            for _, event_type, data in events if event_type == "file_change"
+            for change in data["changes"]
+        }
+        assert events[0][0] == "task-1"
+        assert set(changes) == {"README.md", "notes.txt"}
+        assert changes["README.md"]["change"] == "modified"
+        assert (changes["README.md"]["additions"], changes["README.md"]["deletions"]) == (2, 1)
+        assert changes["notes.txt"]["change"] == "created"
+        assert changes["notes.txt"]["additions"] == 3
\ No newline at end of file